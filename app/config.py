@@ -16,6 +16,89 @@ class Settings(BaseSettings):
 
     # 데이터베이스 설정
     database_url: str = "sqlite:///database.db"
+    database_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+
+    # 비동기 데이터베이스 경로 (AsyncSession, aiosqlite)
+    # True이면 채팅/게시물/댓글 라우터가 비동기 핸들러로 교체된다
+    async_database: bool = False
+
+    # SQLite 튜닝 (연결마다 PRAGMA로 적용)
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes
+    sqlite_cache_size: int = -64 * 1024  # 음수는 KiB 단위 (64MB)
+    sqlite_busy_timeout: int = 5000  # ms
+
+    # 채팅 메시지 group commit 설정
+    chat_write_batch_size: int = 64
+    chat_write_max_delay: float = 0.005  # seconds
+    # commit을 기다리는 메시지 수 (가득 차면 보내는 쪽의 수신을 멈춘다)
+    chat_write_queue_size: int = 1024
+
+    # 채팅 브로드캐스트 설정 (연결별 송신 큐)
+    chat_send_queue_size: int = 256
+    chat_slow_consumer_policy: str = "disconnect"  # "disconnect" 또는 "drop"
+    # 워커 간 채팅 브로드캐스트 (redis://host:port 또는 unix:///path)
+    # 비어 있으면 같은 프로세스의 연결에만 전달한다
+    chat_pubsub_url: str | None = None
+
+    # 업로드 설정 (청크 단위로 디스크에 스트리밍)
+    upload_chunk_size: int = 1024 * 1024  # bytes
+    upload_max_file_size: int = 100 * 1024 * 1024  # 파일 하나 (bytes)
+    upload_max_request_size: int = 500 * 1024 * 1024  # 요청 전체 (bytes)
+    # multipart 본문은 파일 외에 경계와 텍스트 필드가 붙으므로 이만큼 더 받는다
+    upload_form_overhead: int = 1024 * 1024  # bytes
+
+    # 이어받기 업로드 (tus 방식, /media/uploads): 청크를 받는 대로 디스크에 이어 쓴다
+    # 요청 하나의 크기를 제한해 끊겨도 다시 보낼 양과 요청 하나의 처리 시간을 줄인다
+    resumable_upload_max_chunk_size: int = 8 * 1024 * 1024  # bytes
+    # 이 시간 동안 청크가 오지 않은 업로드는 가비지 컬렉터가 지운다
+    resumable_upload_ttl: float = 24 * 3600  # seconds
+
+    # 이미지 사전 검사: 헤더만 읽고 한도를 넘는 이미지는 디코딩 전에 거절한다 (413)
+    # Pillow는 Image.MAX_IMAGE_PIXELS의 2배(약 1.8억 픽셀)를 넘으면 설정과 관계없이 열지 않는다
+    image_max_pixels: int = 50_000_000  # width * height
+    image_max_file_size: int = 50 * 1024 * 1024  # bytes
+    image_max_frames: int = 500  # 애니메이션 프레임 수
+
+    # 미디어 처리 워커 프로세스 수 (None이면 CPU 수, 0이면 요청 스레드에서 처리)
+    media_workers: int | None = None
+
+    # 이미지 렌디션: 긴 쪽 픽셀 크기별로 각 형식의 파일을 만든다 ("jpeg", "webp")
+    media_rendition_sizes: list[int] = [160, 480, 1080]
+    media_rendition_formats: list[str] = ["jpeg", "webp"]
+
+    # 요청 시 생성하는 이미지 변형 (GET /media/{id}/image) 디스크 캐시
+    media_variant_cache_dir: str = "media_cache"
+    media_variant_cache_max_bytes: int = 1024 * 1024 * 1024  # bytes
+    media_variant_max_width: int = 2048
+
+    # /uploads, /static 파일 응답 (Range 요청과 ETag 재검증 지원)
+    # 내용 해시로 이름이 정해진 업로드 파일은 내용이 바뀌지 않으므로 immutable로 오래
+    # 캐시하고, 그 밖의 업로드 파일(이전 방식의 uuid 이름)과 /static은 같은 경로의
+    # 내용이 바뀔 수 있으므로 매번 ETag로 재검증한다
+    uploads_cache_control: str = "public, max-age=31536000, immutable"
+    uploads_mutable_cache_control: str = "public, no-cache"
+    static_cache_control: str = "no-cache"
+    media_file_chunk_size: int = 1024 * 1024  # bytes
+
+    # 내용 주소 저장소 가비지 컬렉션 (python -m app.utils.blob_store)
+    # 참조가 없어진 blob과 고아 파일을 이 시간이 지난 뒤에 지운다 (업로드 중인 요청 보호)
+    media_gc_grace_period: float = 3600  # seconds
+    # POST /media/로 올린 뒤 이 시간 동안 연결되지 않은 미디어도 함께 지운다
+    media_unattached_ttl: float = 24 * 3600  # seconds
+
+    # 백그라운드 작업 큐 (python -m app.worker로 처리)
+    # True이면 업로드는 원본 저장 후 바로 반환되고 썸네일/메타데이터는 워커가 처리한다
+    media_background_processing: bool = False
+    job_max_attempts: int = 3
+    job_visibility_timeout: float = 60  # seconds
+    job_retry_delay: float = 5  # seconds (시도할 때마다 배수로 늘어남)
+    job_poll_interval: float = 0.5  # seconds
+    worker_processes: int = 1
 
     # 애플리케이션 설정
     app_name: str = "BAPI"
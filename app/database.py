@@ -1,15 +1,123 @@
+from functools import lru_cache
+
+from sqlalchemy import URL, Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import Settings, settings
+
+
+def apply_sqlite_pragmas(dbapi_connection, settings: Settings) -> None:
+    """새 SQLite 연결에 튜닝 PRAGMA를 적용합니다."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+    finally:
+        cursor.close()
+
+
+def to_async_url(database_url: str) -> URL:
+    """동기 드라이버 URL을 비동기 드라이버 URL로 바꿉니다 (sqlite -> aiosqlite)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() != "aiosqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _engine_options(url: URL, settings: Settings) -> tuple[dict, bool]:
+    """엔진 생성 옵션과 SQLite 튜닝 적용 여부를 반환합니다."""
+    is_sqlite = url.get_backend_name() == "sqlite"
+    is_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    engine_options = {"echo": settings.database_echo}
+    if is_sqlite:
+        engine_options["connect_args"] = {"check_same_thread": False}
+    if not is_memory:
+        # 인메모리 SQLite는 단일 연결 풀을 쓰므로 풀 크기를 지정하지 않는다
+        engine_options["pool_size"] = settings.database_pool_size
+        engine_options["max_overflow"] = settings.database_max_overflow
+
+    return engine_options, is_sqlite and not is_memory and settings.sqlite_tuning
+
+
+def create_db_engine(settings: Settings) -> Engine:
+    """
+    설정값으로 데이터베이스 엔진을 생성합니다.
+
+    SQLite 파일 데이터베이스에는 연결 시 WAL, synchronous, mmap_size,
+    cache_size, busy_timeout PRAGMA를 적용합니다 (sqlite_tuning).
+
+    Args:
+        settings: 애플리케이션 설정
+
+    Returns:
+        Engine: SQLAlchemy 엔진
+    """
+    url = make_url(settings.database_url)
+    engine_options, tuning = _engine_options(url, settings)
+    engine = create_engine(url, **engine_options)
+
+    if tuning:
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, settings)
 
-sqlite_file_name = "database.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
-connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, echo=True, connect_args=connect_args)
+    return engine
+
+
+def create_async_db_engine(settings: Settings) -> AsyncEngine:
+    """
+    설정값으로 비동기 데이터베이스 엔진을 생성합니다.
+
+    create_db_engine과 같은 풀/튜닝 설정을 쓰고, SQLite는 aiosqlite 드라이버로
+    연결합니다.
+
+    Args:
+        settings: 애플리케이션 설정
+
+    Returns:
+        AsyncEngine: SQLAlchemy 비동기 엔진
+    """
+    url = to_async_url(settings.database_url)
+    engine_options, tuning = _engine_options(url, settings)
+    async_engine = create_async_engine(url, **engine_options)
+
+    if tuning:
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, settings)
+
+    return async_engine
+
+
+engine = create_db_engine(settings)
 
 
 def create_db_and_tables():
+    from app.migrations import run_migrations
+
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """비동기 엔진은 처음 필요할 때 생성합니다 (async_database를 켠 경우에만 사용)."""
+    return create_async_db_engine(settings)
+
+
+async def get_async_session():
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
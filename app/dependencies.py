@@ -1,4 +1,4 @@
 # "dependencies" module, e.g. import app.dependencies
-from .database import get_session
+from .database import get_async_session, get_session
 
-__all__ = ["get_session"]
+__all__ = ["get_session", "get_async_session"]
@@ -1,15 +1,53 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from app.config import settings
 from app.routers.profiles import router as profiles_router
-from app.routers.chats import router as chats_router
-from app.routers.posts import router as posts_router
-from app.routers.comments import router as comments_router
 from app.routers.auth import router as auth_router
+from app.routers.media import router as media_router
+from app.routers.resumable_uploads import router as resumable_uploads_router
+from app.routers.chats import manager as chat_manager
+from app.utils.blob_store import is_content_addressed
+from app.utils.media_pipeline import shutdown_media_executor
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.static_files import CachedStaticFiles
+from app.utils.uploads import UploadSizeLimitMiddleware
+
+if settings.async_database:
+    # AsyncSession 기반 핸들러 (aiosqlite)
+    from app.routers.chats_async import router as chats_router
+    from app.routers.chats_async import (
+        get_async_message_writer as get_message_writer,
+    )
+    from app.routers.posts_async import router as posts_router
+    from app.routers.comments_async import router as comments_router
+else:
+    from app.routers.chats import router as chats_router
+    from app.routers.chats import get_message_writer
+    from app.routers.posts import router as posts_router
+    from app.routers.comments import router as comments_router
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 전에 큐에 남은 채팅 메시지를 commit
+    await get_message_writer().stop()
+    # 모든 메시지가 publish된 뒤 pub/sub 연결을 닫는다
+    await chat_manager.backend.close()
+    shutdown_media_executor()
 
 
+app = FastAPI(lifespan=lifespan)
+
+# Reject oversized multipart uploads before Starlette spools the whole body
+# (added before CORS so the 413 still carries the CORS headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_size=settings.upload_max_request_size + settings.upload_form_overhead,
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +55,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let scripts read listed response headers; clients page
+    # with the cursor header
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(auth_router)
@@ -24,7 +65,29 @@ app.include_router(profiles_router)
 app.include_router(chats_router)
 app.include_router(posts_router)
 app.include_router(comments_router)
+app.include_router(media_router)
+app.include_router(resumable_uploads_router)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount(
+    "/static",
+    CachedStaticFiles(
+        directory="app/static",
+        cache_control=settings.static_cache_control,
+        chunk_size=settings.media_file_chunk_size,
+    ),
+    name="static",
+)
+# Files named by content hash never change and are cached for good; other
+# uploads (older uuid names) are revalidated
+app.mount(
+    "/uploads",
+    CachedStaticFiles(
+        directory="uploads",
+        cache_control=settings.uploads_mutable_cache_control,
+        immutable=is_content_addressed,
+        immutable_cache_control=settings.uploads_cache_control,
+        chunk_size=settings.media_file_chunk_size,
+    ),
+    name="uploads",
+)
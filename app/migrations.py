@@ -0,0 +1,351 @@
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Uuid,
+    column,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy import table as sql_table
+
+# SQLModel.metadata.create_all이 모든 테이블을 만들도록 모델을 등록한다
+# (마이그레이션 자체는 모델이 아니라 아래의 고정된 정의를 사용)
+from app.models import chat, comment, job, media, post, profile  # noqa: F401
+
+# 적용된 마이그레이션 기록 테이블 (앱 모델의 metadata와 분리)
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    version: str
+    description: str
+    apply: Callable[[Connection], None]
+
+
+# 버전 순서대로 등록된 마이그레이션 목록
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: str, description: str):
+    """함수를 마이그레이션으로 등록하는 데코레이터"""
+
+    def register(apply: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, apply))
+        return apply
+
+    return register
+
+
+def table_columns(connection: Connection, table: str) -> set[str]:
+    """테이블의 현재 컬럼 이름 목록을 반환합니다."""
+    return {info["name"] for info in inspect(connection).get_columns(table)}
+
+
+def create_index(connection: Connection, name: str, table: str, *columns: str) -> None:
+    """
+    인덱스가 없으면 생성합니다.
+
+    인덱스 이름과 컬럼은 마이그레이션마다 고정해 두므로, 이후 모델이 바뀌어도
+    같은 마이그레이션은 항상 같은 스키마를 만듭니다.
+    """
+    column_list = ", ".join(f'"{item}"' for item in columns)
+    connection.execute(
+        text(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({column_list})')
+    )
+
+
+@migration("0001", "Add indexed created_at to chat, message, post and comment")
+def add_created_at_columns(connection: Connection) -> None:
+    """
+    created_at 컬럼이 없는 기존 테이블에 컬럼과 인덱스를 추가합니다.
+
+    기존 행의 created_at은 마이그레이션 시각으로 채웁니다. 같은 시각을 가진
+    행들은 id로 순서가 정해집니다. 기존 행의 uuid4 id는 외래 키가 참조하고
+    있으므로 그대로 두고, 새로 생성되는 행부터 UUIDv7 id를 사용합니다.
+    """
+    now = datetime.now(timezone.utc)
+    inspector = inspect(connection)
+    for table in ("chat", "message", "post", "comment"):
+        if not inspector.has_table(table):
+            continue
+
+        if "created_at" not in table_columns(connection, table):
+            # SQLite는 ADD COLUMN에 상수가 아닌 기본값을 허용하지 않으므로
+            # nullable로 추가한 뒤 값을 채운다
+            connection.execute(
+                text(f'ALTER TABLE "{table}" ADD COLUMN created_at DATETIME')
+            )
+            created_at = column("created_at", DateTime)
+            connection.execute(
+                update(sql_table(table, created_at))
+                .where(created_at.is_(None))
+                .values(created_at=now)
+            )
+
+        create_index(connection, f"ix_{table}_created_at", table, "created_at")
+
+
+@migration("0002", "Index foreign-key lookups used by the routers")
+def add_foreign_key_indexes(connection: Connection) -> None:
+    """
+    message.chat_id, comment.post_id, comment.parent_id, post.profile_id,
+    media(object_type, object_id), profilechatlink.chat_id 인덱스를 추가합니다.
+    """
+    indexes = [
+        ("ix_message_chat_id", "message", ("chat_id",)),
+        ("ix_comment_post_id", "comment", ("post_id",)),
+        ("ix_comment_parent_id", "comment", ("parent_id",)),
+        ("ix_post_profile_id", "post", ("profile_id",)),
+        ("ix_media_object_type_object_id", "media", ("object_type", "object_id")),
+        ("ix_profilechatlink_chat_id", "profilechatlink", ("chat_id",)),
+    ]
+    inspector = inspect(connection)
+    for name, table, columns in indexes:
+        if inspector.has_table(table):
+            create_index(connection, name, table, *columns)
+
+
+@migration("0003", "Add content_hash to media")
+def add_media_content_hash(connection: Connection) -> None:
+    """
+    업로드 중 계산한 sha256 해시를 저장할 media.content_hash 컬럼과 인덱스를
+    추가합니다. 기존 행은 NULL로 남습니다.
+    """
+    if not inspect(connection).has_table("media"):
+        return
+
+    if "content_hash" not in table_columns(connection, "media"):
+        connection.execute(text("ALTER TABLE media ADD COLUMN content_hash VARCHAR"))
+    create_index(connection, "ix_media_content_hash", "media", "content_hash")
+
+
+@migration("0004", "Add media processing status and the job queue table")
+def add_media_status_and_jobs(connection: Connection) -> None:
+    """
+    media.status 컬럼과 백그라운드 작업 큐(job) 테이블을 추가합니다.
+    기존 미디어는 이미 처리가 끝났으므로 'ready'로 채웁니다.
+    """
+    if inspect(connection).has_table("media"):
+        if "status" not in table_columns(connection, "media"):
+            connection.execute(
+                text(
+                    "ALTER TABLE media ADD COLUMN status VARCHAR NOT NULL DEFAULT 'ready'"
+                )
+            )
+
+    job = Table(
+        "job",
+        MetaData(),
+        Column("id", Uuid, primary_key=True),
+        Column("kind", String, nullable=False),
+        Column("payload", JSON),
+        Column("status", String, nullable=False),
+        Column("attempts", Integer, nullable=False),
+        Column("max_attempts", Integer, nullable=False),
+        Column("available_at", DateTime, nullable=False),
+        Column("last_error", String),
+        Column("created_at", DateTime, nullable=False),
+    )
+    job.create(connection, checkfirst=True)
+    create_index(connection, "ix_job_status", "job", "status")
+    create_index(connection, "ix_job_available_at", "job", "available_at")
+
+
+@migration("0005", "Add media renditions")
+def add_media_renditions(connection: Connection) -> None:
+    """이미지 렌디션을 저장하는 mediarendition 테이블을 추가합니다."""
+    metadata = MetaData()
+    # 외래 키가 참조하는 테이블 (생성하지 않음)
+    Table("media", metadata, Column("id", Uuid, primary_key=True))
+    mediarendition = Table(
+        "mediarendition",
+        metadata,
+        Column("url", String, nullable=False),
+        Column("format", String, nullable=False),
+        Column("max_size", Integer, nullable=False),
+        Column("width", Integer, nullable=False),
+        Column("height", Integer, nullable=False),
+        Column("file_size", Integer),
+        Column("id", Uuid, primary_key=True),
+        Column("media_id", Uuid, ForeignKey("media.id"), nullable=False),
+    )
+    mediarendition.create(connection, checkfirst=True)
+    create_index(connection, "ix_mediarendition_media_id", "mediarendition", "media_id")
+
+
+@migration("0006", "Add video duration and codec to media")
+def add_media_video_metadata(connection: Connection) -> None:
+    """
+    동영상 헤더에서 읽은 길이와 코덱을 저장할 media.duration, media.video_codec
+    컬럼을 추가합니다. 기존 행은 NULL로 남습니다.
+    """
+    if not inspect(connection).has_table("media"):
+        return
+
+    columns = table_columns(connection, "media")
+    if "duration" not in columns:
+        connection.execute(text("ALTER TABLE media ADD COLUMN duration FLOAT"))
+    if "video_codec" not in columns:
+        connection.execute(text("ALTER TABLE media ADD COLUMN video_codec VARCHAR"))
+
+
+@migration("0007", "Add image placeholders to media")
+def add_media_placeholder(connection: Connection) -> None:
+    """
+    업로드 처리 중 만든 저화질 미리보기(data URI)를 저장할 media.placeholder
+    컬럼을 추가합니다. 기존 이미지는 NULL로 남습니다.
+    """
+    if not inspect(connection).has_table("media"):
+        return
+
+    if "placeholder" not in table_columns(connection, "media"):
+        connection.execute(text("ALTER TABLE media ADD COLUMN placeholder VARCHAR"))
+
+
+@migration("0008", "Add content-addressed media blobs")
+def add_media_blobs(connection: Connection) -> None:
+    """
+    업로드 원본을 내용(sha256)으로 공유하는 mediablob 테이블을 추가합니다.
+    이전 업로드는 uuid 이름의 파일을 그대로 쓰고 blob에 참여하지 않습니다.
+    """
+    mediablob = Table(
+        "mediablob",
+        MetaData(),
+        Column("content_hash", String, primary_key=True),
+        Column("media_type", String, nullable=False),
+        Column("original_url", String, nullable=False),
+        Column("thumbnail_url", String),
+        Column("file_size", Integer, nullable=False),
+        Column("width", Integer),
+        Column("height", Integer),
+        Column("duration", Float),
+        Column("video_codec", String),
+        Column("placeholder", String),
+        Column("status", String, nullable=False),
+        Column("renditions", JSON),
+        Column("ref_count", Integer, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("released_at", DateTime),
+    )
+    mediablob.create(connection, checkfirst=True)
+
+
+@migration("0009", "Add resumable upload sessions")
+def add_resumable_uploads(connection: Connection) -> None:
+    """청크 단위 이어받기 업로드의 진행 상태를 저장하는 테이블을 추가합니다."""
+    resumableupload = Table(
+        "resumableupload",
+        MetaData(),
+        Column("id", Uuid, primary_key=True),
+        Column("profile_id", Uuid, nullable=False),
+        Column("filename", String, nullable=False),
+        Column("content_type", String, nullable=False),
+        Column("media_type", String, nullable=False),
+        Column("length", Integer, nullable=False),
+        Column("offset", Integer, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+    resumableupload.create(connection, checkfirst=True)
+    create_index(
+        connection,
+        "ix_resumableupload_profile_id",
+        "resumableupload",
+        "profile_id",
+    )
+    create_index(
+        connection,
+        "ix_resumableupload_updated_at",
+        "resumableupload",
+        "updated_at",
+    )
+
+
+def applied_versions(engine: Engine) -> set[str]:
+    """이미 적용된 마이그레이션 버전 목록을 반환합니다."""
+    migration_metadata.create_all(engine)
+    with engine.connect() as connection:
+        return set(connection.scalars(select(schema_migrations.c.version)))
+
+
+def run_migrations(engine: Engine) -> list[str]:
+    """
+    적용되지 않은 마이그레이션을 버전 순서대로 적용합니다.
+
+    각 마이그레이션은 자기 트랜잭션 안에서 실행되고, 같은 트랜잭션에서
+    schema_migrations에 기록됩니다. 인덱스 생성은 CREATE INDEX 한 번으로
+    끝나므로 서비스 중인 데이터베이스에도 그대로 적용할 수 있습니다.
+
+    Args:
+        engine: 업그레이드할 데이터베이스 엔진
+
+    Returns:
+        list[str]: 이번에 적용된 마이그레이션 버전들
+    """
+    done = applied_versions(engine)
+    applied = []
+    for pending in sorted(MIGRATIONS, key=lambda item: item.version):
+        if pending.version in done:
+            continue
+        with engine.begin() as connection:
+            pending.apply(connection)
+            connection.execute(
+                schema_migrations.insert().values(
+                    version=pending.version,
+                    description=pending.description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+        applied.append(pending.version)
+    return applied
+
+
+def main():
+    from sqlmodel import SQLModel
+
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="데이터베이스 스키마 마이그레이션")
+    parser.add_argument(
+        "--status", action="store_true", help="마이그레이션 적용 여부만 출력"
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions(engine)
+        for item in sorted(MIGRATIONS, key=lambda item: item.version):
+            mark = "x" if item.version in done else " "
+            print(f"[{mark}] {item.version} {item.description}")
+        return
+
+    SQLModel.metadata.create_all(engine)
+    applied = run_migrations(engine)
+    print(f"Applied migrations: {', '.join(applied) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
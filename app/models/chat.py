@@ -1,12 +1,14 @@
 from sqlmodel import Field, SQLModel, Relationship
 from sqlalchemy import Column, JSON
 import uuid
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.models.profile import Profile
 
 from app.models.profile import ProfileChatLink
+from app.utils.ids import uuid7
 
 
 class ChatBase(SQLModel):
@@ -14,7 +16,10 @@ class ChatBase(SQLModel):
 
 
 class Chat(ChatBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
     profiles: list["Profile"] = Relationship(
         back_populates="chats", link_model=ProfileChatLink
     )
@@ -23,6 +28,7 @@ class Chat(ChatBase, table=True):
 
 class ChatPublic(ChatBase):
     id: uuid.UUID
+    created_at: datetime
 
 
 class ChatCreate(ChatBase):
@@ -34,8 +40,11 @@ class MessageBase(SQLModel):
 
 
 class Message(MessageBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    chat_id: uuid.UUID = Field(foreign_key="chat.id")
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
+    chat_id: uuid.UUID = Field(foreign_key="chat.id", index=True)
     chat: "Chat" = Relationship(back_populates="messages")
     profile_id: uuid.UUID = Field(foreign_key="profile.id")
     profile: "Profile" = Relationship(back_populates="messages")
@@ -47,7 +56,11 @@ class Message(MessageBase, table=True):
 class MessageCreate(MessageBase):
     chat_id: uuid.UUID
     profile_id: uuid.UUID
+    # POST /media/로 미리 올린 미디어 id
+    media_file_ids: list[uuid.UUID] = []
 
 
 class MessagePublic(MessageBase):
     id: uuid.UUID
+    created_at: datetime
+    media_file_ids: list[uuid.UUID] = []
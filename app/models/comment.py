@@ -1,8 +1,11 @@
 from sqlmodel import Field, SQLModel, Relationship
 from sqlalchemy import Column, JSON
 import uuid
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
+from app.utils.ids import uuid7
+
 if TYPE_CHECKING:
     from app.models.profile import Profile
     from app.models.post import Post
@@ -13,10 +16,15 @@ class CommentBase(SQLModel):
 
 
 class Comment(CommentBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    parent_id: uuid.UUID | None = Field(default=None, foreign_key="comment.id")
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
+    parent_id: uuid.UUID | None = Field(
+        default=None, foreign_key="comment.id", index=True
+    )
 
-    post_id: uuid.UUID = Field(foreign_key="post.id")
+    post_id: uuid.UUID = Field(foreign_key="post.id", index=True)
     post: "Post" = Relationship(back_populates="comments")
 
     profile_id: uuid.UUID = Field(foreign_key="profile.id")
@@ -31,6 +39,8 @@ class CommentCreate(CommentBase):
     post_id: uuid.UUID
     profile_id: uuid.UUID
     parent_id: uuid.UUID | None = None
+    # POST /media/로 미리 올린 미디어 id
+    media_file_ids: list[uuid.UUID] = []
 
 
 class CommentPublic(CommentBase):
@@ -38,3 +48,5 @@ class CommentPublic(CommentBase):
     post_id: uuid.UUID
     profile_id: uuid.UUID
     parent_id: uuid.UUID | None = None
+    created_at: datetime
+    media_file_ids: list[uuid.UUID] = []
@@ -0,0 +1,29 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, JSON
+import uuid
+from datetime import datetime, timezone
+
+from app.utils.ids import uuid7
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class Job(SQLModel, table=True):
+    """SQLite에 저장되는 백그라운드 작업 (app.worker가 처리)"""
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    kind: str  # 작업 종류 (예: "process_media")
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    status: str = Field(default=JOB_QUEUED, index=True)
+    attempts: int = 0
+    max_attempts: int = 3
+    # 이 시각 이후에 가져갈 수 있다 (실행 중이면 visibility timeout 만료 시각)
+    available_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
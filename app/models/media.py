@@ -1,8 +1,19 @@
 from sqlmodel import Field, Session, SQLModel, select
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 import uuid
 from datetime import datetime, timezone
 
+from app.utils.ids import uuid7
+
+# 미디어 처리 상태 (백그라운드 처리 중이면 pending)
+MEDIA_PENDING = "pending"
+MEDIA_READY = "ready"
+MEDIA_FAILED = "failed"
+
+# POST /media/로 미리 올리고 아직 게시물/댓글/메시지에 연결하지 않은 미디어의
+# object_type (object_id는 올린 프로필)
+MEDIA_UNATTACHED = "unattached"
+
 
 class MediaBase(SQLModel):
     original_url: str
@@ -13,21 +24,126 @@ class MediaBase(SQLModel):
     height: int | None = None
     filename: str  # 원본 파일명
     content_type: str | None = None  # MIME 타입
-    object_type: str  # "post", "comment", "message"
+    object_type: str  # "post", "comment", "message", "unattached"
     object_id: uuid.UUID
+    content_hash: str | None = Field(default=None, index=True)  # sha256 hex
+    status: str = MEDIA_READY  # "pending", "ready", "failed"
+    duration: float | None = None  # 동영상 길이 (초)
+    video_codec: str | None = None  # 동영상 코덱 ("avc1", "hvc1", ...)
+    placeholder: str | None = None  # 저화질 미리보기 (data:image/webp;base64,...)
 
 
 class Media(MediaBase, table=True):
+    __table_args__ = (
+        Index("ix_media_object_type_object_id", "object_type", "object_id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    object_type: str  # "post", "comment", "message"
+    object_type: str  # "post", "comment", "message", "unattached"
     object_id: uuid.UUID
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
-class MediaCreate(MediaBase):
+class MediaBlob(SQLModel, table=True):
+    """
+    내용(sha256)으로 이름이 정해지는 원본 파일과 그 파생 파일들.
+
+    같은 내용을 올린 Media 행들은 원본, 썸네일, 렌디션 파일을 공유하고,
+    처리 결과(크기, 미리보기, 렌디션 목록)도 여기 한 번만 저장합니다.
+    ref_count는 이 blob을 가리키는 Media 행 수이며, 0이 된 blob은
+    app.utils.blob_store의 가비지 컬렉터가 파일과 함께 지웁니다.
+    """
+
+    content_hash: str = Field(primary_key=True)  # sha256 hex
+    media_type: str  # "image", "video"
+    original_url: str
+    thumbnail_url: str | None = None
+    file_size: int  # bytes
+    width: int | None = None
+    height: int | None = None
+    duration: float | None = None
+    video_codec: str | None = None
+    placeholder: str | None = None
+    status: str = MEDIA_READY
+    # 처리된 렌디션 목록 (MediaRenditionCreate.model_dump() 결과)
+    renditions: list[dict] = Field(default_factory=list, sa_column=Column(JSON))
+    ref_count: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # ref_count가 0이 된 시각 (가비지 컬렉션 유예 기간 계산용)
+    released_at: datetime | None = None
+
+
+class ResumableUpload(SQLModel, table=True):
+    """
+    여러 요청에 나눠 올리는 이어받기 업로드 (tus 방식, /media/uploads).
+
+    받은 청크는 uploads/resumable/{id} 파일 끝에 바로 이어 쓰고, offset은
+    디스크에 기록이 끝난 바이트 수입니다. offset이 length에 도달한 뒤 finalize하면
+    POST /media/로 올린 것과 같은 미연결 Media 행이 만들어지고 이 행은 지워집니다.
+    """
+
+    # 업로드 URL이 곧 권한이므로 추측하기 어려운 uuid4를 쓴다
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    profile_id: uuid.UUID = Field(index=True)
+    filename: str
+    content_type: str
+    media_type: str  # "image", "video"
+    length: int  # 전체 크기 (bytes)
+    offset: int = 0  # 저장된 크기 (bytes)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # 마지막으로 청크를 받은 시각 (오래 멈춘 업로드는 가비지 컬렉터가 지움)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
+
+
+class MediaRenditionBase(SQLModel):
+    url: str
+    format: str  # "jpeg", "webp"
+    max_size: int  # 설정된 렌디션 크기 (긴 쪽 픽셀)
+    width: int
+    height: int
+    file_size: int | None = None  # bytes
+
+
+class MediaRendition(MediaRenditionBase, table=True):
+    """이미지 하나의 크기/형식별 렌디션"""
+
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    media_id: uuid.UUID = Field(foreign_key="media.id", index=True)
+
+
+class MediaRenditionCreate(MediaRenditionBase):
     pass
 
 
+class MediaRenditionPublic(SQLModel):
+    url: str
+    format: str
+    width: int
+    height: int
+
+
+class MediaCreate(MediaBase):
+    # 요청 안에서 만든 렌디션 (Media 행과 함께 저장)
+    renditions: list[MediaRenditionCreate] = []
+
+
 class MediaPublic(MediaBase):
     id: uuid.UUID
     created_at: datetime
+
+
+class PostMediaPublic(SQLModel):
+    """게시물 응답에 포함되는 미디어 항목"""
+
+    id: uuid.UUID
+    media_type: str
+    url: str
+    thumbnail_url: str | None = None
+    width: int | None = None
+    height: int | None = None
+    duration: float | None = None
+    placeholder: str | None = None
+    status: str
+    renditions: list[MediaRenditionPublic] = []
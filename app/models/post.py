@@ -1,8 +1,12 @@
 from sqlmodel import Field, SQLModel, Relationship
 from sqlalchemy import Column, JSON
 import uuid
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
+from app.models.media import PostMediaPublic
+from app.utils.ids import uuid7
+
 if TYPE_CHECKING:
     from app.models.profile import Profile
     from app.models.comment import Comment
@@ -13,8 +17,11 @@ class PostBase(SQLModel):
 
 
 class Post(PostBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    profile_id: uuid.UUID = Field(foreign_key="profile.id")
+    id: uuid.UUID = Field(default_factory=uuid7, primary_key=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
+    profile_id: uuid.UUID = Field(foreign_key="profile.id", index=True)
     profile: "Profile" = Relationship(back_populates="posts")
     comments: list["Comment"] = Relationship(back_populates="post")
     media_file_ids: list[str] = Field(default_factory=list, sa_column=Column(JSON))
@@ -27,4 +34,6 @@ class PostCreate(PostBase):
 class PostPublic(PostBase):
     id: uuid.UUID
     profile_id: uuid.UUID
+    created_at: datetime
     media_urls: list[str] = []
+    media: list[PostMediaPublic] = []
@@ -12,7 +12,7 @@ if TYPE_CHECKING:
 # 연결 테이블 정의
 class ProfileChatLink(SQLModel, table=True):
     profile_id: uuid.UUID = Field(foreign_key="profile.id", primary_key=True)
-    chat_id: uuid.UUID = Field(foreign_key="chat.id", primary_key=True)
+    chat_id: uuid.UUID = Field(foreign_key="chat.id", primary_key=True, index=True)
 
 
 class ProfileBase(SQLModel):
@@ -0,0 +1,460 @@
+"""
+이미 저장된 이미지의 썸네일, 렌디션, 미리보기를 현재 설정으로 다시 만듭니다.
+
+Media 테이블을 id 순서의 키셋 배치로 읽으므로 행 수와 관계없이 메모리에는 배치
+하나만 올라가고, 디코딩과 리사이즈는 미디어 처리 프로세스 풀에 나눠 실행합니다.
+배치마다 commit한 뒤 마지막 id를 체크포인트 파일에 기록하므로, 중단되어도 다시
+실행하면 그 다음 배치부터 이어서 처리합니다.
+
+/uploads의 해시 이름 파일은 바뀌지 않는다는 전제로 오래 캐시되므로, 결과 파일은
+기존 파일을 덮어쓰지 않고 내용 해시를 버전으로 붙인 새 이름으로 만듭니다. 행이
+새 URL로 commit된 뒤에 이전 파일을 지웁니다.
+
+사용법: python -m app.regenerate_thumbnails [--batch-size 500] [--workers 8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import asdict, dataclass, replace
+from typing import Callable
+
+from sqlalchemy import Engine, delete, update
+from sqlmodel import Session, select
+
+# Profile의 관계가 참조하는 모델도 매퍼에 등록되도록 함께 import한다
+from app.models import chat, comment, post  # noqa: F401
+from app.models.media import (
+    MEDIA_PENDING,
+    MEDIA_READY,
+    Media,
+    MediaBlob,
+    MediaRendition,
+    MediaRenditionCreate,
+)
+from app.routers.posts import UPLOADS_DIR, media_job, upload_path, upload_url
+from app.utils.blob_store import copy_processed
+from app.utils.media_pipeline import MediaJob, MediaResult, process_media_batch
+from app.utils.uploads import hash_file
+
+logger = logging.getLogger(__name__)
+
+# 처리 중인 파일 이름 접미사 (끝나면 버전이 붙은 이름으로 옮김)
+TEMP_SUFFIX = ".regen"
+# 결과 파일 이름에 붙이는 내용 해시 길이
+VERSION_LENGTH = 12
+
+DEFAULT_CHECKPOINT = "regenerate_thumbnails.json"
+
+
+@dataclass
+class RegenerationProgress:
+    """진행 상황 (체크포인트 파일에 그대로 저장됨)"""
+
+    last_id: str | None = None  # 마지막으로 commit한 배치의 마지막 Media id
+    scanned: int = 0  # 읽은 Media 행 수
+    regenerated: int = 0  # 다시 만든 원본 수
+    shared: int = 0  # 같은 blob을 공유해 앞에서 함께 갱신된 행 수
+    failed: int = 0  # 처리하지 못한 원본 수 (행은 바꾸지 않음)
+
+
+def load_checkpoint(path: str) -> RegenerationProgress:
+    try:
+        with open(path) as file:
+            return RegenerationProgress(**json.load(file))
+    except FileNotFoundError:
+        return RegenerationProgress()
+
+
+def save_checkpoint(path: str, progress: RegenerationProgress) -> None:
+    # 쓰다가 중단되어도 이전 체크포인트가 남도록 임시 파일에 쓴 뒤 교체한다
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(asdict(progress), file)
+    os.replace(temp_path, path)
+
+
+def select_batch(last_id: uuid.UUID | None, batch_size: int):
+    """last_id 다음부터 batch_size개의 이미지 행을 읽는 키셋 쿼리"""
+    statement = (
+        select(Media).where(Media.media_type == "image")
+        # 처리 대기 중인 미디어는 워커가 현재 설정으로 처리한다
+        .where(Media.status != MEDIA_PENDING)
+    )
+    if last_id is not None:
+        statement = statement.where(Media.id > last_id)
+    return statement.order_by(Media.id).limit(batch_size)
+
+
+def thumbnail_path_for(media: Media) -> str:
+    """버전을 붙이기 전의 썸네일 경로 (렌디션처럼 원본 이름으로 만듦)"""
+    stem = os.path.splitext(os.path.basename(media.original_url))[0]
+    return f"{UPLOADS_DIR}/images/thumbnails/{stem}.jpg"
+
+
+def regeneration_job(media: Media) -> MediaJob:
+    """현재 설정의 처리 작업을 임시 파일 이름으로 만듭니다."""
+    job = media_job(media)
+    return replace(
+        job,
+        thumbnail_path=thumbnail_path_for(media) + TEMP_SUFFIX,
+        renditions=[
+            replace(spec, path=spec.path + TEMP_SUFFIX) for spec in job.renditions
+        ],
+    )
+
+
+def versioned_path(temp_path: str) -> str:
+    """임시 파일의 최종 경로 (확장자 앞에 내용 해시의 앞부분을 붙임)"""
+    base, extension = os.path.splitext(temp_path.removesuffix(TEMP_SUFFIX))
+    version = hash_file(temp_path).content_hash[:VERSION_LENGTH]
+    return f"{base}.{version}{extension}"
+
+
+def remove_files(paths) -> None:
+    for path in paths:
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def discard_outputs(job: MediaJob) -> None:
+    remove_files([job.thumbnail_path, *(spec.path for spec in job.renditions)])
+
+
+def publish_file(temp_path: str, created: list[str]) -> str:
+    """
+    임시 파일을 버전이 붙은 새 이름으로 옮기고 그 URL을 반환합니다.
+
+    같은 이름의 파일이 이미 있으면 내용도 같으므로 그대로 두고 (제공 중인 파일은
+    덮어쓰지 않음) 임시 파일만 지웁니다. 새로 만든 경로는 created에 추가합니다.
+    """
+    path = versioned_path(temp_path)
+    try:
+        os.link(temp_path, path)
+    except FileExistsError:
+        pass
+    else:
+        created.append(path)
+    os.remove(temp_path)
+    return upload_url(path)
+
+
+def publish_outputs(
+    job: MediaJob, result: MediaResult, created: list[str]
+) -> tuple[str, list[MediaRenditionCreate]]:
+    """임시 파일을 버전이 붙은 이름으로 옮기고 썸네일 URL과 렌디션 목록을 반환합니다."""
+    thumbnail_url = publish_file(job.thumbnail_path, created)
+    renditions = []
+    for rendition in result.renditions:
+        renditions.append(
+            MediaRenditionCreate(
+                url=publish_file(rendition.path, created),
+                format=rendition.format,
+                max_size=rendition.max_size,
+                width=rendition.width,
+                height=rendition.height,
+                file_size=rendition.file_size,
+            )
+        )
+    return thumbnail_url, renditions
+
+
+def shares_blob(blob: MediaBlob):
+    """blob의 파일을 가리키는 미디어 조건 (내용이 같아도 이전 방식의 uuid 파일은 제외)"""
+    return (Media.content_hash == blob.content_hash) & (
+        Media.original_url == blob.original_url
+    )
+
+
+def stage_regenerated(
+    session: Session,
+    media: Media,
+    blob: MediaBlob | None,
+    result: MediaResult,
+    thumbnail_url: str,
+    renditions: list[MediaRenditionCreate],
+) -> set[str]:
+    """
+    다시 만든 결과로 미디어 행들과 렌디션 행들을 바꿉니다 (commit은 호출한 쪽에서).
+
+    blob을 공유하는 미디어는 모두 같은 파일을 가리키므로 한꺼번에 바꿉니다.
+
+    Returns:
+        set[str]: 더 이상 어떤 행도 가리키지 않는 이전 썸네일/렌디션 URL들
+        (commit 후 파일 삭제용)
+    """
+    if blob is not None:
+        target = shares_blob(blob)
+    else:
+        target = Media.id == media.id
+    media_ids = session.exec(select(Media.id).where(target)).all()
+    old_urls = set(
+        session.exec(
+            select(MediaRendition.url).where(
+                MediaRendition.media_id.in_(select(Media.id).where(target))
+            )
+        )
+    )
+    old_urls.update(
+        url for url in session.exec(select(Media.thumbnail_url).where(target)) if url
+    )
+
+    media.thumbnail_url = thumbnail_url
+    media.width = result.width
+    media.height = result.height
+    media.placeholder = result.placeholder
+    media.status = MEDIA_READY
+    session.exec(
+        update(Media)
+        .where(target)
+        .values(
+            thumbnail_url=media.thumbnail_url,
+            width=media.width,
+            height=media.height,
+            placeholder=media.placeholder,
+            status=media.status,
+        )
+    )
+    session.exec(
+        delete(MediaRendition).where(
+            MediaRendition.media_id.in_(select(Media.id).where(target))
+        )
+    )
+    session.add_all(
+        MediaRendition.model_validate(rendition, update={"media_id": media_id})
+        for media_id in media_ids
+        for rendition in renditions
+    )
+    if blob is not None:
+        copy_processed(blob, media)
+        blob.renditions = [rendition.model_dump() for rendition in renditions]
+        session.add(blob)
+
+    session.flush()
+    # 다른 행(같은 파일을 가리키는 미디어)이 아직 쓰는 파일은 남긴다
+    in_use = set(
+        session.exec(
+            select(Media.thumbnail_url).where(Media.thumbnail_url.in_(old_urls))
+        )
+    )
+    in_use.update(
+        session.exec(select(MediaRendition.url).where(MediaRendition.url.in_(old_urls)))
+    )
+    return old_urls - in_use
+
+
+def regenerate_batch(
+    session: Session,
+    batch: list[Media],
+    executor,
+    progress: RegenerationProgress,
+    created: list[str],
+) -> set[str]:
+    """
+    배치 하나의 원본들을 다시 처리하고 결과를 세션에 반영합니다.
+
+    blob을 공유하는 미디어는 키셋 순서에서 처음 나온 행만 처리하고, 나머지 행은
+    그 결과로 함께 갱신되므로 건너뜁니다. 새로 만든 결과 파일 경로는 created에
+    추가됩니다 (commit이 실패하면 호출한 쪽에서 지움).
+
+    Returns:
+        set[str]: commit 후 지울 이전 렌디션 URL들
+    """
+    hashes = {media.content_hash for media in batch if media.content_hash}
+    blobs = {}
+    seen = set()
+    if hashes:
+        blobs = {
+            blob.content_hash: blob
+            for blob in session.exec(
+                select(MediaBlob).where(MediaBlob.content_hash.in_(hashes))
+            )
+        }
+    if blobs and progress.last_id is not None:
+        # 이전 배치에서 이미 함께 갱신된 blob
+        seen = set(
+            session.exec(
+                select(Media.content_hash)
+                .join(
+                    MediaBlob,
+                    (MediaBlob.content_hash == Media.content_hash)
+                    & (MediaBlob.original_url == Media.original_url),
+                )
+                .where(Media.content_hash.in_(blobs))
+                .where(Media.media_type == "image")
+                .where(Media.status != MEDIA_PENDING)
+                .where(Media.id <= uuid.UUID(progress.last_id))
+                .distinct()
+            )
+        )
+
+    selected = []
+    for media in batch:
+        blob = blobs.get(media.content_hash)
+        if blob is not None and blob.original_url != media.original_url:
+            blob = None
+        if blob is not None:
+            if blob.content_hash in seen:
+                progress.shared += 1
+                continue
+            seen.add(blob.content_hash)
+        selected.append((media, blob))
+
+    jobs = [regeneration_job(media) for media, _ in selected]
+    results = process_media_batch(jobs, executor)
+
+    stale_urls = set()
+    for (media, blob), job, result in zip(selected, jobs, results):
+        if result.error:
+            # 원본이 없거나 손상된 미디어는 기존 썸네일을 그대로 둔다
+            logger.warning("Error regenerating media %s: %s", media.id, result.error)
+            discard_outputs(job)
+            progress.failed += 1
+            continue
+        thumbnail_url, renditions = publish_outputs(job, result, created)
+        stale_urls |= stage_regenerated(
+            session, media, blob, result, thumbnail_url, renditions
+        )
+        progress.regenerated += 1
+    return stale_urls
+
+
+def regenerate_thumbnails(
+    engine: Engine,
+    *,
+    batch_size: int = 500,
+    executor=None,
+    checkpoint_path: str | None = None,
+    on_batch: Callable[[RegenerationProgress], None] | None = None,
+) -> RegenerationProgress:
+    """
+    모든 이미지 미디어의 썸네일, 렌디션, 미리보기를 다시 만듭니다.
+
+    Args:
+        engine: 데이터베이스 엔진
+        batch_size: 한 번에 읽고 commit하는 Media 행 수
+        executor: 미디어 처리 프로세스 풀 (None이면 현재 프로세스에서 처리)
+        checkpoint_path: 체크포인트 파일 경로 (있으면 그 다음부터 이어서 처리)
+        on_batch: 배치를 commit할 때마다 진행 상황을 받는 콜백
+
+    Returns:
+        RegenerationProgress: 최종 진행 상황
+    """
+    progress = (
+        load_checkpoint(checkpoint_path) if checkpoint_path else RegenerationProgress()
+    )
+    while True:
+        last_id = uuid.UUID(progress.last_id) if progress.last_id else None
+        created = []
+        try:
+            with Session(engine) as session:
+                batch = session.exec(select_batch(last_id, batch_size)).all()
+                if not batch:
+                    break
+                stale_urls = regenerate_batch(
+                    session, batch, executor, progress, created
+                )
+                progress.scanned += len(batch)
+                progress.last_id = str(batch[-1].id)
+                session.commit()
+        except BaseException:
+            # commit되지 않은 결과 파일은 어떤 행도 가리키지 않는다
+            remove_files(created)
+            raise
+
+        # 새 URL이 commit된 뒤에 이전 썸네일과 렌디션 파일을 지운다
+        remove_files(upload_path(url) for url in stale_urls)
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, progress)
+        if on_batch is not None:
+            on_batch(progress)
+
+    if checkpoint_path:
+        # 끝까지 처리했으면 다음 실행은 처음부터 시작한다
+        with suppress(FileNotFoundError):
+            os.remove(checkpoint_path)
+    return progress
+
+
+def main():
+    from sqlalchemy import func
+
+    from app.config import settings
+    from app.database import engine
+    from app.utils.media_pipeline import get_media_executor, shutdown_media_executor
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="한 번에 읽고 commit하는 행 수"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.media_workers,
+        help="처리 프로세스 수 (기본값 CPU 수, 0이면 현재 프로세스에서 처리)",
+    )
+    parser.add_argument(
+        "--checkpoint", default=DEFAULT_CHECKPOINT, help="체크포인트 파일 경로"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="체크포인트를 무시하고 처음부터 실행"
+    )
+    args = parser.parse_args()
+    # 진행 상황은 stdout으로 출력하고, 미디어별 실패는 로그(stderr)로 구분한다
+    logging.basicConfig(format="%(levelname)s %(name)s: %(message)s")
+
+    if args.restart:
+        with suppress(FileNotFoundError):
+            os.remove(args.checkpoint)
+
+    with Session(engine) as session:
+        total = session.exec(
+            select(func.count())
+            .select_from(Media)
+            .where(Media.media_type == "image")
+            .where(Media.status != MEDIA_PENDING)
+        ).one()
+    resumed = load_checkpoint(args.checkpoint)
+    if resumed.last_id:
+        print(f"Resuming after {resumed.last_id} ({resumed.scanned} already scanned)")
+
+    started = time.monotonic()
+
+    def report(progress: RegenerationProgress) -> None:
+        elapsed = time.monotonic() - started
+        scanned = progress.scanned - resumed.scanned
+        regenerated = progress.regenerated - resumed.regenerated
+        percent = progress.scanned / total * 100 if total else 100
+        print(
+            f"{progress.scanned}/{total} media ({percent:.1f}%), "
+            f"{progress.regenerated} regenerated, {progress.shared} shared, "
+            f"{progress.failed} failed | "
+            f"{scanned / elapsed:.1f} rows/s, {regenerated / elapsed:.1f} images/s"
+        )
+
+    executor = get_media_executor(args.workers)
+    try:
+        progress = regenerate_thumbnails(
+            engine,
+            batch_size=args.batch_size,
+            executor=executor,
+            checkpoint_path=args.checkpoint,
+            on_batch=report,
+        )
+    except KeyboardInterrupt:
+        print(f"Interrupted; run again to resume from {args.checkpoint}")
+        return
+    finally:
+        shutdown_media_executor()
+    print(
+        f"Done: {progress.regenerated} images regenerated, {progress.failed} failed "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
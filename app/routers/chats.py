@@ -3,14 +3,20 @@ from fastapi import (
     APIRouter,
     HTTPException,
     Query,
+    Response,
     WebSocket,
     WebSocketDisconnect,
 )
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine
 from sqlmodel import Session, select
 from uuid import UUID
+import asyncio
+import json
+import logging
 import os
 import uuid as uuid_lib
-from typing import List, Dict
+from typing import List
 
 from ..models.profile import (
     Profile,
@@ -32,7 +38,23 @@ from ..models.chat import (
     MessagePublic,
     MessageCreate,
 )
+from ..config import settings
 from ..database import get_session, engine
+from ..utils.attachments import (
+    attach_media,
+    keep_attached,
+    message_attachment_statement,
+)
+from ..utils.connection_manager import ConnectionManager
+from ..utils.message_writer import MessageWriter
+from ..utils.pagination import paginate
+from ..utils.pubsub import create_pubsub_backend
+
+logger = logging.getLogger(__name__)
+
+# 커서 페이지네이션 정렬 키
+CHAT_SORT_KEY = (Chat.created_at, Chat.id)
+MESSAGE_SORT_KEY = (Message.created_at, Message.id)
 
 
 router = APIRouter()
@@ -76,10 +98,20 @@ def create_chat(*, session: Session = Depends(get_session), chat: ChatCreate):
 def read_chats(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, le=100),
+    after: str | None = None,
 ):
-    chats = session.exec(select(Chat).offset(offset).limit(limit)).all()
+    chats = paginate(
+        session,
+        select(Chat),
+        CHAT_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
     return chats
 
 
@@ -102,6 +134,15 @@ def create_message(*, session: Session = Depends(get_session), message: MessageC
 
     # In a real implementation, you might want to validate the profile as well
     db_message = Message.model_validate(message)
+    # Attach media uploaded beforehand through POST /media/
+    attached = attach_media(
+        session,
+        message.media_file_ids,
+        profile_id=message.profile_id,
+        object_type="message",
+        object_id=db_message.id,
+    )
+    db_message.media_file_ids = [str(media.id) for media in attached]
     session.add(db_message)
     session.commit()
     session.refresh(db_message)
@@ -112,10 +153,20 @@ def create_message(*, session: Session = Depends(get_session), message: MessageC
 def read_messages(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, le=100),
+    after: str | None = None,
 ):
-    messages = session.exec(select(Message).offset(offset).limit(limit)).all()
+    messages = paginate(
+        session,
+        select(Message),
+        MESSAGE_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
     return messages
 
 
@@ -126,72 +177,111 @@ def read_chat_messages(*, session: Session = Depends(get_session), chat_id: UUID
         raise HTTPException(status_code=404, detail="Chat not found")
 
     # Get messages for this chat
-    messages = session.exec(select(Message).where(Message.chat_id == chat_id)).all()
+    messages = session.exec(
+        select(Message).where(Message.chat_id == chat_id).order_by(*MESSAGE_SORT_KEY)
+    ).all()
     return messages
 
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[UUID, List[WebSocket]] = {}
+manager = ConnectionManager(
+    max_queue_size=settings.chat_send_queue_size,
+    slow_consumer_policy=settings.chat_slow_consumer_policy,
+    backend=create_pubsub_backend(settings.chat_pubsub_url),
+)
+
+
+async def broadcast_messages(messages: List[Message]):
+    """Broadcast committed messages to their chat rooms"""
+    for message in messages:
+        message_to_broadcast = MessagePublic.model_validate(message)
+        await manager.broadcast(
+            message_to_broadcast.model_dump_json(), chat_id=message.chat_id
+        )
+
+
+async def announce_departure(chat_id: UUID):
+    """Tell the room that a client left; the connection is already cleaned up"""
+    try:
+        await manager.broadcast("A client has left the chat", chat_id=chat_id)
+    except Exception:
+        # The pub/sub backend may be unreachable
+        logger.exception("Error announcing a departure from chat %s", chat_id)
+
 
-    async def connect(self, websocket: WebSocket, chat_id: UUID):
-        await websocket.accept()
-        if chat_id not in self.active_connections:
-            self.active_connections[chat_id] = []
-        self.active_connections[chat_id].append(websocket)
+def report_unsaved(websocket: WebSocket, message: Message):
+    """Build a done-callback that tells the sender when its message was not saved"""
 
-    def disconnect(self, websocket: WebSocket, chat_id: UUID):
-        if (
-            chat_id in self.active_connections
-            and websocket in self.active_connections[chat_id]
-        ):
-            self.active_connections[chat_id].remove(websocket)
-            if not self.active_connections[chat_id]:
-                del self.active_connections[chat_id]
+    def on_done(saved: asyncio.Future):
+        if saved.cancelled() or saved.exception() is not None:
+            error = {"error": "Message could not be saved", "id": str(message.id)}
+            manager.send_to(websocket, json.dumps(error))
 
-    async def broadcast(self, message: str, chat_id: UUID):
-        if chat_id in self.active_connections:
-            connections = self.active_connections[chat_id]
-            for connection in connections:
-                await connection.send_text(message)
+    return on_done
 
 
-manager = ConnectionManager()
+def make_message_writer(engine: Engine) -> MessageWriter[Message]:
+    """Create a group-commit writer that appends messages through a sync engine"""
+
+    def commit_messages(messages: List[Message]):
+        with Session(engine, expire_on_commit=False) as session:
+            # Attach media uploaded beforehand; unknown ids are dropped
+            for message in messages:
+                statement = message_attachment_statement(message)
+                if statement is not None:
+                    keep_attached(message, session.exec(statement).scalars().all())
+            session.add_all(messages)
+            session.commit()
+
+    async def commit_batch(messages: List[Message]):
+        await run_in_threadpool(commit_messages, messages)
+
+    return MessageWriter(
+        commit_batch,
+        broadcast_messages,
+        max_batch_size=settings.chat_write_batch_size,
+        max_delay=settings.chat_write_max_delay,
+        max_queue_size=settings.chat_write_queue_size,
+    )
+
+
+message_writer = make_message_writer(engine)
+
+
+def get_message_writer() -> MessageWriter[Message]:
+    return message_writer
 
 
 @router.websocket("/ws/{chat_id}")
-async def websocket_endpoint(websocket: WebSocket, chat_id: UUID):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    chat_id: UUID,
+    writer: MessageWriter[Message] = Depends(get_message_writer),
+):
     await manager.connect(websocket, chat_id)
     try:
         while True:
             data = await websocket.receive_json()
             # Expected: {"profile_id": "...", "text": "...", "media_file_ids": []}
-            with Session(engine) as session:
-                profile_id_str = data.get("profile_id")
-                if not profile_id_str:
-                    continue  # Ignore malformed data
-
-                # TODO: Add validation that profile exists and is in this chat
-
-                db_message = Message(
-                    text=data.get("text", ""),
-                    chat_id=chat_id,
-                    profile_id=UUID(profile_id_str),
-                    media_file_ids=data.get("media_file_ids", []),
-                )
-                session.add(db_message)
-                session.commit()
-                session.refresh(db_message)
-
-                message_to_broadcast = MessagePublic.model_validate(db_message)
-
-            await manager.broadcast(
-                message_to_broadcast.model_dump_json(), chat_id=chat_id
+            profile_id_str = data.get("profile_id")
+            if not profile_id_str:
+                continue  # Ignore malformed data
+
+            # TODO: Add validation that profile exists and is in this chat
+
+            db_message = Message(
+                text=data.get("text", ""),
+                chat_id=chat_id,
+                profile_id=UUID(profile_id_str),
+                media_file_ids=data.get("media_file_ids", []),
             )
+            # Committed in a batch by the writer, then broadcast to the room.
+            # Waits here while the write queue is full.
+            saved = await writer.submit(db_message)
+            saved.add_done_callback(report_unsaved(websocket, db_message))
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, chat_id)
-        await manager.broadcast(f"A client has left the chat", chat_id=chat_id)
-    except Exception as e:
-        print(f"Error in websocket: {e}")
+        await announce_departure(chat_id)
+    except Exception:
+        logger.exception("Error in websocket for chat %s", chat_id)
         manager.disconnect(websocket, chat_id)
@@ -0,0 +1,238 @@
+from fastapi import (
+    Depends,
+    APIRouter,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List
+from uuid import UUID
+import logging
+
+from ..models.profile import Profile, ProfileChatLink
+from ..models.chat import (
+    Chat,
+    ChatPublic,
+    ChatCreate,
+    Message,
+    MessagePublic,
+    MessageCreate,
+)
+from ..config import settings
+from ..database import get_async_engine, get_async_session
+from ..utils.attachments import (
+    attach_media_async,
+    keep_attached,
+    message_attachment_statement,
+)
+from ..utils.message_writer import MessageWriter
+from ..utils.pagination import paginate_async
+from .chats import (
+    CHAT_SORT_KEY,
+    MESSAGE_SORT_KEY,
+    announce_departure,
+    broadcast_messages,
+    manager,
+    report_unsaved,
+)
+
+logger = logging.getLogger(__name__)
+
+# settings.async_database가 켜져 있을 때 chats 라우터 대신 사용되는 비동기 버전
+router = APIRouter()
+
+
+@router.post("/chats/", response_model=ChatPublic)
+async def create_chat(
+    *, session: AsyncSession = Depends(get_async_session), chat: ChatCreate
+):
+    # Validate that at least one profile_id is provided
+    if not chat.profile_ids or len(chat.profile_ids) == 0:
+        raise HTTPException(
+            status_code=400, detail="At least one profile_id is required"
+        )
+
+    # Validate that all profile_ids exist
+    profiles = []
+    for profile_id in chat.profile_ids:
+        profile = await session.get(Profile, profile_id)
+        if not profile:
+            raise HTTPException(
+                status_code=404, detail=f"Profile with id {profile_id} not found"
+            )
+        profiles.append(profile)
+
+    # Create the chat together with its ProfileChatLink entries
+    db_chat = Chat.model_validate(chat)
+    session.add(db_chat)
+    for profile in profiles:
+        session.add(ProfileChatLink(profile_id=profile.id, chat_id=db_chat.id))
+    await session.commit()
+
+    return db_chat
+
+
+@router.get("/chats/", response_model=list[ChatPublic])
+async def read_chats(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, le=100),
+    after: str | None = None,
+):
+    chats = await paginate_async(
+        session,
+        select(Chat),
+        CHAT_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
+    return chats
+
+
+@router.get("/chats/{chat_id}", response_model=ChatPublic)
+async def read_chat(
+    *, session: AsyncSession = Depends(get_async_session), chat_id: UUID
+):
+    chat = await session.get(Chat, chat_id)
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return chat
+
+
+@router.post("/messages/", response_model=MessagePublic)
+async def create_message(
+    *, session: AsyncSession = Depends(get_async_session), message: MessageCreate
+):
+    # Validate that the chat_id exists
+    chat = await session.get(Chat, message.chat_id)
+    if not chat:
+        raise HTTPException(
+            status_code=404, detail=f"Chat with id {message.chat_id} not found"
+        )
+
+    db_message = Message.model_validate(message)
+    # Attach media uploaded beforehand through POST /media/
+    attached = await attach_media_async(
+        session,
+        message.media_file_ids,
+        profile_id=message.profile_id,
+        object_type="message",
+        object_id=db_message.id,
+    )
+    db_message.media_file_ids = [str(media.id) for media in attached]
+    session.add(db_message)
+    await session.commit()
+    return db_message
+
+
+@router.get("/messages/", response_model=list[MessagePublic])
+async def read_messages(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, le=100),
+    after: str | None = None,
+):
+    messages = await paginate_async(
+        session,
+        select(Message),
+        MESSAGE_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
+    return messages
+
+
+@router.get("/chats/{chat_id}/messages/", response_model=list[MessagePublic])
+async def read_chat_messages(
+    *, session: AsyncSession = Depends(get_async_session), chat_id: UUID
+):
+    chat = await session.get(Chat, chat_id)
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    # Get messages for this chat
+    messages = await session.exec(
+        select(Message).where(Message.chat_id == chat_id).order_by(*MESSAGE_SORT_KEY)
+    )
+    return messages.all()
+
+
+def make_async_message_writer(async_engine: AsyncEngine) -> MessageWriter[Message]:
+    """Create a group-commit writer that appends messages through an async engine"""
+
+    async def commit_batch(messages: List[Message]):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            # Attach media uploaded beforehand; unknown ids are dropped
+            for message in messages:
+                statement = message_attachment_statement(message)
+                if statement is not None:
+                    result = await session.exec(statement)
+                    keep_attached(message, result.scalars().all())
+            session.add_all(messages)
+            await session.commit()
+
+    return MessageWriter(
+        commit_batch,
+        broadcast_messages,
+        max_batch_size=settings.chat_write_batch_size,
+        max_delay=settings.chat_write_max_delay,
+        max_queue_size=settings.chat_write_queue_size,
+    )
+
+
+_message_writer: MessageWriter[Message] | None = None
+
+
+def get_async_message_writer() -> MessageWriter[Message]:
+    # 비동기 엔진은 async_database를 켠 경우에만 만들어지므로 writer도 지연 생성한다
+    global _message_writer
+    if _message_writer is None:
+        _message_writer = make_async_message_writer(get_async_engine())
+    return _message_writer
+
+
+@router.websocket("/ws/{chat_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    chat_id: UUID,
+    writer: MessageWriter[Message] = Depends(get_async_message_writer),
+):
+    await manager.connect(websocket, chat_id)
+    try:
+        while True:
+            data = await websocket.receive_json()
+            # Expected: {"profile_id": "...", "text": "...", "media_file_ids": []}
+            profile_id_str = data.get("profile_id")
+            if not profile_id_str:
+                continue  # Ignore malformed data
+
+            db_message = Message(
+                text=data.get("text", ""),
+                chat_id=chat_id,
+                profile_id=UUID(profile_id_str),
+                media_file_ids=data.get("media_file_ids", []),
+            )
+            # Committed in a batch by the writer, then broadcast to the room.
+            # Waits here while the write queue is full.
+            saved = await writer.submit(db_message)
+            saved.add_done_callback(report_unsaved(websocket, db_message))
+
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, chat_id)
+        await announce_departure(chat_id)
+    except Exception:
+        logger.exception("Error in websocket for chat %s", chat_id)
+        manager.disconnect(websocket, chat_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session, select
 from uuid import UUID
 
@@ -6,6 +6,11 @@ from ..database import get_session
 from ..models.comment import Comment, CommentCreate, CommentPublic
 from ..models.post import Post
 from ..models.profile import Profile
+from ..utils.attachments import attach_media, delete_attached_media
+from ..utils.pagination import paginate
+
+# 커서 페이지네이션 정렬 키
+COMMENT_SORT_KEY = (Comment.created_at, Comment.id)
 
 router = APIRouter(
     prefix="/comments",
@@ -42,6 +47,15 @@ def create_comment(
             )
 
     db_comment = Comment.model_validate(comment)
+    # Attach media uploaded beforehand through POST /media/
+    attached = attach_media(
+        session,
+        comment.media_file_ids,
+        profile_id=comment.profile_id,
+        object_type="comment",
+        object_id=db_comment.id,
+    )
+    db_comment.media_file_ids = [str(media.id) for media in attached]
     session.add(db_comment)
     session.commit()
     session.refresh(db_comment)
@@ -64,17 +78,25 @@ def read_comment(
 def read_comments_for_post(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     post_id: UUID,
     offset: int = 0,
     limit: int = Query(default=100, le=100),
+    after: str | None = None,
 ):
     post = session.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    comments = session.exec(
-        select(Comment).where(Comment.post_id == post_id).offset(offset).limit(limit)
-    ).all()
+    comments = paginate(
+        session,
+        select(Comment).where(Comment.post_id == post_id),
+        COMMENT_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
     return comments
 
 
@@ -93,6 +115,7 @@ def delete_comment(
     # if comment.profile_id != current_user.id:
     #     raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
 
+    delete_attached_media(session, object_type="comment", object_id=comment.id)
     session.delete(comment)
     session.commit()
     return {"ok": True}
@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+
+from ..database import get_async_session
+from ..models.comment import Comment, CommentCreate, CommentPublic
+from ..models.post import Post
+from ..models.profile import Profile
+from ..utils.attachments import attach_media_async, delete_attached_media_async
+from ..utils.pagination import paginate_async
+from .comments import COMMENT_SORT_KEY
+
+# settings.async_database가 켜져 있을 때 comments 라우터 대신 사용되는 비동기 버전
+router = APIRouter(
+    prefix="/comments",
+    tags=["comments"],
+)
+
+
+@router.post("/", response_model=CommentPublic)
+async def create_comment(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    comment: CommentCreate,
+):
+    # Validate post
+    post = await session.get(Post, comment.post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    # Validate profile
+    profile = await session.get(Profile, comment.profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    # Validate parent comment if exists
+    if comment.parent_id:
+        parent_comment = await session.get(Comment, comment.parent_id)
+        if not parent_comment:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+        # Ensure the parent comment belongs to the same post
+        if parent_comment.post_id != comment.post_id:
+            raise HTTPException(
+                status_code=400,
+                detail="Parent comment does not belong to the same post",
+            )
+
+    db_comment = Comment.model_validate(comment)
+    # Attach media uploaded beforehand through POST /media/
+    attached = await attach_media_async(
+        session,
+        comment.media_file_ids,
+        profile_id=comment.profile_id,
+        object_type="comment",
+        object_id=db_comment.id,
+    )
+    db_comment.media_file_ids = [str(media.id) for media in attached]
+    session.add(db_comment)
+    await session.commit()
+    return db_comment
+
+
+@router.get("/{comment_id}", response_model=CommentPublic)
+async def read_comment(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    comment_id: UUID,
+):
+    comment = await session.get(Comment, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return comment
+
+
+@router.get("/post/{post_id}", response_model=list[CommentPublic])
+async def read_comments_for_post(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    post_id: UUID,
+    offset: int = 0,
+    limit: int = Query(default=100, le=100),
+    after: str | None = None,
+):
+    post = await session.get(Post, post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    comments = await paginate_async(
+        session,
+        select(Comment).where(Comment.post_id == post_id),
+        COMMENT_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
+    return comments
+
+
+@router.delete("/{comment_id}")
+async def delete_comment(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    comment_id: UUID,
+):
+    comment = await session.get(Comment, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    await delete_attached_media_async(
+        session, object_type="comment", object_id=comment.id
+    )
+    await session.delete(comment)
+    await session.commit()
+    return {"ok": True}
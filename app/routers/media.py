@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Literal
+
+from fastapi import Depends, APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from sqlmodel import Session
+from typing import List
+from uuid import UUID
+
+from ..models.media import MEDIA_UNATTACHED, Media, MediaPublic
+from ..models.profile import Profile
+from ..config import settings
+from ..database import get_session
+from ..utils.media_pipeline import get_media_executor, replace_broken_executor
+from ..utils.media_utils import PREFLIGHT_STAGE, MediaProcessingError, render_variant
+from ..utils.static_files import IMMUTABLE_CACHE_CONTROL
+from ..utils.variant_cache import VariantCache
+from .posts import (
+    discard_stored_uploads,
+    ensure_upload_dirs,
+    image_limits,
+    stage_uploaded_media,
+    store_uploads,
+)
+
+# 변형 형식별 응답 Content-Type
+VARIANT_CONTENT_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+router = APIRouter()
+
+
+@lru_cache
+def get_variant_cache() -> VariantCache:
+    return VariantCache(
+        settings.media_variant_cache_dir, settings.media_variant_cache_max_bytes
+    )
+
+
+@router.post("/media/", response_model=list[MediaPublic])
+def upload_media(
+    *,
+    session: Session = Depends(get_session),
+    profile_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+):
+    """Upload attachments ahead of the post, comment or message that uses them
+
+    The files go through the same limits and processing as post uploads. The
+    returned ids can be passed as media_ids / media_file_ids when the post,
+    comment or message is created; until then the media belong to the profile.
+    """
+    try:
+        profile_uuid = UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid profile_id format")
+
+    profile = session.get(Profile, profile_uuid)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    ensure_upload_dirs()
+
+    stored_media = store_uploads(
+        files, object_type=MEDIA_UNATTACHED, object_id=profile_uuid
+    )
+    try:
+        db_media, _ = stage_uploaded_media(session, stored_media)
+        media_publics = [MediaPublic.model_validate(media) for media in db_media]
+        session.commit()
+    except BaseException:
+        discard_stored_uploads(stored_media)
+        raise
+
+    return media_publics
+
+
+@router.get("/media/{media_id}", response_model=MediaPublic)
+def read_media(*, session: Session = Depends(get_session), media_id: UUID):
+    # Clients poll this while status is "pending"
+    media = session.get(Media, media_id)
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return media
+
+
+@router.get("/media/{media_id}/image")
+async def read_media_image(
+    *,
+    session: Session = Depends(get_session),
+    cache: VariantCache = Depends(get_variant_cache),
+    media_id: UUID,
+    width: int = Query(ge=16, le=settings.media_variant_max_width),
+    format: Literal["jpeg", "webp"] = "webp",
+):
+    media = await run_in_threadpool(session.get, Media, media_id)
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    if media.media_type != "image":
+        raise HTTPException(status_code=400, detail="Media is not an image")
+
+    original_path = media.original_url.lstrip("/")
+
+    async def render(output_path: str):
+        # Resizing is CPU work, so it runs in the media process pool
+        executor = get_media_executor(settings.media_workers)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                executor,
+                render_variant,
+                original_path,
+                output_path,
+                width,
+                format,
+                image_limits(),
+            )
+        except BrokenProcessPool:
+            # The worker died (e.g. out of memory); later requests get a new pool
+            replace_broken_executor(executor)
+            raise MediaProcessingError(original_path, "decode", "Worker crashed")
+
+    try:
+        # Concurrent requests for the same variant share a single render
+        # The bytes are read right away: a cached file can be evicted by another
+        # request at any time, in which case it is rendered again
+        content = await cache.read(f"{media.id}:{width}:{format}", format, render)
+    except MediaProcessingError as e:
+        if e.stage == PREFLIGHT_STAGE:
+            raise HTTPException(status_code=413, detail=f"Image rejected: {e.reason}")
+        raise HTTPException(status_code=422, detail="Image cannot be processed")
+
+    # A variant of a media never changes, so clients and CDNs may keep it
+    return Response(
+        content,
+        media_type=VARIANT_CONTENT_TYPES[format],
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
@@ -1,6 +1,19 @@
-from fastapi import Depends, APIRouter, HTTPException, Query, File, UploadFile, Form
+from fastapi import (
+    Depends,
+    APIRouter,
+    HTTPException,
+    Query,
+    File,
+    UploadFile,
+    Form,
+    Response,
+)
 from sqlmodel import Session, select
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import asdict
 from uuid import UUID, uuid4
+import logging
 import os
 from typing import List
 
@@ -11,29 +24,505 @@ from ..models.post import (
     PostCreate,
 )
 from ..models.media import (
+    MEDIA_FAILED,
+    MEDIA_PENDING,
     Media,
+    MediaBase,
+    MediaBlob,
     MediaCreate,
+    MediaRendition,
+    MediaRenditionCreate,
+    MediaRenditionPublic,
+    PostMediaPublic,
 )
+from ..config import settings
 from ..database import get_session
-from ..utils.media_utils import create_thumbnail, get_image_dimensions
+from ..utils.blob_store import (
+    RESUMABLE_DIR,
+    TMP_DIR,
+    add_blob_refs,
+    blob_renditions,
+    blob_values,
+    claim_blobs,
+    copy_processed,
+)
+from ..utils.attachments import attach_media
+from ..utils.job_queue import enqueue_job
+from ..utils.media_pipeline import (
+    PROCESS_MEDIA_JOB,
+    MediaJob,
+    get_media_executor,
+    process_media_batch,
+)
+from ..utils.media_utils import (
+    PREFLIGHT_STAGE,
+    ImageLimits,
+    MediaProcessingError,
+    RenditionSpec,
+    probe_image,
+)
+from ..utils.pagination import paginate
+from ..utils.uploads import UploadLimiter
+
+logger = logging.getLogger(__name__)
+
+# 커서 페이지네이션 정렬 키
+POST_SORT_KEY = (Post.created_at, Post.id)
+
+
+def select_post_media(posts: List[Post]):
+    """Build one query for the media of a whole page of posts (None if no media)"""
+    media_uuids = {
+        UUID(media_id) for post in posts for media_id in post.media_file_ids or []
+    }
+    if not media_uuids:
+        return None
+    return select(Media).where(Media.id.in_(media_uuids))
+
+
+def select_media_renditions(media_records: List[Media]):
+    """Build one query for the renditions of already loaded media (None if no media)"""
+    if not media_records:
+        return None
+    return select(MediaRendition).where(
+        MediaRendition.media_id.in_([media.id for media in media_records])
+    )
+
+
+def to_post_media_public(
+    media: Media, renditions: List[MediaRendition]
+) -> PostMediaPublic:
+    return PostMediaPublic(
+        id=media.id,
+        media_type=media.media_type,
+        url=media.original_url,
+        thumbnail_url=media.thumbnail_url,
+        width=media.width,
+        height=media.height,
+        duration=media.duration,
+        placeholder=media.placeholder,
+        status=media.status,
+        renditions=[
+            MediaRenditionPublic.model_validate(rendition)
+            for rendition in sorted(
+                renditions, key=lambda rendition: (rendition.max_size, rendition.format)
+            )
+        ],
+    )
+
+
+def build_post_publics(
+    posts: List[Post],
+    media_records: List[Media],
+    renditions: List[MediaRendition] = (),
+) -> List[PostPublic]:
+    """Combine posts with their already loaded media into PostPublic models"""
+    media_by_id = {media.id: media for media in media_records}
+    renditions_by_media = defaultdict(list)
+    for rendition in renditions:
+        renditions_by_media[rendition.media_id].append(rendition)
+
+    post_publics = []
+    for post in posts:
+        # Keep the order of media_file_ids, skipping media that no longer exist
+        post_media = [
+            media_by_id[UUID(media_id)]
+            for media_id in post.media_file_ids or []
+            if UUID(media_id) in media_by_id
+        ]
+        post_publics.append(
+            PostPublic(
+                id=post.id,
+                profile_id=post.profile_id,
+                text=post.text,
+                created_at=post.created_at,
+                media_urls=[media.original_url for media in post_media],
+                media=[
+                    to_post_media_public(media, renditions_by_media[media.id])
+                    for media in post_media
+                ],
+            )
+        )
+    return post_publics
+
+
+def posts_to_post_public(posts: List[Post], session: Session) -> List[PostPublic]:
+    """Convert a page of Post models to PostPublic, resolving all media in one query"""
+    statement = select_post_media(posts)
+    media_records = session.exec(statement).all() if statement is not None else []
+    statement = select_media_renditions(media_records)
+    renditions = session.exec(statement).all() if statement is not None else []
+    return build_post_publics(posts, media_records, renditions)
 
 
 def post_to_post_public(post: Post, session: Session) -> PostPublic:
     """Convert Post model to PostPublic with media URLs"""
-    media_urls = []
-    if post.media_file_ids:
-        # Convert string IDs to UUID objects for query
-        media_uuids = [UUID(media_id) for media_id in post.media_file_ids]
-        media_records = session.exec(
-            select(Media).where(Media.id.in_(media_uuids))
-        ).all()
-        media_urls = [media.original_url for media in media_records]
-
-    return PostPublic(
-        id=post.id, profile_id=post.profile_id, text=post.text, media_urls=media_urls
+    return posts_to_post_public([post], session)[0]
+
+
+UPLOADS_DIR = "uploads"
+
+
+def ensure_upload_dirs() -> None:
+    """Create uploads directories if they don't exist"""
+    os.makedirs(f"{UPLOADS_DIR}/{TMP_DIR}", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/{RESUMABLE_DIR}", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/images/originals", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/images/thumbnails", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/images/renditions", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/videos/originals", exist_ok=True)
+    os.makedirs(f"{UPLOADS_DIR}/videos/thumbnails", exist_ok=True)
+
+
+def image_limits() -> ImageLimits:
+    """Configured limits checked from an image's header before it is decoded"""
+    return ImageLimits(
+        max_pixels=settings.image_max_pixels,
+        max_file_size=settings.image_max_file_size,
+        max_frames=settings.image_max_frames,
     )
 
 
+def preflight_upload(media_type: str, path: str) -> None:
+    """Reject an image over the pixel, byte or frame limits before any decode
+
+    Only the header is read. Files that are not readable images pass; they
+    are kept and marked failed by processing as before.
+    """
+    if media_type != "image":
+        return
+    try:
+        probe_image(path, image_limits())
+    except MediaProcessingError as e:
+        if e.stage == PREFLIGHT_STAGE:
+            raise HTTPException(status_code=413, detail=f"Image rejected: {e.reason}")
+
+
+def media_type_for(content_type: str | None) -> str | None:
+    """Media type stored for an upload's MIME type (None if unsupported)"""
+    if content_type and content_type.startswith("image/"):
+        return "image"
+    if content_type and content_type.startswith("video/"):
+        return "video"
+    return None
+
+
+def store_upload(
+    file: UploadFile, *, object_type: str, object_id: UUID, limiter: UploadLimiter
+) -> MediaCreate | None:
+    """Stream an uploaded file into the temporary directory and build its MediaCreate
+
+    The file is streamed to disk in chunks through the limiter, which enforces
+    the size limits and hashes the content on the way. Images over the pixel,
+    byte or frame limits are rejected from their header before any decode.
+    prepare_uploads later moves it to its content-addressed path, or
+    store_uploaded_content drops it if the same content is already stored.
+    Returns None for unsupported file types.
+    """
+    media_type = media_type_for(file.content_type)
+    if media_type is None:
+        return None
+
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    temp_name = f"{uuid4()}{file_extension}"
+    temp_url = f"/{UPLOADS_DIR}/{TMP_DIR}/{temp_name}"
+
+    # Stream original file to disk, computing its size and hash on the way
+    stored = limiter.save(file.file, upload_path(temp_url))
+    try:
+        preflight_upload(media_type, upload_path(temp_url))
+    except BaseException:
+        os.remove(upload_path(temp_url))
+        raise
+
+    return MediaCreate(
+        original_url=temp_url,
+        media_type=media_type,
+        file_size=stored.size,
+        filename=file.filename or temp_name,
+        content_type=file.content_type,
+        object_type=object_type,
+        object_id=object_id,
+        content_hash=stored.content_hash,
+    )
+
+
+def upload_path(url: str) -> str:
+    """Map an /uploads/... URL to its path on disk"""
+    return url.lstrip("/")
+
+
+def upload_url(path: str) -> str:
+    """Map a path under uploads/ to its /uploads/... URL"""
+    return f"/{path}"
+
+
+def content_urls(media_create: MediaBase) -> tuple[str, str | None]:
+    """Content-addressed URLs of an upload's original and thumbnail"""
+    extension = os.path.splitext(media_create.original_url)[1]
+    name = media_create.content_hash
+    media_dir = f"{UPLOADS_DIR}/{media_create.media_type}s"
+    original_url = upload_url(f"{media_dir}/originals/{name}{extension}")
+    thumbnail_url = None
+    if media_create.media_type == "image":
+        thumbnail_url = upload_url(f"{media_dir}/thumbnails/{name}.jpg")
+    # Video thumbnail generation can be added later with ffmpeg
+    return original_url, thumbnail_url
+
+
+def rendition_specs(original_url: str) -> List[RenditionSpec]:
+    """Renditions to create for an image, named after its original file"""
+    stem = os.path.splitext(os.path.basename(original_url))[0]
+    return [
+        RenditionSpec(
+            max_size=max_size,
+            format=image_format,
+            path=f"{UPLOADS_DIR}/images/renditions/{stem}_{max_size}.{image_format}",
+        )
+        for max_size in settings.media_rendition_sizes
+        for image_format in settings.media_rendition_formats
+    ]
+
+
+def media_job(media_create: MediaBase) -> MediaJob:
+    """Describe the metadata and thumbnail work for a saved upload"""
+    return MediaJob(
+        media_type=media_create.media_type,
+        original_path=upload_path(media_create.original_url),
+        thumbnail_path=(
+            upload_path(media_create.thumbnail_url)
+            if media_create.thumbnail_url
+            else None
+        ),
+        renditions=(
+            rendition_specs(media_create.original_url)
+            if media_create.media_type == "image"
+            else []
+        ),
+        limits=image_limits() if media_create.media_type == "image" else None,
+    )
+
+
+def enqueue_media_processing(session, db_media: Media) -> None:
+    """Queue background processing for a pending media row in the same transaction"""
+    enqueue_job(
+        session,
+        PROCESS_MEDIA_JOB,
+        {"media_id": str(db_media.id), **asdict(media_job(db_media))},
+        max_attempts=settings.job_max_attempts,
+    )
+
+
+def process_uploads(stored: List[MediaCreate]) -> None:
+    """Extract dimensions and create thumbnails for all files in parallel"""
+    jobs = [media_job(media_create) for media_create in stored]
+    executor = get_media_executor(settings.media_workers)
+    for media_create, result in zip(stored, process_media_batch(jobs, executor)):
+        media_create.width = result.width
+        media_create.height = result.height
+        media_create.duration = result.duration
+        media_create.video_codec = result.video_codec
+        media_create.placeholder = result.placeholder
+        media_create.renditions = [
+            MediaRenditionCreate(
+                url=upload_url(rendition.path),
+                format=rendition.format,
+                max_size=rendition.max_size,
+                width=rendition.width,
+                height=rendition.height,
+                file_size=rendition.file_size,
+            )
+            for rendition in result.renditions
+        ]
+        if result.error:
+            # Keep the original, but there is no thumbnail for it
+            logger.warning(
+                "Error processing media %s: %s", media_create.filename, result.error
+            )
+            media_create.status = MEDIA_FAILED
+            media_create.thumbnail_url = None
+
+
+def store_uploads(
+    files: List[UploadFile], *, object_type: str, object_id: UUID
+) -> List[MediaCreate]:
+    """Save all files of one request under the configured upload limits
+
+    Originals are streamed to the temporary directory one by one. If any file
+    is rejected, the files already saved for the request are removed.
+    Unsupported file types are skipped.
+    """
+    limiter = UploadLimiter(
+        max_file_size=settings.upload_max_file_size,
+        max_request_size=settings.upload_max_request_size,
+        chunk_size=settings.upload_chunk_size,
+    )
+    stored = []
+    try:
+        for file in files:
+            media_create = store_upload(
+                file, object_type=object_type, object_id=object_id, limiter=limiter
+            )
+            if media_create is not None:
+                stored.append(media_create)
+    except BaseException:
+        discard_stored_uploads(stored)
+        raise
+    return stored
+
+
+def prepare_uploads(stored: List[MediaCreate], *, process: bool = True) -> None:
+    """Move new uploads to their content-addressed paths and fill in their metadata
+
+    Content repeated within the request is processed once. New content is
+    processed in the media process pool, or with process=False left to the
+    background worker and marked pending.
+    """
+    new: dict[str, MediaCreate] = {}
+    repeated = []
+    for media_create in stored:
+        temp_path = upload_path(media_create.original_url)
+        if media_create.content_hash in new:
+            os.remove(temp_path)
+            repeated.append(media_create)
+        else:
+            original_url, thumbnail_url = content_urls(media_create)
+            os.replace(temp_path, upload_path(original_url))
+            media_create.original_url = original_url
+            media_create.thumbnail_url = thumbnail_url
+            new[media_create.content_hash] = media_create
+
+    if process:
+        process_uploads(list(new.values()))
+    else:
+        for media_create in new.values():
+            media_create.status = MEDIA_PENDING
+
+    for media_create in repeated:
+        source = new[media_create.content_hash]
+        copy_processed(media_create, source)
+        media_create.renditions = list(source.renditions)
+
+
+def claimed_blobs(session: Session, stored: List[MediaCreate]) -> dict[str, MediaBlob]:
+    """Claim references to the already stored content of an upload in one statement
+
+    The claimed blobs cannot be removed by the garbage collector before the
+    current transaction commits. Content without a usable blob (new, collected
+    or failed) is not returned.
+    """
+    statement = claim_blobs(media_create.content_hash for media_create in stored)
+    if statement is None:
+        return {}
+    return {blob.content_hash: blob for blob in session.exec(statement).scalars()}
+
+
+def store_uploaded_content(
+    stored: List[MediaCreate], blobs: dict[str, MediaBlob]
+) -> List[MediaCreate]:
+    """Point uploads of already stored content at their blobs and prepare the rest
+
+    blobs must be claimed (claimed_blobs) in the current transaction: the
+    uploaded copy of their content is dropped and the metadata, thumbnail and
+    renditions come from the blob. The other uploads are moved to their
+    content-addressed paths and processed (prepare_uploads) and returned, since
+    they still need their blob references. Only file work is done here, so the
+    async router can run it off the event loop.
+    """
+    new = []
+    for media_create in stored:
+        blob = blobs.get(media_create.content_hash)
+        if blob is None:
+            new.append(media_create)
+            continue
+        os.remove(upload_path(media_create.original_url))
+        copy_processed(media_create, blob)
+        media_create.renditions = blob_renditions(blob)
+    prepare_uploads(new, process=not settings.media_background_processing)
+    return new
+
+
+def discard_stored_uploads(stored: List[MediaCreate]) -> None:
+    """Remove the temporary files of a failed upload
+
+    Files already moved to their content-addressed paths may be shared with
+    other uploads, so they are left to the blob garbage collector.
+    """
+    for media_create in stored:
+        path = upload_path(media_create.original_url)
+        if path.startswith(f"{UPLOADS_DIR}/{TMP_DIR}/"):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def blob_refs_statement(dialect_name: str, stored_media: List[MediaCreate]):
+    """Statement that adds a blob reference for each stored upload (or None)"""
+    return add_blob_refs(
+        dialect_name,
+        [
+            blob_values(media_create, media_create.renditions)
+            for media_create in stored_media
+        ],
+    )
+
+
+def stage_media(
+    session, stored_media: List[MediaCreate]
+) -> tuple[List[Media], List[MediaRendition]]:
+    """Add media and rendition rows and their processing jobs to the session
+
+    Nothing is flushed here; the caller commits everything as one unit of work,
+    so the media and rendition rows each go out in a single batched INSERT.
+    Pending media (not processed yet) get a background job.
+    """
+    db_media = []
+    db_renditions = []
+    for media_create in stored_media:
+        media = Media.model_validate(media_create)
+        db_media.append(media)
+        db_renditions += [
+            MediaRendition.model_validate(rendition, update={"media_id": media.id})
+            for rendition in media_create.renditions
+        ]
+    session.add_all(db_media)
+    session.add_all(db_renditions)
+    for media in db_media:
+        if media.status == MEDIA_PENDING:
+            enqueue_media_processing(session, media)
+    return db_media, db_renditions
+
+
+def stage_stored_media(
+    session: Session, stored_media: List[MediaCreate], new: List[MediaCreate]
+) -> tuple[List[Media], List[MediaRendition]]:
+    """Stage the media rows of saved uploads and the blob references of new content"""
+    db_media, db_renditions = stage_media(session, stored_media)
+    statement = blob_refs_statement(session.get_bind().dialect.name, new)
+    if statement is not None:
+        session.exec(statement)
+    return db_media, db_renditions
+
+
+def stage_uploaded_media(
+    session: Session, stored_media: List[MediaCreate]
+) -> tuple[List[Media], List[MediaRendition]]:
+    """Process saved uploads and stage their media rows and blob references
+
+    Identical content already stored is reused instead of processed again.
+    The blob references are added with one statement; the caller commits.
+    The async router runs the same three steps, with the file work off the
+    event loop.
+    """
+    new = store_uploaded_content(stored_media, claimed_blobs(session, stored_media))
+    return stage_stored_media(session, stored_media, new)
+
+
+def stage_post(session, db_post: Post, db_media: List[Media]) -> None:
+    """Add a post that lists the given media, in order, to the session"""
+    db_post.media_file_ids = [str(media.id) for media in db_media]
+    session.add(db_post)
+
+
 router = APIRouter()
 
 
@@ -43,7 +532,8 @@ def create_post(
     session: Session = Depends(get_session),
     text: str | None = Form(None),
     profile_id: str = Form(...),
-    files: List[UploadFile] = File(...),
+    files: List[UploadFile] = File([]),
+    media_ids: List[UUID] = Form([]),
 ):
     # Validate that the profile exists
     try:
@@ -55,104 +545,61 @@ def create_post(
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    # Create uploads directory if it doesn't exist
-    uploads_dir = "uploads"
-    os.makedirs(f"{uploads_dir}/images/originals", exist_ok=True)
-    os.makedirs(f"{uploads_dir}/images/thumbnails", exist_ok=True)
-    os.makedirs(f"{uploads_dir}/videos/originals", exist_ok=True)
-    os.makedirs(f"{uploads_dir}/videos/thumbnails", exist_ok=True)
+    ensure_upload_dirs()
 
-    # Create post first
     post_create = PostCreate(text=text, profile_id=UUID(profile_id))
     db_post = Post.model_validate(post_create)
-    session.add(db_post)
-    session.commit()
-    session.refresh(db_post)
-
-    # Process and save files
-    media_file_ids = []
-    for file in files:
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid4()}{file_extension}"
-
-        # Determine file type and save accordingly
-        if file.content_type and file.content_type.startswith("image/"):
-            original_path = f"{uploads_dir}/images/originals/{unique_filename}"
-            media_type = "image"
-        elif file.content_type and file.content_type.startswith("video/"):
-            original_path = f"{uploads_dir}/videos/originals/{unique_filename}"
-            media_type = "video"
-        else:
-            # Skip unsupported file types
-            continue
 
-        # Save original file
-        with open(original_path, "wb") as buffer:
-            content = file.file.read()
-            buffer.write(content)
-
-        # Get file size
-        file_size = os.path.getsize(original_path)
-
-        # Extract metadata and create thumbnail for images
-        thumbnail_url = None
-        width = None
-        height = None
-
-        if media_type == "image":
-            # Get image dimensions
-            width, height = get_image_dimensions(original_path)
-
-            # Create thumbnail
-            thumbnail_filename = f"{uuid4()}.jpg"
-            thumbnail_path = f"{uploads_dir}/images/thumbnails/{thumbnail_filename}"
-            created_thumbnail_path = create_thumbnail(original_path, thumbnail_path)
-            thumbnail_url = f"/uploads/images/thumbnails/{thumbnail_filename}"
-        elif media_type == "video":
-            # For videos, we'll set default dimensions for now
-            # Video thumbnail generation can be added later with ffmpeg
-            width, height = 1280, 720  # Default video dimensions
-            thumbnail_url = None  # Will be implemented later
-
-        # Create media record with complete metadata
-        media_create = MediaCreate(
-            original_url=f"/uploads/{media_type}s/originals/{unique_filename}",
-            thumbnail_url=thumbnail_url,
-            media_type=media_type,
-            file_size=file_size,
-            width=width,
-            height=height,
-            filename=file.filename or unique_filename,
-            content_type=file.content_type,
+    # Save files before creating the post, so an upload rejected by the size
+    # limits leaves no post behind
+    stored_media = store_uploads(files, object_type="post", object_id=db_post.id)
+    try:
+        # Media uploaded beforehand through POST /media/ come first, in order
+        attached = attach_media(
+            session,
+            media_ids,
+            profile_id=profile_uuid,
             object_type="post",
             object_id=db_post.id,
         )
-        db_media = Media.model_validate(media_create)
-        session.add(db_media)
-        session.commit()
-        session.refresh(db_media)
-
-        # Add media ID to post (as string)
-        media_file_ids.append(str(db_media.id))
+        statement = select_media_renditions(attached)
+        attached_renditions = (
+            session.exec(statement).all() if statement is not None else []
+        )
 
-    # Update post with media file IDs (as strings)
-    db_post.media_file_ids = media_file_ids
-    session.commit()
-    session.refresh(db_post)
+        db_media, db_renditions = stage_uploaded_media(session, stored_media)
+        stage_post(session, db_post, attached + db_media)
+        post_public = build_post_publics(
+            [db_post], attached + db_media, [*attached_renditions, *db_renditions]
+        )[0]
+        # The post, its media rows, blob references and jobs are written in one commit
+        session.commit()
+    except BaseException:
+        discard_stored_uploads(stored_media)
+        raise
 
-    return post_to_post_public(db_post, session)
+    return post_public
 
 
 @router.get("/posts/", response_model=list[PostPublic])
 def read_posts(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, le=100),
+    after: str | None = None,
 ):
-    posts = session.exec(select(Post).offset(offset).limit(limit)).all()
-    return [post_to_post_public(post, session) for post in posts]
+    posts = paginate(
+        session,
+        select(Post),
+        POST_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
+    return posts_to_post_public(posts, session)
 
 
 @router.get("/posts/{post_id}", response_model=PostPublic)
@@ -0,0 +1,149 @@
+from fastapi import (
+    Depends,
+    APIRouter,
+    HTTPException,
+    Query,
+    File,
+    UploadFile,
+    Form,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from typing import List
+
+from ..models.profile import Profile
+from ..models.post import (
+    Post,
+    PostPublic,
+    PostCreate,
+)
+from ..database import get_async_session
+from ..utils.pagination import paginate_async
+from ..utils.attachments import attach_media_async
+from .posts import (
+    POST_SORT_KEY,
+    build_post_publics,
+    claimed_blobs,
+    discard_stored_uploads,
+    ensure_upload_dirs,
+    select_media_renditions,
+    select_post_media,
+    stage_post,
+    stage_stored_media,
+    store_uploaded_content,
+    store_uploads,
+)
+
+
+async def posts_to_post_public(
+    posts: List[Post], session: AsyncSession
+) -> List[PostPublic]:
+    """Convert a page of Post models to PostPublic, resolving all media in one query"""
+    statement = select_post_media(posts)
+    media_records = (
+        (await session.exec(statement)).all() if statement is not None else []
+    )
+    statement = select_media_renditions(media_records)
+    renditions = (await session.exec(statement)).all() if statement is not None else []
+    return build_post_publics(posts, media_records, renditions)
+
+
+# settings.async_database가 켜져 있을 때 posts 라우터 대신 사용되는 비동기 버전
+router = APIRouter()
+
+
+@router.post("/posts/", response_model=PostPublic)
+async def create_post(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    text: str | None = Form(None),
+    profile_id: str = Form(...),
+    files: List[UploadFile] = File([]),
+    media_ids: List[UUID] = Form([]),
+):
+    # Validate that the profile exists
+    try:
+        profile_uuid = UUID(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid profile_id format")
+
+    profile = await session.get(Profile, profile_uuid)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    ensure_upload_dirs()
+
+    post_create = PostCreate(text=text, profile_id=profile_uuid)
+    db_post = Post.model_validate(post_create)
+
+    # Save files before creating the post (file I/O and thumbnails run off the
+    # event loop), so an upload rejected by the size limits leaves no post behind
+    stored_media = await run_in_threadpool(
+        store_uploads, files, object_type="post", object_id=db_post.id
+    )
+    try:
+        # Media uploaded beforehand through POST /media/ come first, in order
+        attached = await attach_media_async(
+            session,
+            media_ids,
+            profile_id=profile_uuid,
+            object_type="post",
+            object_id=db_post.id,
+        )
+        statement = select_media_renditions(attached)
+        attached_renditions = (
+            (await session.exec(statement)).all() if statement is not None else []
+        )
+
+        # The same steps as stage_uploaded_media, with the file work off the
+        # event loop: identical content already stored is claimed and reused
+        blobs = await session.run_sync(claimed_blobs, stored_media)
+        new = await run_in_threadpool(store_uploaded_content, stored_media, blobs)
+        db_media, db_renditions = await session.run_sync(
+            stage_stored_media, stored_media, new
+        )
+        stage_post(session, db_post, attached + db_media)
+        post_public = build_post_publics(
+            [db_post], attached + db_media, [*attached_renditions, *db_renditions]
+        )[0]
+        # The post, its media rows, blob references and jobs are written in one commit
+        await session.commit()
+    except BaseException:
+        discard_stored_uploads(stored_media)
+        raise
+
+    return post_public
+
+
+@router.get("/posts/", response_model=list[PostPublic])
+async def read_posts(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    offset: int = 0,
+    limit: int = Query(default=100, le=100),
+    after: str | None = None,
+):
+    posts = await paginate_async(
+        session,
+        select(Post),
+        POST_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
+    return await posts_to_post_public(posts, session)
+
+
+@router.get("/posts/{post_id}", response_model=PostPublic)
+async def read_post(
+    *, session: AsyncSession = Depends(get_async_session), post_id: UUID
+):
+    post = await session.get(Post, post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return (await posts_to_post_public([post], session))[0]
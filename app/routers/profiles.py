@@ -1,4 +1,4 @@
-from fastapi import Depends, APIRouter, HTTPException, Query
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
 from sqlmodel import Session, select
 from uuid import UUID
 from ..models.profile import (
@@ -12,7 +12,11 @@ from ..models.post import (
     PostPublic,
 )
 from ..database import get_session
-from ..routers.posts import post_to_post_public
+from ..routers.posts import posts_to_post_public
+from ..utils.pagination import paginate
+
+# 커서 페이지네이션 정렬 키
+PROFILE_SORT_KEY = (Profile.id,)
 
 
 router = APIRouter()
@@ -35,10 +39,20 @@ def create_profile(*, session: Session = Depends(get_session), profile: ProfileC
 def read_profiles(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=100, le=100),
+    after: str | None = None,
 ):
-    profiles = session.exec(select(Profile).offset(offset).limit(limit)).all()
+    profiles = paginate(
+        session,
+        select(Profile),
+        PROFILE_SORT_KEY,
+        response=response,
+        offset=offset,
+        limit=limit,
+        after=after,
+    )
     return profiles
 
 
@@ -88,4 +102,4 @@ def read_profile_posts(*, session: Session = Depends(get_session), profile_id: U
     profile: Profile = session.get(Profile, profile_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return [post_to_post_public(post, session) for post in profile.posts]
+    return posts_to_post_public(profile.posts, session)
@@ -0,0 +1,278 @@
+import os
+from contextlib import suppress
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlmodel import Session
+
+from ..config import settings
+from ..database import get_session
+from ..models.media import MEDIA_UNATTACHED, MediaCreate, MediaPublic, ResumableUpload
+from ..models.profile import Profile
+from ..utils.blob_store import RESUMABLE_DIR, TMP_DIR
+from ..utils.resumable import (
+    OFFSET_CONTENT_TYPE,
+    TUS_VERSION,
+    append_stream,
+    lock_upload_file,
+    parse_upload_metadata,
+)
+from ..utils.uploads import hash_file
+from .posts import (
+    UPLOADS_DIR,
+    ensure_upload_dirs,
+    media_type_for,
+    preflight_upload,
+    stage_uploaded_media,
+    upload_path,
+)
+
+router = APIRouter()
+
+
+def partial_path(upload_id: UUID) -> str:
+    """Path of the file an upload's chunks are appended to"""
+    return f"{UPLOADS_DIR}/{RESUMABLE_DIR}/{upload_id}"
+
+
+def tus_headers(upload: ResumableUpload) -> dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store",
+    }
+
+
+def get_upload(session: Session, upload_id: UUID) -> ResumableUpload:
+    upload = session.get(ResumableUpload, upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+def advance_offset(session: Session, upload: ResumableUpload, written: int) -> bool:
+    """Record the appended bytes, unless another request moved the offset first"""
+    result = session.exec(
+        update(ResumableUpload)
+        .where(ResumableUpload.id == upload.id)
+        .where(ResumableUpload.offset == upload.offset)
+        .values(
+            offset=ResumableUpload.offset + written,
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+    session.commit()
+    session.refresh(upload)
+    return result.rowcount == 1
+
+
+def claim_upload(session: Session, upload: ResumableUpload) -> bool:
+    """Delete a complete upload in the current transaction, unless already claimed
+
+    Concurrent finalize requests race on this statement: only one of them
+    deletes the row, and a rollback puts it back.
+    """
+    claimed = session.exec(
+        delete(ResumableUpload)
+        .where(ResumableUpload.id == upload.id)
+        .where(ResumableUpload.offset == ResumableUpload.length)
+        .returning(ResumableUpload.id)
+    ).first()
+    return claimed is not None
+
+
+@router.post("/media/uploads", status_code=201)
+def create_upload(
+    *,
+    session: Session = Depends(get_session),
+    upload_length: int = Header(ge=0),
+    upload_metadata: str | None = Header(None),
+):
+    """Start a resumable upload (tus creation)
+
+    Upload-Metadata carries profile_id, filename and filetype. The response
+    Location is the upload URL that the chunks are sent to.
+    """
+    try:
+        metadata = parse_upload_metadata(upload_metadata)
+        profile_uuid = UUID(metadata.get("profile_id", ""))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid Upload-Metadata")
+
+    profile = session.get(Profile, profile_uuid)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    content_type = metadata.get("filetype", "")
+    media_type = media_type_for(content_type)
+    if media_type is None:
+        raise HTTPException(status_code=415, detail="Unsupported file type")
+    max_file_size = settings.upload_max_file_size
+    if media_type == "image":
+        max_file_size = min(max_file_size, settings.image_max_file_size)
+    if upload_length > max_file_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {max_file_size} byte limit",
+        )
+
+    ensure_upload_dirs()
+    upload = ResumableUpload(
+        profile_id=profile_uuid,
+        filename=metadata.get("filename") or "upload",
+        content_type=content_type,
+        media_type=media_type,
+        length=upload_length,
+    )
+    # Create the (empty) file first, so a row never points at a missing file
+    open(partial_path(upload.id), "wb").close()
+    session.add(upload)
+    session.commit()
+
+    return Response(
+        status_code=201,
+        headers={
+            **tus_headers(upload),
+            "Location": f"/media/uploads/{upload.id}",
+        },
+    )
+
+
+@router.head("/media/uploads/{upload_id}")
+def read_upload_offset(*, session: Session = Depends(get_session), upload_id: UUID):
+    # Clients resume from Upload-Offset after a dropped connection
+    upload = get_upload(session, upload_id)
+    return Response(headers=tus_headers(upload))
+
+
+@router.patch("/media/uploads/{upload_id}", status_code=204)
+async def append_upload(
+    *,
+    session: Session = Depends(get_session),
+    request: Request,
+    upload_id: UUID,
+    upload_offset: int = Header(),
+    content_type: str = Header(),
+    content_length: int | None = Header(None),
+):
+    """Append a chunk at Upload-Offset, streaming the body straight to disk"""
+    if content_type != OFFSET_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=415, detail=f"Content-Type must be {OFFSET_CONTENT_TYPE}"
+        )
+
+    # One writer per file, across worker processes as well
+    try:
+        lock = await run_in_threadpool(lock_upload_file, partial_path(upload_id))
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="Upload is locked")
+    except FileNotFoundError:
+        # Expired and removed by the garbage collector
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    try:
+        # Read under the lock, so no other request moves the offset meanwhile
+        upload = await run_in_threadpool(get_upload, session, upload_id)
+        if upload_offset != upload.offset:
+            raise HTTPException(status_code=409, detail="Upload-Offset does not match")
+
+        # Each request is capped, so a dropped connection costs at most one chunk
+        max_size = min(
+            settings.resumable_upload_max_chunk_size, upload.length - upload.offset
+        )
+        if content_length is not None and content_length > max_size:
+            raise HTTPException(
+                status_code=413, detail=f"Chunk exceeds the {max_size} byte limit"
+            )
+
+        try:
+            result = await append_stream(
+                partial_path(upload_id),
+                upload.offset,
+                request.stream(),
+                max_size=max_size,
+                buffer_size=settings.upload_chunk_size,
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        # Bytes received before a dropped connection are kept as well
+        advanced = await run_in_threadpool(
+            advance_offset, session, upload, result.written
+        )
+    finally:
+        await run_in_threadpool(lock.close)
+
+    if not advanced:
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match")
+    return Response(status_code=204, headers=tus_headers(upload))
+
+
+@router.delete("/media/uploads/{upload_id}", status_code=204)
+def delete_upload(*, session: Session = Depends(get_session), upload_id: UUID):
+    # tus termination: the client gives up on the upload
+    upload = get_upload(session, upload_id)
+    session.delete(upload)
+    session.commit()
+    with suppress(FileNotFoundError):
+        os.remove(partial_path(upload_id))
+    return Response(status_code=204, headers={"Tus-Resumable": TUS_VERSION})
+
+
+@router.post("/media/uploads/{upload_id}/finalize", response_model=MediaPublic)
+def finalize_upload(*, session: Session = Depends(get_session), upload_id: UUID):
+    """Turn a complete upload into a media row
+
+    The result is the same as uploading the file through POST /media/: the
+    media belongs to the profile until a post, comment or message attaches it.
+    """
+    upload = get_upload(session, upload_id)
+    if upload.offset != upload.length:
+        raise HTTPException(status_code=409, detail="Upload is incomplete")
+    if not claim_upload(session, upload):
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Upload is being finalized")
+
+    ensure_upload_dirs()
+    path = partial_path(upload_id)
+    try:
+        preflight_upload(upload.media_type, path)
+    except HTTPException:
+        # The content itself is rejected, so the upload cannot be retried
+        session.commit()
+        os.remove(path)
+        raise
+    stored = hash_file(path, settings.upload_chunk_size)
+    extension = os.path.splitext(upload.filename)[1].lower()
+    temp_url = f"/{UPLOADS_DIR}/{TMP_DIR}/{uuid4()}{extension}"
+    os.replace(path, upload_path(temp_url))
+    stored_media = [
+        MediaCreate(
+            original_url=temp_url,
+            media_type=upload.media_type,
+            file_size=stored.size,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            object_type=MEDIA_UNATTACHED,
+            object_id=upload.profile_id,
+            content_hash=stored.content_hash,
+        )
+    ]
+    try:
+        db_media, _ = stage_uploaded_media(session, stored_media)
+        media_public = MediaPublic.model_validate(db_media[0])
+        # The media row, blob reference and upload removal are one commit
+        session.commit()
+    except BaseException:
+        # The rollback restores the upload row; put the file back as well
+        # (unless already moved to its content-addressed path) so that
+        # finalize can be retried
+        session.rollback()
+        with suppress(FileNotFoundError):
+            os.replace(upload_path(temp_url), path)
+        raise
+
+    return media_public
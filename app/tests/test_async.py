@@ -0,0 +1,205 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..database import get_async_session
+from ..models.media import MEDIA_UNATTACHED, Media
+from ..models.profile import Profile
+from ..routers.chats_async import (
+    get_async_message_writer,
+    make_async_message_writer,
+    router as chats_router,
+)
+from ..routers.comments_async import router as comments_router
+from ..routers.posts_async import router as posts_router
+
+
+@pytest.fixture(name="database_path")
+def database_path_fixture(tmp_path):
+    database_path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{database_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.add(Profile(name="TestUser2", bio="Test Bio 2"))
+        session.commit()
+    engine.dispose()
+    return database_path
+
+
+@pytest.fixture(name="profiles")
+def profiles_fixture(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with Session(engine) as session:
+        profiles = session.exec(select(Profile)).all()
+    engine.dispose()
+    return profiles
+
+
+@pytest.fixture(name="client")
+def client_fixture(database_path):
+    # 요청마다 TestClient의 이벤트 루프에서 새 aiosqlite 연결을 연다
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(chats_router)
+    app.include_router(posts_router)
+    app.include_router(comments_router)
+    message_writer = make_async_message_writer(async_engine)
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    app.dependency_overrides[get_async_message_writer] = lambda: message_writer
+    with TestClient(app) as client:
+        yield client
+
+
+def test_async_chat_and_messages(client: TestClient, profiles: list):
+    response = client.post(
+        "/chats/",
+        json={
+            "name": "Async Chat",
+            "profile_ids": [str(profiles[0].id), str(profiles[1].id)],
+        },
+    )
+    assert response.status_code == 200
+    chat = response.json()
+
+    for text in ("First Message", "Second Message"):
+        response = client.post(
+            "/messages/",
+            json={
+                "text": text,
+                "chat_id": chat["id"],
+                "profile_id": str(profiles[0].id),
+            },
+        )
+        assert response.status_code == 200
+
+    response = client.get(f"/chats/{chat['id']}/messages/")
+    assert response.status_code == 200
+    assert [message["text"] for message in response.json()] == [
+        "First Message",
+        "Second Message",
+    ]
+
+    response = client.get("/messages/", params={"after": "", "limit": 1})
+    assert response.json()[0]["text"] == "First Message"
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_async_websocket_message(client: TestClient, profiles: list):
+    chat = client.post(
+        "/chats/", json={"name": "Live", "profile_ids": [str(profiles[0].id)]}
+    ).json()
+
+    with client.websocket_connect(f"/ws/{chat['id']}") as websocket:
+        websocket.send_json({"profile_id": str(profiles[0].id), "text": "Hello"})
+        message = websocket.receive_json()
+
+    assert message["text"] == "Hello"
+    response = client.get(f"/chats/{chat['id']}/messages/")
+    assert [message["text"] for message in response.json()] == ["Hello"]
+
+
+def test_async_post_and_comments(client: TestClient, profiles: list):
+    fake_image = io.BytesIO(b"fake image content")
+    fake_image.name = "test.jpg"
+    fake_image.content_type = "image/jpeg"
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Async post", "profile_id": str(profiles[0].id)},
+        files=[("files", fake_image)],
+    )
+    assert response.status_code == 200
+    post = response.json()
+    assert post["text"] == "Async post"
+    assert len(post["media_urls"]) == 1
+
+    response = client.get(f"/posts/{post['id']}")
+    assert response.json()["media_urls"] == post["media_urls"]
+
+    response = client.post(
+        "/comments/",
+        json={"text": "Nice", "post_id": post["id"], "profile_id": str(profiles[1].id)},
+    )
+    assert response.status_code == 200
+    comment = response.json()
+
+    response = client.get(f"/comments/post/{post['id']}")
+    assert [item["id"] for item in response.json()] == [comment["id"]]
+
+    response = client.delete(f"/comments/{comment['id']}")
+    assert response.json() == {"ok": True}
+    assert client.get(f"/comments/{comment['id']}").status_code == 404
+
+
+def test_async_post_and_comment_attach_media(
+    client: TestClient, database_path, profiles: list
+):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with Session(engine) as session:
+        uploaded = [
+            Media(
+                original_url=f"/uploads/images/originals/{index}.png",
+                media_type="image",
+                filename=f"{index}.png",
+                object_type=MEDIA_UNATTACHED,
+                object_id=profiles[0].id,
+            )
+            for index in range(2)
+        ]
+        session.add_all(uploaded)
+        session.commit()
+        media_ids = [str(media.id) for media in uploaded]
+    engine.dispose()
+
+    response = client.post(
+        "/posts/",
+        data={"profile_id": str(profiles[0].id), "media_ids": media_ids[:1]},
+    )
+    assert response.status_code == 200
+    post = response.json()
+    assert [item["id"] for item in post["media"]] == media_ids[:1]
+
+    comment = {"text": "Async", "post_id": post["id"]}
+    # 다른 프로필의 미디어는 연결할 수 없다
+    response = client.post(
+        "/comments/",
+        json={
+            **comment,
+            "profile_id": str(profiles[1].id),
+            "media_file_ids": media_ids[1:],
+        },
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/comments/",
+        json={
+            **comment,
+            "profile_id": str(profiles[0].id),
+            "media_file_ids": media_ids[1:],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["media_file_ids"] == media_ids[1:]
+
+    # 댓글을 지우면 연결된 미디어도 지워진다
+    response = client.delete(f"/comments/{response.json()['id']}")
+    assert response.json() == {"ok": True}
+    engine = create_engine(f"sqlite:///{database_path}")
+    with Session(engine) as session:
+        remaining = [str(media.id) for media in session.exec(select(Media))]
+    engine.dispose()
+    assert remaining == media_ids[:1]
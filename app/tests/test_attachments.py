@@ -0,0 +1,225 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..database import get_session
+from ..main import app
+from ..models.chat import Message
+from ..models.media import MEDIA_UNATTACHED, Media, MediaBlob, MediaRendition
+from ..models.profile import Profile
+from ..routers.chats import get_message_writer, make_message_writer
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.add(Profile(name="TestUser2", bio="Test Bio 2"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session):
+    def get_session_override():
+        return session
+
+    message_writer = make_message_writer(session.get_bind())
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_message_writer] = lambda: message_writer
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="profiles")
+def profiles_fixture(session: Session):
+    return session.exec(select(Profile).order_by(Profile.name)).all()
+
+
+def upload_media(client: TestClient, profile: Profile, count: int = 1) -> list[dict]:
+    files = []
+    for index in range(count):
+        image = io.BytesIO()
+        Image.new("RGB", (64 + index, 48), (index * 60, 90, 160)).save(image, "PNG")
+        files.append(("files", (f"photo{index}.png", image.getvalue(), "image/png")))
+    response = client.post("/media/", data={"profile_id": str(profile.id)}, files=files)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_upload_media_returns_unattached_media(
+    client: TestClient, session: Session, profiles: list
+):
+    uploaded = upload_media(client, profiles[0], count=2)
+
+    assert [item["filename"] for item in uploaded] == ["photo0.png", "photo1.png"]
+    assert all(item["status"] == "ready" for item in uploaded)
+    assert (uploaded[0]["width"], uploaded[0]["height"]) == (64, 48)
+    # 연결 전에는 올린 프로필이 주인이다
+    assert all(item["object_type"] == MEDIA_UNATTACHED for item in uploaded)
+    assert all(item["object_id"] == str(profiles[0].id) for item in uploaded)
+    assert client.get(f"/media/{uploaded[0]['id']}").status_code == 200
+
+
+def test_upload_media_requires_existing_profile(client: TestClient):
+    response = client.post(
+        "/media/",
+        data={"profile_id": "00000000-0000-0000-0000-000000000000"},
+        files=[("files", ("a.png", b"png", "image/png"))],
+    )
+    assert response.status_code == 404
+
+
+def test_create_post_attaches_uploaded_media(
+    client: TestClient, session: Session, profiles: list
+):
+    uploaded = upload_media(client, profiles[0], count=2)
+    media_ids = [uploaded[1]["id"], uploaded[0]["id"]]
+
+    response = client.post(
+        "/posts/",
+        data={
+            "text": "Attached",
+            "profile_id": str(profiles[0].id),
+            "media_ids": media_ids,
+        },
+    )
+
+    assert response.status_code == 200
+    post = response.json()
+    # 요청한 순서대로 붙고 렌디션도 함께 반환된다
+    assert [item["id"] for item in post["media"]] == media_ids
+    assert len(post["media"][0]["renditions"]) == 6
+    for media_id in media_ids:
+        media = client.get(f"/media/{media_id}").json()
+        assert (media["object_type"], media["object_id"]) == ("post", post["id"])
+    assert client.get(f"/posts/{post['id']}").json()["media"] == post["media"]
+
+
+def test_attach_rejects_foreign_or_attached_media(
+    client: TestClient, session: Session, profiles: list
+):
+    mine = upload_media(client, profiles[0])[0]["id"]
+    theirs = upload_media(client, profiles[1])[0]["id"]
+
+    response = client.post(
+        "/posts/",
+        data={"profile_id": str(profiles[0].id), "media_ids": [mine, theirs]},
+    )
+    assert response.status_code == 400
+    # 일부만 연결되지 않는다
+    assert client.get(f"/media/{mine}").json()["object_type"] == MEDIA_UNATTACHED
+
+    first = client.post(
+        "/posts/", data={"profile_id": str(profiles[0].id), "media_ids": [mine]}
+    )
+    assert first.status_code == 200
+    again = client.post(
+        "/posts/", data={"profile_id": str(profiles[0].id), "media_ids": [mine]}
+    )
+    assert again.status_code == 400
+
+
+def test_create_comment_and_message_attach_media(
+    client: TestClient, session: Session, profiles: list
+):
+    post = client.post(
+        "/posts/", data={"text": "Post", "profile_id": str(profiles[0].id)}
+    ).json()
+    comment_media, message_media = upload_media(client, profiles[0], count=2)
+
+    comment = client.post(
+        "/comments/",
+        json={
+            "text": "Look",
+            "post_id": post["id"],
+            "profile_id": str(profiles[0].id),
+            "media_file_ids": [comment_media["id"]],
+        },
+    )
+    assert comment.status_code == 200
+    assert comment.json()["media_file_ids"] == [comment_media["id"]]
+
+    chat = client.post(
+        "/chats/", json={"name": "Chat", "profile_ids": [str(profiles[0].id)]}
+    ).json()
+    message = client.post(
+        "/messages/",
+        json={
+            "text": "Look",
+            "chat_id": chat["id"],
+            "profile_id": str(profiles[0].id),
+            "media_file_ids": [message_media["id"]],
+        },
+    )
+    assert message.status_code == 200
+    assert message.json()["media_file_ids"] == [message_media["id"]]
+
+    media = {item.id.hex: item for item in session.exec(select(Media)).all()}
+    assert media[comment_media["id"].replace("-", "")].object_type == "comment"
+    assert media[message_media["id"].replace("-", "")].object_type == "message"
+
+
+def test_delete_comment_releases_attached_media(
+    client: TestClient, session: Session, profiles: list
+):
+    post = client.post(
+        "/posts/", data={"text": "Post", "profile_id": str(profiles[0].id)}
+    ).json()
+    uploaded = upload_media(client, profiles[0])[0]
+    comment = client.post(
+        "/comments/",
+        json={
+            "text": "Look",
+            "post_id": post["id"],
+            "profile_id": str(profiles[0].id),
+            "media_file_ids": [uploaded["id"]],
+        },
+    ).json()
+
+    response = client.delete(f"/comments/{comment['id']}")
+    assert response.json() == {"ok": True}
+
+    # 미디어와 렌디션 행이 지워지고 blob 참조가 놓인다
+    assert session.exec(select(Media)).all() == []
+    assert session.exec(select(MediaRendition)).all() == []
+    blob = session.exec(select(MediaBlob)).one()
+    assert blob.ref_count == 0
+    assert blob.released_at is not None
+
+
+def test_websocket_message_attaches_media(
+    client: TestClient, session: Session, profiles: list
+):
+    uploaded = upload_media(client, profiles[0])[0]["id"]
+    foreign = upload_media(client, profiles[1])[0]["id"]
+    chat = client.post(
+        "/chats/", json={"name": "Live", "profile_ids": [str(profiles[0].id)]}
+    ).json()
+
+    with client.websocket_connect(f"/ws/{chat['id']}") as websocket:
+        websocket.send_json(
+            {
+                "profile_id": str(profiles[0].id),
+                "text": "Photo",
+                "media_file_ids": [uploaded, foreign, "not-a-uuid"],
+            }
+        )
+        received = websocket.receive_json()
+
+    # WebSocket에는 오류 응답이 없으므로 연결할 수 있는 미디어만 남는다
+    assert received["media_file_ids"] == [uploaded]
+    stored = session.exec(select(Message)).one()
+    assert stored.media_file_ids == [uploaded]
+    session.expire_all()
+    assert client.get(f"/media/{uploaded}").json()["object_type"] == "message"
+    assert client.get(f"/media/{foreign}").json()["object_type"] == MEDIA_UNATTACHED
@@ -0,0 +1,367 @@
+import io
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..database import get_session
+from ..main import app
+from ..models.media import (
+    MEDIA_FAILED,
+    MEDIA_READY,
+    MEDIA_UNATTACHED,
+    Media,
+    MediaBlob,
+    MediaRendition,
+    ResumableUpload,
+)
+from ..models.profile import Profile
+from ..routers import posts
+from ..utils.blob_store import collect_garbage, release_blobs
+
+HASH_A = "a" * 64
+HASH_B = "b" * 64
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session):
+    def get_session_override():
+        return session
+
+    app.dependency_overrides[get_session] = get_session_override
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="processed")
+def processed_fixture(monkeypatch):
+    """실제로 처리(디코딩)된 파일 경로들을 기록한다"""
+    processed = []
+    process_media_batch = posts.process_media_batch
+
+    def counting_batch(jobs, executor):
+        processed.extend(job.original_path for job in jobs)
+        return process_media_batch(jobs, executor)
+
+    monkeypatch.setattr(posts, "process_media_batch", counting_batch)
+    return processed
+
+
+def png_bytes(color) -> bytes:
+    image = io.BytesIO()
+    Image.new("RGB", (320, 200), color).save(image, "PNG")
+    return image.getvalue()
+
+
+def post_files(client: TestClient, session: Session, *contents: bytes):
+    profile = session.exec(select(Profile)).one()
+    response = client.post(
+        "/posts/",
+        data={"text": "Blob", "profile_id": str(profile.id)},
+        files=[
+            ("files", (f"photo{index}.png", io.BytesIO(content), "image/png"))
+            for index, content in enumerate(contents)
+        ],
+    )
+    assert response.status_code == 200
+    return response.json()["media"]
+
+
+def test_identical_uploads_share_one_blob(
+    client: TestClient, session: Session, processed: list
+):
+    content = png_bytes((10, 200, 30))
+
+    first = post_files(client, session, content, content)
+    second = post_files(client, session, content)
+
+    # 원본은 한 번만 저장되고 한 번만 처리된다
+    assert len(processed) == 1
+    media = first + second
+    assert len({item["url"] for item in media}) == 1
+    assert len({item["thumbnail_url"] for item in media}) == 1
+    assert all(item["renditions"] == first[0]["renditions"] for item in media)
+    assert all(item["placeholder"] == first[0]["placeholder"] for item in media)
+    assert os.path.basename(first[0]["url"]).startswith(
+        session.exec(select(MediaBlob)).one().content_hash
+    )
+
+    blob = session.exec(select(MediaBlob)).one()
+    assert blob.ref_count == 3
+    assert (blob.width, blob.height) == (320, 200)
+    # Media와 렌디션 행은 업로드마다 따로 있다
+    assert len(session.exec(select(Media)).all()) == 3
+    assert len(session.exec(select(MediaRendition)).all()) == 3 * len(blob.renditions)
+
+
+def test_different_uploads_get_their_own_blobs(
+    client: TestClient, session: Session, processed: list
+):
+    media = post_files(client, session, png_bytes((255, 0, 0)), png_bytes((0, 0, 255)))
+
+    assert len(processed) == 2
+    assert media[0]["url"] != media[1]["url"]
+    blobs = session.exec(select(MediaBlob)).all()
+    assert sorted(blob.ref_count for blob in blobs) == [1, 1]
+
+
+def release_first_blob(session: Session) -> None:
+    """게시물이 지워져 참조가 없어진 지 오래된 blob으로 만든다"""
+    blob = session.exec(select(MediaBlob)).one()
+    blob.ref_count = 0
+    blob.released_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    session.add(blob)
+    session.commit()
+
+
+def test_upload_claims_blob_before_dropping_its_copy(
+    client: TestClient, session: Session, processed: list, monkeypatch
+):
+    content = png_bytes((90, 40, 160))
+    first = post_files(client, session, content)[0]
+    release_first_blob(session)
+
+    store_uploaded_content = posts.store_uploaded_content
+
+    def check_claimed(stored, blobs):
+        # 올린 사본을 버리기 전에 이미 참조되어 가비지 컬렉터의 대상이 아니다
+        assert list(blobs) == [stored[0].content_hash]
+        blob = session.get(MediaBlob, stored[0].content_hash)
+        assert (blob.ref_count, blob.released_at) == (1, None)
+        check_claimed.called = True
+        return store_uploaded_content(stored, blobs)
+
+    check_claimed.called = False
+    monkeypatch.setattr(posts, "store_uploaded_content", check_claimed)
+
+    second = post_files(client, session, content)[0]
+
+    # blob을 재사용하고 파일도 남아 있다
+    assert check_claimed.called
+    assert second["url"] == first["url"]
+    assert len(processed) == 1
+    for url in [second["url"], second["thumbnail_url"]]:
+        assert os.path.exists(url.lstrip("/"))
+    session.expire_all()
+    assert session.exec(select(MediaBlob)).one().ref_count == 1
+
+
+def test_collected_blob_is_stored_again(
+    client: TestClient, session: Session, processed: list, tmp_path
+):
+    content = png_bytes((40, 160, 90))
+    first = post_files(client, session, content)[0]
+    release_first_blob(session)
+    assert collect_garbage(session.get_bind(), str(tmp_path)).blobs == 1
+    for url in [first["url"], first["thumbnail_url"]] + [
+        rendition["url"] for rendition in first["renditions"]
+    ]:
+        os.remove(url.lstrip("/"))
+
+    second = post_files(client, session, content)[0]
+
+    # 업로드한 사본으로 blob을 다시 만든다
+    assert second["url"] == first["url"]
+    assert len(processed) == 2
+    for url in [second["url"], second["thumbnail_url"]]:
+        assert os.path.exists(url.lstrip("/"))
+    session.expire_all()
+    assert session.exec(select(MediaBlob)).one().ref_count == 1
+
+
+def test_failed_blob_is_processed_again(
+    client: TestClient, session: Session, processed: list
+):
+    content = png_bytes((200, 120, 40))
+    post_files(client, session, content)
+    # 처음 처리할 때 실패한 blob
+    blob = session.exec(select(MediaBlob)).one()
+    blob.status = MEDIA_FAILED
+    blob.thumbnail_url = None
+    blob.renditions = []
+    session.add(blob)
+    session.commit()
+
+    media = post_files(client, session, content)[0]
+
+    # 실패한 결과를 재사용하지 않고 다시 처리해 blob도 고친다
+    assert len(processed) == 2
+    assert media["status"] == MEDIA_READY
+    assert media["renditions"]
+    session.expire_all()
+    blob = session.exec(select(MediaBlob)).one()
+    assert blob.ref_count == 2
+    assert blob.status == MEDIA_READY
+    assert blob.thumbnail_url == media["thumbnail_url"]
+    assert len(blob.renditions) == len(media["renditions"])
+
+    # 이후 업로드는 고친 blob을 재사용한다
+    post_files(client, session, content)
+    assert len(processed) == 2
+
+
+def make_file(path, age: float = 0) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"x" * 100)
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+
+def add_blob(session: Session, content_hash: str, ref_count: int) -> None:
+    session.add(
+        MediaBlob(
+            content_hash=content_hash,
+            media_type="image",
+            original_url=f"/uploads/images/originals/{content_hash}.png",
+            file_size=100,
+            ref_count=ref_count,
+        )
+    )
+    session.commit()
+
+
+def test_collect_garbage_removes_released_blobs(session: Session, tmp_path):
+    add_blob(session, HASH_A, ref_count=2)
+    add_blob(session, HASH_B, ref_count=1)
+    for content_hash in (HASH_A, HASH_B):
+        make_file(tmp_path / f"images/originals/{content_hash}.png", age=7200)
+        make_file(tmp_path / f"images/thumbnails/{content_hash}.jpg", age=7200)
+        make_file(tmp_path / f"images/renditions/{content_hash}_160.webp", age=7200)
+
+    release_blobs(session, [HASH_A, HASH_B])
+    session.commit()
+    session.expire_all()
+    assert session.get(MediaBlob, HASH_A).ref_count == 1
+    released = session.get(MediaBlob, HASH_B)
+    assert released.ref_count == 0
+    assert released.released_at is not None
+
+    engine = session.get_bind()
+    # 유예 기간 안에는 지우지 않는다
+    assert collect_garbage(engine, str(tmp_path), grace_period=3600).blobs == 0
+
+    report = collect_garbage(engine, str(tmp_path), grace_period=0)
+
+    assert (report.blobs, report.files, report.bytes) == (1, 3, 300)
+    session.expire_all()
+    assert session.get(MediaBlob, HASH_B) is None
+    assert session.get(MediaBlob, HASH_A) is not None
+    assert sorted(os.listdir(tmp_path / "images/originals")) == [f"{HASH_A}.png"]
+
+
+def test_collect_garbage_sweeps_orphan_files(session: Session, tmp_path):
+    add_blob(session, HASH_A, ref_count=1)
+    make_file(tmp_path / f"images/originals/{HASH_A}.png", age=7200)
+    # 실패한 업로드가 남긴 파일과 임시 파일
+    make_file(tmp_path / f"images/originals/{HASH_B}.png", age=7200)
+    make_file(tmp_path / "tmp/upload.png", age=7200)
+    # 아직 진행 중일 수 있는 업로드와 이전 방식의 uuid 파일
+    make_file(tmp_path / f"videos/originals/{'c' * 64}.mp4")
+    make_file(tmp_path / "images/originals/legacy-uuid.jpg", age=7200)
+
+    dry_run = collect_garbage(
+        session.get_bind(), str(tmp_path), grace_period=3600, dry_run=True
+    )
+    assert dry_run.files == 2
+    assert os.path.exists(tmp_path / "tmp/upload.png")
+
+    report = collect_garbage(session.get_bind(), str(tmp_path), grace_period=3600)
+
+    assert report.files == 2
+    assert sorted(os.listdir(tmp_path / "images/originals")) == [
+        f"{HASH_A}.png",
+        "legacy-uuid.jpg",
+    ]
+    assert os.listdir(tmp_path / "tmp") == []
+    assert os.listdir(tmp_path / "videos/originals") == [f"{'c' * 64}.mp4"]
+
+
+def test_collect_garbage_expires_unattached_media(session: Session, tmp_path):
+    add_blob(session, HASH_A, ref_count=2)
+    profile = session.exec(select(Profile)).one()
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    for object_type, created_at in [
+        (MEDIA_UNATTACHED, old),
+        (MEDIA_UNATTACHED, datetime.now(timezone.utc)),
+    ]:
+        session.add(
+            Media(
+                original_url=f"/uploads/images/originals/{HASH_A}.png",
+                media_type="image",
+                filename="a.png",
+                object_type=object_type,
+                object_id=profile.id,
+                content_hash=HASH_A,
+                created_at=created_at,
+            )
+        )
+    session.commit()
+
+    report = collect_garbage(
+        session.get_bind(), str(tmp_path), grace_period=3600, unattached_ttl=86400
+    )
+
+    # 오래된 미연결 미디어만 지우고 blob 참조를 놓는다
+    assert report.media == 1
+    session.expire_all()
+    assert len(session.exec(select(Media)).all()) == 1
+    assert session.get(MediaBlob, HASH_A).ref_count == 1
+
+
+def test_collect_garbage_expires_stalled_resumable_uploads(session: Session, tmp_path):
+    profile = session.exec(select(Profile)).one()
+    stalled = ResumableUpload(
+        profile_id=profile.id,
+        filename="long.mp4",
+        content_type="video/mp4",
+        media_type="video",
+        length=1000,
+        offset=400,
+        updated_at=datetime.now(timezone.utc) - timedelta(days=2),
+    )
+    active = ResumableUpload(
+        profile_id=profile.id,
+        filename="new.mp4",
+        content_type="video/mp4",
+        media_type="video",
+        length=1000,
+        offset=100,
+    )
+    session.add_all([stalled, active])
+    session.commit()
+    make_file(tmp_path / f"resumable/{stalled.id}", age=2 * 86400)
+    make_file(tmp_path / f"resumable/{active.id}", age=2 * 86400)
+    # 행이 없는 파일 (만료 직전에 청크가 다시 만든 파일 등)
+    make_file(
+        tmp_path / "resumable/0d9e4b9a-0000-4000-8000-000000000000", age=2 * 86400
+    )
+
+    report = collect_garbage(
+        session.get_bind(), str(tmp_path), grace_period=3600, resumable_ttl=86400
+    )
+
+    # 오래 멈춘 업로드만 행과 파일을 지운다
+    assert report.uploads == 1
+    session.expire_all()
+    assert session.exec(select(ResumableUpload.id)).all() == [active.id]
+    assert os.listdir(tmp_path / "resumable") == [str(active.id)]
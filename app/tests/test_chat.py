@@ -4,8 +4,10 @@ from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 from ..main import app
 from ..models.profile import Profile, ProfileChatLink
-from ..models.chat import Chat
+from ..models.chat import Chat, Message
 from ..database import get_session
+from ..routers.chats import get_message_writer, make_message_writer, manager
+from ..utils.message_writer import MessageWriter
 
 
 @pytest.fixture(name="session")
@@ -29,7 +31,9 @@ def client_fixture(session: Session):
     def get_session_override():
         return session
 
+    message_writer = make_message_writer(session.get_bind())
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_message_writer] = lambda: message_writer
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
@@ -133,3 +137,72 @@ def test_read_chat(client: TestClient, profiles: list):
     assert response.status_code == 200
     assert data["name"] == chat_data["name"]
     assert data["id"] == created_chat["id"]
+
+
+def test_websocket_messages_are_committed_then_broadcast(
+    client: TestClient, session: Session, profiles: list
+):
+    chat = client.post(
+        "/chats/",
+        json={"name": "Live Chat", "profile_ids": [str(profiles[0].id)]},
+    ).json()
+
+    with client.websocket_connect(f"/ws/{chat['id']}") as websocket:
+        for index in range(3):
+            websocket.send_json(
+                {"profile_id": str(profiles[0].id), "text": f"Hello {index}"}
+            )
+        received = [websocket.receive_json()["text"] for _ in range(3)]
+
+    assert received == ["Hello 0", "Hello 1", "Hello 2"]
+
+    # 브로드캐스트된 메시지는 이미 데이터베이스에 저장되어 있다
+    stored = session.exec(
+        select(Message).order_by(Message.created_at, Message.id)
+    ).all()
+    assert [message.text for message in stored] == received
+
+
+def test_websocket_sender_is_told_when_a_message_is_not_saved(
+    client: TestClient, session: Session, profiles: list
+):
+    chat = client.post(
+        "/chats/",
+        json={"name": "Live Chat", "profile_ids": [str(profiles[0].id)]},
+    ).json()
+
+    async def failing_commit(messages):
+        raise RuntimeError("database is locked")
+
+    async def on_commit(messages):
+        raise AssertionError("failed messages must not be broadcast")
+
+    failing_writer = MessageWriter(failing_commit, on_commit)
+    app.dependency_overrides[get_message_writer] = lambda: failing_writer
+
+    with client.websocket_connect(f"/ws/{chat['id']}") as websocket:
+        websocket.send_json({"profile_id": str(profiles[0].id), "text": "Lost"})
+        error = websocket.receive_json()
+
+    assert error["error"] == "Message could not be saved"
+    assert session.exec(select(Message)).all() == []
+
+
+def test_websocket_disconnect_survives_a_pubsub_outage(
+    client: TestClient, profiles: list, monkeypatch, caplog
+):
+    chat = client.post(
+        "/chats/",
+        json={"name": "Live Chat", "profile_ids": [str(profiles[0].id)]},
+    ).json()
+
+    async def unreachable(chat_id, message):
+        raise ConnectionError("pub/sub backend is down")
+
+    monkeypatch.setattr(manager.backend, "publish", unreachable)
+    with client.websocket_connect(f"/ws/{chat['id']}"):
+        pass
+
+    # 퇴장 알림은 실패해도 연결은 정리되고 오류는 로그로 남는다
+    assert all(str(chat_id) != chat["id"] for chat_id in manager.active_connections)
+    assert "Error announcing a departure" in caplog.text
@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+
+from ..utils.connection_manager import (
+    DISCONNECT,
+    DROP_OLDEST,
+    SLOW_CONSUMER_CLOSE_CODE,
+    ConnectionManager,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.received = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+def test_slow_client_does_not_delay_others():
+    chat_id = uuid.uuid4()
+    fast = FakeWebSocket()
+    slow = FakeWebSocket(delay=10)
+    broken = FakeWebSocket(fail=True)
+
+    async def scenario():
+        manager = ConnectionManager()
+        for websocket in (slow, broken, fast):
+            await manager.connect(websocket, chat_id)
+        await manager.broadcast("hello", chat_id)
+        await asyncio.sleep(0.01)
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert fast.received == ["hello"]
+    assert slow.received == []
+    # 송신에 실패한 연결은 방에서 제거된다
+    assert broken not in [c.websocket for c in manager.active_connections[chat_id]]
+
+
+def test_disconnect_policy_evicts_slow_consumer():
+    chat_id = uuid.uuid4()
+    slow = FakeWebSocket(delay=10)
+
+    async def scenario():
+        manager = ConnectionManager(max_queue_size=2, slow_consumer_policy=DISCONNECT)
+        await manager.connect(slow, chat_id)
+        for index in range(5):
+            await manager.broadcast(f"message {index}", chat_id)
+        await asyncio.sleep(0)
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert chat_id not in manager.active_connections
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+
+
+def test_drop_policy_keeps_latest_messages():
+    chat_id = uuid.uuid4()
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        manager = ConnectionManager(max_queue_size=2, slow_consumer_policy=DROP_OLDEST)
+        await manager.connect(websocket, chat_id)
+        # 송신 태스크가 돌기 전에 큐를 넘치게 채운다
+        for index in range(5):
+            await manager.broadcast(f"message {index}", chat_id)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+    assert websocket.received == ["message 3", "message 4"]
+
+
+def test_disconnect_removes_connection():
+    chat_id = uuid.uuid4()
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        manager = ConnectionManager()
+        await manager.connect(websocket, chat_id)
+        manager.disconnect(websocket, chat_id)
+        manager.disconnect(websocket, chat_id)
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert manager.active_connections == {}
@@ -0,0 +1,44 @@
+from sqlalchemy import text
+
+from ..config import Settings
+from ..database import create_db_engine
+
+
+def test_create_db_engine_applies_sqlite_tuning(tmp_path):
+    engine = create_db_engine(
+        Settings(database_url=f"sqlite:///{tmp_path / 'tuned.db'}")
+    )
+
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        synchronous = connection.execute(text("PRAGMA synchronous")).scalar()
+        busy_timeout = connection.execute(text("PRAGMA busy_timeout")).scalar()
+
+    assert engine.echo is False
+    assert engine.pool.size() == 5
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 5000
+
+
+def test_create_db_engine_without_tuning(tmp_path):
+    engine = create_db_engine(
+        Settings(
+            database_url=f"sqlite:///{tmp_path / 'plain.db'}",
+            sqlite_tuning=False,
+            database_pool_size=2,
+        )
+    )
+
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+
+    assert engine.pool.size() == 2
+    assert journal_mode == "delete"
+
+
+def test_create_db_engine_in_memory():
+    engine = create_db_engine(Settings(database_url="sqlite://"))
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
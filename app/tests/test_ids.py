@@ -0,0 +1,13 @@
+from ..utils.ids import uuid7
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_uuid7_is_monotonic():
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
@@ -0,0 +1,151 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..models.job import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Job
+from ..utils.job_queue import (
+    JOB_HANDLERS,
+    claim_job,
+    enqueue_job,
+    fail_expired_jobs,
+    job_handler,
+    run_job,
+)
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+
+
+@pytest.fixture(name="handled")
+def handled_fixture():
+    handled = {"done": [], "failed": []}
+
+    @job_handler("test_ok")
+    def handle_ok(session, payload):
+        handled["done"].append(payload["n"])
+
+    def on_failure(session, payload):
+        handled["failed"].append(payload["n"])
+
+    @job_handler("test_broken", on_failure=on_failure)
+    def handle_broken(session, payload):
+        raise RuntimeError("boom")
+
+    yield handled
+    JOB_HANDLERS.pop("test_ok")
+    JOB_HANDLERS.pop("test_broken")
+
+
+def add_job(engine, kind: str, **options) -> Job:
+    with Session(engine, expire_on_commit=False) as session:
+        job = enqueue_job(session, kind, {"n": 1}, **options)
+        session.commit()
+    return job
+
+
+def test_claimed_job_is_hidden_until_visibility_timeout(engine):
+    add_job(engine, "test_ok")
+
+    job = claim_job(engine, visibility_timeout=60)
+    assert job is not None and job.attempts == 1
+    # 실행 중인 작업은 다른 워커가 가져가지 않는다
+    assert claim_job(engine, visibility_timeout=60) is None
+
+
+def test_expired_job_is_claimed_again(engine):
+    add_job(engine, "test_ok")
+
+    # 워커가 처리 중에 멈춘 경우: timeout이 지나면 다시 보인다
+    first = claim_job(engine, visibility_timeout=0)
+    second = claim_job(engine, visibility_timeout=60)
+
+    assert second is not None
+    assert second.id == first.id
+    assert second.attempts == 2
+
+
+def test_run_job_marks_done(engine, handled):
+    add_job(engine, "test_ok")
+
+    job = claim_job(engine, visibility_timeout=60)
+    assert run_job(engine, job, retry_delay=0)
+
+    with Session(engine) as session:
+        assert session.get(Job, job.id).status == JOB_DONE
+    assert handled["done"] == [1]
+
+
+def test_failed_job_is_retried_then_failed(engine, handled):
+    add_job(engine, "test_broken", max_attempts=2)
+
+    job = claim_job(engine, visibility_timeout=60)
+    assert not run_job(engine, job, retry_delay=0)
+    with Session(engine) as session:
+        retried = session.get(Job, job.id)
+        assert retried.status == JOB_QUEUED
+        assert "boom" in retried.last_error
+    assert handled["failed"] == []
+
+    job = claim_job(engine, visibility_timeout=60)
+    assert job.attempts == 2
+    assert not run_job(engine, job, retry_delay=0)
+    with Session(engine) as session:
+        assert session.get(Job, job.id).status == JOB_FAILED
+    assert handled["failed"] == [1]
+    assert claim_job(engine, visibility_timeout=60) is None
+
+
+def test_fail_expired_jobs_after_last_attempt(engine, handled):
+    add_job(engine, "test_broken", max_attempts=1)
+    job = claim_job(engine, visibility_timeout=0)
+
+    assert claim_job(engine, visibility_timeout=60) is None
+    assert fail_expired_jobs(engine) == 1
+
+    with Session(engine) as session:
+        assert session.get(Job, job.id).status == JOB_FAILED
+    assert handled["failed"] == [1]
+
+
+def test_result_of_a_reclaimed_attempt_is_discarded(engine):
+    @job_handler("test_write")
+    def handle_write(session, payload):
+        # 처리 결과로 행을 하나 추가한다 (렌디션 등)
+        session.add(Job(kind="result", payload=payload, status=JOB_DONE))
+
+    try:
+        add_job(engine, "test_write")
+        # 첫 시도가 visibility timeout을 넘기는 사이 다른 워커가 다시 가져간다
+        stale = claim_job(engine, visibility_timeout=0)
+        current = claim_job(engine, visibility_timeout=60)
+
+        assert not run_job(engine, stale, retry_delay=0)
+        with Session(engine) as session:
+            job = session.get(Job, current.id)
+            assert (job.status, job.attempts) == (JOB_RUNNING, 2)
+            assert session.exec(select(Job).where(Job.kind == "result")).all() == []
+
+        assert run_job(engine, current, retry_delay=0)
+        with Session(engine) as session:
+            assert session.get(Job, current.id).status == JOB_DONE
+            assert len(session.exec(select(Job).where(Job.kind == "result")).all()) == 1
+    finally:
+        JOB_HANDLERS.pop("test_write")
+
+
+def test_failure_of_a_reclaimed_attempt_is_ignored(engine, handled):
+    add_job(engine, "test_broken", max_attempts=2)
+    stale = claim_job(engine, visibility_timeout=0)
+    current = claim_job(engine, visibility_timeout=60)
+
+    # 이전 시도의 실패가 실행 중인 시도를 되돌리거나 실패로 만들지 않는다
+    assert not run_job(engine, stale, retry_delay=0)
+    with Session(engine) as session:
+        assert session.get(Job, current.id).status == JOB_RUNNING
+    assert handled["failed"] == []
@@ -108,3 +108,66 @@ def test_delete_profile(session: Session, client: TestClient):
 
     assert response.status_code == 200
     assert profile_in_db is None
+
+
+def test_read_profiles_with_cursor(session: Session, client: TestClient):
+    names = [f"Profile{index}" for index in range(5)]
+    for name in names:
+        session.add(Profile(name=name))
+    session.commit()
+
+    # 빈 커서로 첫 페이지부터 커서 모드로 조회
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/profiles/", params={"after": cursor, "limit": 2})
+        assert response.status_code == 200
+        seen.extend(profile["name"] for profile in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert sorted(seen) == names
+    assert len(seen) == len(set(seen))
+
+
+def test_read_profiles_cursor_skips_nothing_on_insert(
+    session: Session, client: TestClient
+):
+    for index in range(4):
+        session.add(Profile(name=f"Profile{index}"))
+    session.commit()
+
+    first_page = client.get("/profiles/", params={"after": "", "limit": 2})
+    cursor = first_page.headers["X-Next-Cursor"]
+    first_ids = [profile["id"] for profile in first_page.json()]
+
+    # 페이지 사이에 새 행이 들어와도 이미 본 행이 반복되지 않는다
+    session.add(Profile(name="Latecomer"))
+    session.commit()
+
+    second_page = client.get("/profiles/", params={"after": cursor, "limit": 10})
+    second_ids = [profile["id"] for profile in second_page.json()]
+
+    assert not set(first_ids) & set(second_ids)
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+def test_cursor_header_is_readable_cross_origin(session: Session, client: TestClient):
+    for index in range(3):
+        session.add(Profile(name=f"Cors{index}", bio=""))
+    session.commit()
+
+    response = client.get(
+        "/profiles/",
+        params={"after": "", "limit": 2},
+        headers={"Origin": "https://app.example.com"},
+    )
+
+    assert "X-Next-Cursor" in response.headers
+    # 브라우저 스크립트가 커서 헤더를 읽을 수 있어야 다음 페이지를 요청한다
+    exposed = response.headers["Access-Control-Expose-Headers"]
+    assert "x-next-cursor" in exposed.lower()
+
+
+def test_read_profiles_invalid_cursor(client: TestClient):
+    response = client.get("/profiles/", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..database import get_session
+from ..main import app
+from ..models.media import Media
+from ..models.profile import Profile
+from ..routers.media import get_variant_cache
+from ..utils.variant_cache import VariantCache
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="cache")
+def cache_fixture(tmp_path):
+    return VariantCache(str(tmp_path / "variants"), max_bytes=10 * 1024 * 1024)
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session, cache: VariantCache):
+    def get_session_override():
+        return session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_variant_cache] = lambda: cache
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+def upload(client: TestClient, session: Session, name: str, content, content_type):
+    profile = session.exec(select(Profile)).one()
+    response = client.post(
+        "/posts/",
+        data={"text": "Media", "profile_id": str(profile.id)},
+        files=[("files", (name, content, content_type))],
+    )
+    return response.json()["media"][0]["id"]
+
+
+def test_read_media_image_resizes_and_caches(
+    client: TestClient, session: Session, cache: VariantCache
+):
+    image = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 30, 30)).save(image, "JPEG")
+    image.seek(0)
+    media_id = upload(client, session, "photo.jpg", image, "image/jpeg")
+
+    response = client.get(f"/media/{media_id}/image?width=200&format=webp")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(io.BytesIO(response.content)) as variant:
+        assert variant.format == "WEBP"
+        assert variant.size == (200, 150)
+    assert len(cache._entries) == 1
+
+    # 같은 변형은 캐시에서 그대로 응답한다
+    again = client.get(f"/media/{media_id}/image?width=200&format=webp")
+    assert again.content == response.content
+    assert len(cache._entries) == 1
+
+    # 원본보다 큰 너비는 원본 크기로 제한된다
+    large = client.get(f"/media/{media_id}/image?width=1600&format=jpeg")
+    with Image.open(io.BytesIO(large.content)) as variant:
+        assert variant.format == "JPEG"
+        assert variant.size == (800, 600)
+
+
+def test_read_media_image_rejects_invalid_requests(
+    client: TestClient, session: Session
+):
+    video_id = upload(client, session, "clip.mp4", io.BytesIO(b"video"), "video/mp4")
+
+    assert client.get(f"/media/{video_id}/image?width=200").status_code == 400
+    assert client.get(f"/media/{video_id}/image?width=99999").status_code == 422
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/media/{missing}/image?width=200").status_code == 404
@@ -0,0 +1,135 @@
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from ..utils import media_pipeline
+from ..utils.media_pipeline import (
+    WORKER_CRASHED,
+    MediaJob,
+    get_media_executor,
+    process_media,
+    process_media_batch,
+    shutdown_media_executor,
+)
+from .test_video_meta import ROTATE_90_MATRIX, build_mp4
+
+
+@pytest.fixture(name="jobs")
+def jobs_fixture(tmp_path):
+    jobs = []
+    for index, size in enumerate([(320, 200), (200, 320), (256, 256)]):
+        original_path = tmp_path / f"original{index}.png"
+        Image.new("RGB", size, (index * 80, 100, 150)).save(original_path)
+        jobs.append(
+            MediaJob(
+                media_type="image",
+                original_path=str(original_path),
+                thumbnail_path=str(tmp_path / f"thumbnail{index}.jpg"),
+            )
+        )
+    video_path = tmp_path / "v.mp4"
+    video_path.write_bytes(build_mp4(1280, 720))
+    jobs.append(MediaJob(media_type="video", original_path=str(video_path)))
+    return jobs
+
+
+def test_process_media_batch_in_process_pool(jobs):
+    executor = get_media_executor(2)
+    try:
+        results = process_media_batch(jobs, executor)
+    finally:
+        shutdown_media_executor()
+
+    # 결과는 작업 순서를 유지한다
+    assert [(result.width, result.height) for result in results] == [
+        (320, 200),
+        (200, 320),
+        (256, 256),
+        (1280, 720),
+    ]
+    for job in jobs[:3]:
+        with Image.open(job.thumbnail_path) as thumbnail:
+            assert thumbnail.size == (160, 160)
+
+
+def test_process_media_batch_without_pool(jobs):
+    assert get_media_executor(0) is None
+
+    results = process_media_batch(jobs, None)
+
+    assert (results[0].width, results[0].height) == (320, 200)
+    with Image.open(jobs[0].thumbnail_path) as thumbnail:
+        assert thumbnail.size == (160, 160)
+
+
+def test_process_media_reads_video_header(tmp_path):
+    video_path = tmp_path / "portrait.mov"
+    video_path.write_bytes(build_mp4(1920, 1080, duration=3.0, matrix=ROTATE_90_MATRIX))
+
+    result = process_media(MediaJob(media_type="video", original_path=str(video_path)))
+
+    assert (result.width, result.height) == (1080, 1920)
+    assert (result.duration, result.video_codec) == (3.0, "avc1")
+    assert result.error is None
+
+
+def test_process_media_leaves_unknown_video_containers_unsized(tmp_path):
+    video_path = tmp_path / "clip.webm"
+    video_path.write_bytes(b"\x1a\x45\xdf\xa3" + bytes(64))
+
+    result = process_media(MediaJob(media_type="video", original_path=str(video_path)))
+
+    assert (result.width, result.height, result.duration) == (None, None, None)
+    assert result.error is None
+
+
+class CrashingExecutor(Executor):
+    """crash_on 경로의 작업을 받으면 워커가 죽은 것처럼 깨지는 풀"""
+
+    def __init__(self, crash_on: str):
+        self.crash_on = crash_on
+        self.broken = False
+        self.shut_down = False
+
+    def submit(self, fn, job):
+        future = Future()
+        if self.broken or job.original_path == self.crash_on:
+            self.broken = True
+            future.set_exception(BrokenProcessPool("A worker process died"))
+        else:
+            future.set_result(fn(job))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_is_replaced_and_only_the_crashing_job_fails(jobs, monkeypatch):
+    crash_on = jobs[1].original_path
+    pools = []
+
+    def create_executor(workers):
+        pools.append(CrashingExecutor(crash_on))
+        return pools[-1]
+
+    monkeypatch.setattr(media_pipeline, "_create_executor", create_executor)
+    executor = get_media_executor(2)
+    try:
+        results = process_media_batch(jobs, executor)
+
+        # 다시 풀을 깨뜨린 작업만 실패하고 나머지는 새 풀에서 처리된다
+        assert [result.error for result in results] == [
+            None,
+            WORKER_CRASHED,
+            None,
+            None,
+        ]
+        assert (results[2].width, results[2].height) == (256, 256)
+        assert pools[0].shut_down
+        # 다음 업로드는 깨지지 않은 새 풀을 받는다
+        assert get_media_executor(2) is pools[-1]
+        assert not pools[-1].broken
+    finally:
+        shutdown_media_executor()
@@ -0,0 +1,311 @@
+import base64
+import io
+import struct
+import zlib
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw, ImageFile, ImageStat
+
+from ..utils.media_utils import (
+    EXIF_ORIENTATION,
+    PLACEHOLDER_SIZE,
+    PREFLIGHT_STAGE,
+    ImageLimits,
+    MediaProcessingError,
+    create_thumbnail,
+    draft_size,
+    get_image_dimensions,
+    probe_image,
+    process_image,
+    render_variant,
+)
+
+LIMITS = ImageLimits(max_pixels=50_000_000, max_file_size=1024 * 1024, max_frames=5)
+
+
+def test_probe_image_reads_header(tmp_path):
+    path = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    Image.new("RGB", (320, 200), (10, 20, 30)).save(path, "JPEG", exif=exif)
+
+    probe = probe_image(str(path))
+
+    assert (probe.format, probe.width, probe.height) == ("JPEG", 320, 200)
+    assert probe.orientation == 6
+    assert probe.mode == "RGB"
+
+
+def test_process_image_creates_thumbnail_from_one_open(tmp_path):
+    path = tmp_path / "logo.png"
+    Image.new("RGBA", (300, 500), (255, 0, 0, 128)).save(path)
+    thumbnail_path = tmp_path / "thumbnails" / "logo.jpg"
+
+    probe = process_image(str(path), str(thumbnail_path)).probe
+
+    assert (probe.format, probe.width, probe.height) == ("PNG", 300, 500)
+    assert probe.orientation == 1
+    assert probe.mode == "RGBA"
+    with Image.open(thumbnail_path) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (160, 160)
+
+
+def test_process_image_applies_exif_orientation(tmp_path):
+    # 왼쪽 절반은 검정, 오른쪽 절반은 흰색인 가로 사진을 90도 회전하도록 표시
+    path = tmp_path / "rotated.jpg"
+    img = Image.new("L", (200, 200), 0)
+    img.paste(255, (100, 0, 200, 200))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    img.save(path, "JPEG", exif=exif)
+    thumbnail_path = tmp_path / "rotated_thumb.jpg"
+
+    process_image(str(path), str(thumbnail_path))
+
+    with Image.open(thumbnail_path) as thumbnail:
+        # 회전 후에는 위쪽이 검정, 아래쪽이 흰색
+        assert thumbnail.getpixel((80, 10)) < 50
+        assert thumbnail.getpixel((80, 150)) > 200
+
+
+def test_invalid_image_raises_structured_error(tmp_path):
+    path = tmp_path / "fake.jpg"
+    path.write_bytes(b"fake image content")
+
+    with pytest.raises(MediaProcessingError) as error:
+        process_image(str(path), str(tmp_path / "thumb.jpg"))
+
+    assert error.value.stage == "open"
+    assert error.value.path == str(path)
+    assert not (tmp_path / "thumb.jpg").exists()
+
+
+def test_truncated_image_raises_decode_error(tmp_path):
+    path = tmp_path / "truncated.png"
+    Image.effect_noise((256, 256), 64).save(path)
+    path.write_bytes(path.read_bytes()[:2000])
+
+    with pytest.raises(MediaProcessingError) as error:
+        process_image(str(path), str(tmp_path / "thumb.jpg"))
+
+    assert error.value.stage == "decode"
+
+
+def make_photo(size) -> Image.Image:
+    """그라디언트와 도형이 섞인 사진 비슷한 테스트 이미지"""
+    gradient = Image.linear_gradient("L").resize(size)
+    radial = Image.radial_gradient("L").resize(size)
+    photo = Image.merge("RGB", (gradient, radial, gradient.rotate(90)))
+    draw = ImageDraw.Draw(photo)
+    for index in range(12):
+        x, y = size[0] * index // 12, size[1] * (index % 4) // 4
+        draw.ellipse((x, y, x + size[0] // 10, y + size[1] // 6), fill=(255, 40, 40))
+    return photo
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+def test_fast_thumbnail_matches_full_decode(tmp_path, image_format):
+    path = tmp_path / f"photo.{image_format.lower()}"
+    make_photo((2400, 1800)).save(path, image_format)
+
+    process_image(str(path), str(tmp_path / "full.jpg"), fast=False)
+    process_image(str(path), str(tmp_path / "fast.jpg"), fast=True)
+
+    with (
+        Image.open(tmp_path / "full.jpg") as full,
+        Image.open(tmp_path / "fast.jpg") as fast,
+    ):
+        difference = ImageStat.Stat(ImageChops.difference(full, fast))
+    # 채널별 평균 픽셀 차이가 255 중 2 미만
+    assert max(difference.mean) < 2
+
+
+def test_draft_size_keeps_oversampled_crop():
+    # 12MP 사진에서 160x160 썸네일: 잘라낼 영역이 320px 이상 남도록 줄인다
+    assert draft_size((4032, 3024), (160, 160)) == (427, 320)
+    # 90도 회전된 사진은 회전 전 좌표로 계산한다
+    assert draft_size((4032, 3024), (160, 480), orientation=6) == (960, 720)
+    # 이미 작은 이미지는 줄이지 않는다
+    assert draft_size((300, 200), (160, 160)) is None
+
+
+def test_process_image_creates_placeholder(tmp_path):
+    path = tmp_path / "wide.jpg"
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    Image.new("RGB", (1200, 600), (200, 40, 40)).save(path, "JPEG", exif=exif)
+
+    placeholder = process_image(str(path), str(tmp_path / "thumb.jpg")).placeholder
+
+    prefix = "data:image/webp;base64,"
+    assert placeholder.startswith(prefix)
+    data = base64.b64decode(placeholder.removeprefix(prefix))
+    # 피드 응답에 인라인으로 넣을 수 있을 만큼 작다
+    assert len(data) < 500
+    with Image.open(io.BytesIO(data)) as preview:
+        assert preview.format == "WEBP"
+        # EXIF 방향을 적용하고 비율을 유지한다
+        assert preview.size == (PLACEHOLDER_SIZE // 2, PLACEHOLDER_SIZE)
+        red, green, blue = preview.convert("RGB").getpixel((4, 8))
+        assert red > 150 and green < 100
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(kind + data)
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def png_header_bomb(width: int, height: int) -> bytes:
+    """헤더에는 큰 크기를 적고 픽셀은 한 줄만 담은 PNG (수십 바이트)"""
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+        + png_chunk(b"IDAT", zlib.compress(b"\0" * (width + 1)))
+        + png_chunk(b"IEND", b"")
+    )
+
+
+def jpeg_header_bomb(width: int, height: int) -> bytes:
+    """SOF 헤더에 큰 크기를 적은 흑백 JPEG (스캔 데이터는 거의 없음)"""
+    frame = struct.pack(">BHHB", 8, height, width, 1) + bytes([1, 0x11, 0])
+    scan = bytes([1, 1, 0, 0, 63, 0])
+    return (
+        b"\xff\xd8"
+        + b"\xff\xc0"
+        + struct.pack(">H", len(frame) + 2)
+        + frame
+        + b"\xff\xda"
+        + struct.pack(">H", len(scan) + 2)
+        + scan
+        + b"\x00" * 16
+        + b"\xff\xd9"
+    )
+
+
+@pytest.fixture(name="no_decode")
+def no_decode_fixture(monkeypatch):
+    """사전 검사에서 거절되어야 하는 파일을 디코딩하면 테스트를 실패시킨다"""
+
+    def load(self):
+        raise AssertionError("image was decoded")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", load)
+
+
+@pytest.mark.parametrize(
+    "name, data",
+    [
+        # Pillow 자체 한도(약 1.8억 픽셀)도 넘는 50k x 50k
+        ("huge.png", png_header_bomb(50_000, 50_000)),
+        ("huge.jpg", jpeg_header_bomb(60_000, 60_000)),
+        # Pillow는 열어 주지만 설정한 한도(5천만 픽셀)는 넘는 크기
+        ("large.png", png_header_bomb(10_000, 6_000)),
+        ("large.jpg", jpeg_header_bomb(12_000, 6_000)),
+    ],
+)
+def test_header_bombs_are_rejected_before_decode(tmp_path, no_decode, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+
+    with pytest.raises(MediaProcessingError) as error:
+        process_image(str(path), str(tmp_path / "thumb.jpg"), limits=LIMITS)
+
+    assert error.value.stage == PREFLIGHT_STAGE
+    assert not (tmp_path / "thumb.jpg").exists()
+    with pytest.raises(MediaProcessingError):
+        probe_image(str(path), LIMITS)
+    with pytest.raises(MediaProcessingError):
+        render_variant(str(path), str(tmp_path / "variant.webp"), 320, "webp", LIMITS)
+
+
+def test_compressed_bomb_is_rejected_before_decode(tmp_path, no_decode):
+    # 6천만 픽셀짜리 실제 이미지지만 한 가지 색이라 파일은 수 KB
+    path = tmp_path / "blank.png"
+    with Image.new("1", (10_000, 6_000)) as image:
+        image.save(path)
+    assert path.stat().st_size < 16 * 1024
+
+    with pytest.raises(MediaProcessingError) as error:
+        probe_image(str(path), LIMITS)
+
+    assert error.value.stage == PREFLIGHT_STAGE
+    assert "pixel limit" in error.value.reason
+
+
+def test_pillow_bomb_limit_applies_without_limits(tmp_path):
+    # 한도를 주지 않아도 Pillow의 DecompressionBombError를 처리 오류로 바꾼다
+    path = tmp_path / "huge.png"
+    path.write_bytes(png_header_bomb(50_000, 50_000))
+
+    with pytest.raises(MediaProcessingError) as error:
+        process_image(str(path), str(tmp_path / "thumb.jpg"))
+
+    assert error.value.stage == PREFLIGHT_STAGE
+
+
+def test_animation_over_frame_limit_is_rejected(tmp_path, no_decode):
+    path = tmp_path / "animated.gif"
+    frames = [
+        Image.new("RGB", (4, 4), (color * 40, 0, 0))
+        for color in range(LIMITS.max_frames + 1)
+    ]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    with pytest.raises(MediaProcessingError) as error:
+        probe_image(str(path), LIMITS)
+
+    assert error.value.stage == PREFLIGHT_STAGE
+    assert "frame limit" in error.value.reason
+
+
+def test_file_over_byte_limit_is_rejected_before_open(tmp_path, no_decode):
+    path = tmp_path / "noise.png"
+    Image.effect_noise((1024, 1024), 100).convert("RGB").save(path)
+    limits = ImageLimits(max_pixels=50_000_000, max_file_size=1024, max_frames=5)
+
+    with pytest.raises(MediaProcessingError) as error:
+        probe_image(str(path), limits)
+
+    assert error.value.stage == PREFLIGHT_STAGE
+    assert "byte limit" in error.value.reason
+
+
+def test_image_within_limits_passes_preflight(tmp_path):
+    path = tmp_path / "animated.gif"
+    frames = [Image.new("RGB", (40, 30), (color * 80, 0, 0)) for color in range(3)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    probe = probe_image(str(path), LIMITS)
+
+    assert (probe.width, probe.height, probe.frames) == (40, 30, 3)
+    processed = process_image(str(path), str(tmp_path / "thumb.jpg"), limits=LIMITS)
+    assert processed.probe.frames == 3
+
+
+def test_legacy_helpers_apply_limits(tmp_path, no_decode):
+    path = tmp_path / "huge.png"
+    path.write_bytes(png_header_bomb(10_000, 6_000))
+    thumbnail_path = tmp_path / "thumb.jpg"
+
+    with pytest.raises(MediaProcessingError) as error:
+        get_image_dimensions(str(path), LIMITS)
+    assert error.value.stage == PREFLIGHT_STAGE
+    # 한도를 넘은 원본은 썸네일 자리에 복사하지 않는다
+    with pytest.raises(MediaProcessingError) as error:
+        create_thumbnail(str(path), str(thumbnail_path), limits=LIMITS)
+    assert error.value.stage == PREFLIGHT_STAGE
+    assert not thumbnail_path.exists()
+
+
+def test_legacy_helpers_report_unreadable_files(tmp_path):
+    path = tmp_path / "broken.jpg"
+    path.write_bytes(b"not an image")
+
+    with pytest.raises(MediaProcessingError) as error:
+        get_image_dimensions(str(path))
+    assert error.value.stage == "open"
+    with pytest.raises(MediaProcessingError) as error:
+        create_thumbnail(str(path), str(tmp_path / "thumb.jpg"))
+    assert error.value.stage == "open"
+    assert not (tmp_path / "thumb.jpg").exists()
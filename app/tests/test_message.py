@@ -224,3 +224,31 @@ def test_two_profiles_messaging(
     message_texts_user2 = [message["text"] for message in data_user2]
     assert "Hello from User1" in message_texts_user2
     assert "Hello from User2" in message_texts_user2
+
+
+def test_read_messages_with_cursor(
+    client: TestClient, chat_with_profiles: Chat, profile: Profile
+):
+    with client.app.dependency_overrides[get_session]() as session:
+        for index in range(5):
+            session.add(
+                Message(
+                    text=f"Message {index}",
+                    chat_id=chat_with_profiles.id,
+                    profile_id=profile.id,
+                )
+            )
+        session.commit()
+
+    first_page = client.get("/messages/", params={"after": "", "limit": 3})
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 3
+
+    second_page = client.get(
+        "/messages/",
+        params={"after": first_page.headers["X-Next-Cursor"], "limit": 3},
+    )
+    assert second_page.status_code == 200
+
+    texts = [message["text"] for message in first_page.json() + second_page.json()]
+    assert sorted(texts) == [f"Message {index}" for index in range(5)]
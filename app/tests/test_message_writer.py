@@ -0,0 +1,90 @@
+import asyncio
+
+from ..utils.message_writer import MessageWriter
+
+
+def test_message_writer_commits_in_batches_and_keeps_order():
+    committed = []
+    broadcast = []
+
+    async def commit_batch(batch):
+        await asyncio.sleep(0.01)  # fsync 대신
+        committed.append(list(batch))
+
+    async def on_commit(batch):
+        # 브로드캐스트는 commit이 끝난 배치에 대해서만 일어난다
+        assert batch in committed
+        broadcast.extend(batch)
+
+    async def scenario():
+        writer = MessageWriter(
+            commit_batch, on_commit, max_batch_size=16, max_delay=0.001
+        )
+        for index in range(100):
+            await writer.submit(index)
+            if index % 10 == 0:
+                await asyncio.sleep(0)
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert broadcast == list(range(100))
+    assert len(committed) < 100
+    assert max(len(batch) for batch in committed) <= 16
+
+
+def test_message_writer_fails_submitters_of_a_failed_batch():
+    broadcast = []
+
+    async def commit_batch(batch):
+        if 0 in batch:
+            raise RuntimeError("disk full")
+
+    async def on_commit(batch):
+        broadcast.extend(batch)
+
+    async def scenario():
+        writer = MessageWriter(commit_batch, on_commit, max_batch_size=1)
+        failed = await writer.submit(0)
+        saved = await writer.submit(1)
+        await writer.stop()
+        return failed, saved
+
+    failed, saved = asyncio.run(scenario())
+
+    # 실패한 배치의 메시지는 보낸 쪽에 실패로 알려지고, 다음 배치는 계속 처리된다
+    assert isinstance(failed.exception(), RuntimeError)
+    assert saved.result() is None
+    assert broadcast == [1]
+
+
+def test_message_writer_queue_is_bounded():
+    release = None
+
+    async def commit_batch(batch):
+        await release.wait()
+
+    async def on_commit(batch):
+        pass
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        writer = MessageWriter(
+            commit_batch, on_commit, max_batch_size=1, max_queue_size=2
+        )
+        # 첫 메시지는 commit 중이고, 두 개는 큐에서 기다린다
+        for index in range(3):
+            await writer.submit(index)
+        await asyncio.sleep(0)
+        blocked = asyncio.ensure_future(writer.submit(3))
+        await asyncio.sleep(0.01)
+        # commit이 밀리면 더 받지 않는다
+        assert not blocked.done()
+
+        release.set()
+        saved = await blocked
+        await writer.stop()
+        return saved
+
+    assert asyncio.run(scenario()).result() is None
@@ -0,0 +1,149 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..migrations import run_migrations, schema_migrations
+from ..models.chat import Chat
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    # created_at 컬럼이 생기기 전의 chat 테이블과 기존 행
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE chat (name VARCHAR, id CHAR(32) NOT NULL PRIMARY KEY)")
+        )
+        connection.execute(
+            text("INSERT INTO chat (name, id) VALUES ('Old Chat', :id)"),
+            {"id": "0" * 31 + "1"},
+        )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+
+
+def test_run_migrations_adds_created_at_to_existing_table(engine):
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("chat")}
+    indexes = {index["name"] for index in inspector.get_indexes("chat")}
+    assert "created_at" in columns
+    assert "ix_chat_created_at" in indexes
+
+    with Session(engine) as session:
+        old_chat = session.exec(select(Chat)).one()
+        assert old_chat.name == "Old Chat"
+        assert old_chat.created_at is not None
+
+
+def test_run_migrations_is_idempotent(engine):
+    run_migrations(engine)
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        session.add(Chat(name="New Chat"))
+        session.commit()
+        chats = session.exec(select(Chat).order_by(Chat.created_at, Chat.id)).all()
+
+    assert [chat.name for chat in chats] == ["Old Chat", "New Chat"]
+
+
+def test_run_migrations_records_versions(engine):
+    applied = run_migrations(engine)
+    assert applied == [
+        "0001",
+        "0002",
+        "0003",
+        "0004",
+        "0005",
+        "0006",
+        "0007",
+        "0008",
+        "0009",
+    ]
+    assert run_migrations(engine) == []
+
+    with engine.connect() as connection:
+        versions = connection.scalars(select(schema_migrations.c.version)).all()
+    assert versions == [
+        "0001",
+        "0002",
+        "0003",
+        "0004",
+        "0005",
+        "0006",
+        "0007",
+        "0008",
+        "0009",
+    ]
+
+
+def test_run_migrations_adds_foreign_key_indexes():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    # 인덱스가 생기기 전의 데이터베이스를 흉내 낸다
+    with engine.begin() as connection:
+        for name in (
+            "ix_message_chat_id",
+            "ix_comment_post_id",
+            "ix_comment_parent_id",
+            "ix_post_profile_id",
+            "ix_media_object_type_object_id",
+            "ix_profilechatlink_chat_id",
+        ):
+            connection.execute(text(f"DROP INDEX {name}"))
+
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    assert "ix_message_chat_id" in {
+        index["name"] for index in inspector.get_indexes("message")
+    }
+    assert {"ix_comment_post_id", "ix_comment_parent_id"} <= {
+        index["name"] for index in inspector.get_indexes("comment")
+    }
+    assert "ix_post_profile_id" in {
+        index["name"] for index in inspector.get_indexes("post")
+    }
+    assert "ix_media_object_type_object_id" in {
+        index["name"] for index in inspector.get_indexes("media")
+    }
+    assert "ix_profilechatlink_chat_id" in {
+        index["name"] for index in inspector.get_indexes("profilechatlink")
+    }
+
+    with engine.connect() as connection:
+        plan = connection.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM message WHERE chat_id = 'x'")
+        ).all()
+    assert "ix_message_chat_id" in " ".join(str(row) for row in plan)
+
+
+def test_run_migrations_creates_tables_from_fixed_definitions():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    # 모델의 create_all 없이 마이그레이션만으로 테이블을 만든다
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE media (id CHAR(32) NOT NULL PRIMARY KEY)")
+        )
+
+    run_migrations(engine)
+
+    # 지금의 모델과 같은 스키마가 만들어진다
+    inspector = inspect(engine)
+    for table in ("job", "mediarendition", "mediablob", "resumableupload"):
+        model_table = SQLModel.metadata.tables[table]
+        assert {column["name"] for column in inspector.get_columns(table)} == set(
+            model_table.columns.keys()
+        )
+        assert {index["name"] for index in inspector.get_indexes(table)} == {
+            index.name for index in model_table.indexes
+        }
@@ -1,15 +1,24 @@
 import pytest
+import hashlib
 import io
 import os
 import tempfile
 import shutil
 from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 
+from ..config import settings
 from ..main import app
+from ..models.media import Media
+from ..models.post import Post
 from ..models.profile import Profile
 from ..database import get_session
+from .test_media_utils import png_header_bomb
+from ..utils.media_utils import EXIF_ORIENTATION
+from .test_video_meta import build_mp4
 
 
 @pytest.fixture(name="session")
@@ -169,3 +178,303 @@ def test_read_profile_posts(client: TestClient, profiles: list):
     assert len(data) == 2
     assert data[0]["text"] == "First post by TestUser1"
     assert data[1]["text"] == "Second post by TestUser1"
+
+
+def create_posts_with_media(client: TestClient, profile: Profile, count: int):
+    for index in range(count):
+        fake_images = []
+        for image_index in range(2):
+            fake_image = io.BytesIO(b"fake image content")
+            fake_image.name = f"test{index}_{image_index}.jpg"
+            fake_image.content_type = "image/jpeg"
+            fake_images.append(("files", fake_image))
+
+        client.post(
+            "/posts/",
+            data={"text": f"Post {index}", "profile_id": str(profile.id)},
+            files=fake_images,
+        )
+
+
+def count_queries(session: Session, request):
+    # 요청 동안 실행된 SQL 문 개수를 센다
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = request()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return response, len(statements)
+
+
+def test_read_posts_query_count_does_not_grow(
+    client: TestClient, session: Session, profiles: list
+):
+    create_posts_with_media(client, profiles[0], 2)
+    response, small_page_queries = count_queries(session, lambda: client.get("/posts/"))
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    create_posts_with_media(client, profiles[0], 8)
+    response, large_page_queries = count_queries(session, lambda: client.get("/posts/"))
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+
+    assert large_page_queries == small_page_queries
+
+
+def test_read_posts_keeps_media_order(client: TestClient, profiles: list):
+    fake_images = []
+    for index in range(3):
+        fake_image = io.BytesIO(b"fake image content")
+        fake_image.name = f"ordered{index}.jpg"
+        fake_image.content_type = "image/jpeg"
+        fake_images.append(("files", fake_image))
+
+    create_response = client.post(
+        "/posts/",
+        data={"text": "Ordered media", "profile_id": str(profiles[0].id)},
+        files=fake_images,
+    )
+    created_post = create_response.json()
+
+    response = client.get("/posts/")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data[0]["media_urls"] == created_post["media_urls"]
+    assert len(data[0]["media_urls"]) == 3
+
+
+def test_create_post_stores_size_and_content_hash(
+    client: TestClient, session: Session, profiles: list
+):
+    content = b"fake image content" * 1000
+    fake_image = io.BytesIO(content)
+    fake_image.name = "hashed.jpg"
+    fake_image.content_type = "image/jpeg"
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Hashed", "profile_id": str(profiles[0].id)},
+        files=[("files", fake_image)],
+    )
+    assert response.status_code == 200
+
+    media = session.exec(select(Media)).one()
+    assert media.file_size == len(content)
+    assert media.content_hash == hashlib.sha256(content).hexdigest()
+
+
+def test_create_post_rejects_file_over_limit(
+    client: TestClient, session: Session, profiles: list, monkeypatch
+):
+    monkeypatch.setattr(settings, "upload_chunk_size", 1024)
+    monkeypatch.setattr(settings, "upload_max_file_size", 4096)
+
+    small_image = io.BytesIO(b"x" * 1000)
+    small_image.name = "small.jpg"
+    small_image.content_type = "image/jpeg"
+    large_video = io.BytesIO(b"x" * 5000)
+    large_video.name = "large.mp4"
+    large_video.content_type = "video/mp4"
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Too large", "profile_id": str(profiles[0].id)},
+        files=[("files", small_image), ("files", large_video)],
+    )
+
+    assert response.status_code == 413
+    # 거부된 요청은 게시물과 미디어를 남기지 않는다
+    assert session.exec(select(Post)).all() == []
+    assert session.exec(select(Media)).all() == []
+
+
+def test_create_post_rejects_request_over_limit(
+    client: TestClient, session: Session, profiles: list, monkeypatch
+):
+    monkeypatch.setattr(settings, "upload_chunk_size", 1024)
+    monkeypatch.setattr(settings, "upload_max_request_size", 6000)
+
+    fake_images = []
+    for index in range(3):
+        fake_image = io.BytesIO(b"x" * 2500)
+        fake_image.name = f"part{index}.jpg"
+        fake_image.content_type = "image/jpeg"
+        fake_images.append(("files", fake_image))
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Too many", "profile_id": str(profiles[0].id)},
+        files=fake_images,
+    )
+
+    assert response.status_code == 413
+    assert "request limit" in response.json()["detail"]
+    assert session.exec(select(Post)).all() == []
+
+
+def test_create_post_rejects_image_bomb_from_header(
+    client: TestClient, session: Session, profiles: list
+):
+    # 헤더에 50000x50000이라고 적은 수십 바이트짜리 PNG
+    bomb = io.BytesIO(png_header_bomb(50_000, 50_000))
+    bomb.name = "bomb.png"
+    bomb.content_type = "image/png"
+    tmp_files = (
+        set(os.listdir("uploads/tmp")) if os.path.isdir("uploads/tmp") else set()
+    )
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Bomb", "profile_id": str(profiles[0].id)},
+        files=[("files", bomb)],
+    )
+
+    assert response.status_code == 413
+    assert "pixel" in response.json()["detail"]
+    assert session.exec(select(Post)).all() == []
+    assert session.exec(select(Media)).all() == []
+    # 받은 파일도 남기지 않는다
+    assert set(os.listdir("uploads/tmp")) == tmp_files
+
+
+def upload_post(client: TestClient, profile: Profile, file_count: int):
+    fake_images = []
+    for index in range(file_count):
+        fake_image = io.BytesIO(b"fake image content")
+        fake_image.name = f"batch{index}.jpg"
+        fake_image.content_type = "image/jpeg"
+        fake_images.append(("files", fake_image))
+    return client.post(
+        "/posts/",
+        data={"text": "Batch", "profile_id": str(profile.id)},
+        files=fake_images,
+    )
+
+
+def test_create_post_statement_count_does_not_grow(
+    client: TestClient, session: Session, profiles: list
+):
+    # 세션의 프로필이 expire된 상태(일반 요청과 같은 상태)에서 측정한다
+    upload_post(client, profiles[0], 1)
+    commits = []
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    engine = session.get_bind()
+    event.listen(engine, "commit", on_commit)
+    try:
+        response, single_file_statements = count_queries(
+            session, lambda: upload_post(client, profiles[0], 1)
+        )
+        assert response.status_code == 200
+        assert len(commits) == 1
+
+        response, many_file_statements = count_queries(
+            session, lambda: upload_post(client, profiles[0], 6)
+        )
+        assert response.status_code == 200
+        assert len(response.json()["media_urls"]) == 6
+        assert len(commits) == 2
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    # 파일 수와 관계없이 프로필 조회, blob 조회, post INSERT, media INSERT,
+    # blob 참조 upsert 한 번씩
+    assert many_file_statements == single_file_statements == 5
+
+
+def test_create_post_returns_renditions(
+    client: TestClient, session: Session, profiles: list
+):
+    image = io.BytesIO()
+    Image.new("RGB", (320, 200), (30, 120, 200)).save(image, "PNG")
+    image.seek(0)
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Renditions", "profile_id": str(profiles[0].id)},
+        files=[("files", ("photo.png", image, "image/png"))],
+    )
+    assert response.status_code == 200
+    media = response.json()["media"][0]
+
+    assert media["status"] == "ready"
+    assert (media["width"], media["height"]) == (320, 200)
+    assert media["placeholder"].startswith("data:image/webp;base64,")
+    sizes = [
+        (rendition["format"], rendition["width"], rendition["height"])
+        for rendition in media["renditions"]
+    ]
+    # 160은 축소하고, 원본보다 큰 480/1080은 원본 크기 그대로
+    assert sizes == [
+        ("jpeg", 160, 100),
+        ("webp", 160, 100),
+        ("jpeg", 320, 200),
+        ("webp", 320, 200),
+        ("jpeg", 320, 200),
+        ("webp", 320, 200),
+    ]
+    for rendition in media["renditions"]:
+        with Image.open(rendition["url"].lstrip("/")) as stored:
+            assert stored.format == rendition["format"].upper()
+
+    # 목록 조회에도 같은 렌디션이 포함된다
+    listed = client.get("/posts/").json()[0]["media"][0]
+    assert listed["renditions"] == media["renditions"]
+    assert listed["placeholder"] == media["placeholder"]
+
+
+def rotated_jpeg(size=(400, 200)) -> bytes:
+    """EXIF 방향 6(시계 방향 90도 회전)으로 저장된 JPEG"""
+    image = io.BytesIO()
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    Image.new("RGB", size, (90, 160, 30)).save(image, "JPEG", exif=exif)
+    return image.getvalue()
+
+
+def test_create_post_stores_size_after_exif_orientation(
+    client: TestClient, profiles: list
+):
+    response = client.post(
+        "/posts/",
+        data={"text": "Rotated", "profile_id": str(profiles[0].id)},
+        files=[("files", ("photo.jpg", rotated_jpeg(), "image/jpeg"))],
+    )
+    assert response.status_code == 200
+    media = response.json()["media"][0]
+
+    # 헤더는 400x200이지만 렌디션과 같이 회전한 200x400으로 보여진다
+    assert (media["width"], media["height"]) == (200, 400)
+    # 렌디션은 크기 순서이므로 첫 번째가 160 JPEG
+    small = media["renditions"][0]
+    assert small["format"] == "jpeg"
+    assert (small["width"], small["height"]) == (80, 160)
+
+
+def test_create_post_reads_video_metadata(
+    client: TestClient, session: Session, profiles: list
+):
+    video = io.BytesIO(build_mp4(1920, 1080, duration=8.0, codec=b"hvc1"))
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Video", "profile_id": str(profiles[0].id)},
+        files=[("files", ("clip.mp4", video, "video/mp4"))],
+    )
+    assert response.status_code == 200
+    media = response.json()["media"][0]
+
+    assert (media["width"], media["height"]) == (1920, 1080)
+    assert media["duration"] == 8.0
+    stored = session.exec(select(Media)).one()
+    assert (stored.duration, stored.video_codec) == (8.0, "hvc1")
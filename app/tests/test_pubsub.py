@@ -0,0 +1,127 @@
+import asyncio
+import os
+import tempfile
+import uuid
+
+from ..utils.connection_manager import ConnectionManager
+from ..utils.pubsub import (
+    RedisPubSubBackend,
+    encode_command,
+    open_connection,
+    read_reply,
+    room_channel,
+)
+from ..utils.resp_broker import start_broker
+from .test_connection_manager import FakeWebSocket
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_broadcast_reaches_connections_on_other_workers():
+    chat_id = uuid.uuid4()
+    other_chat_id = uuid.uuid4()
+    first = FakeWebSocket()
+    second = FakeWebSocket()
+    unrelated = FakeWebSocket()
+
+    async def scenario(socket_path: str):
+        server = await start_broker(unix=socket_path)
+        url = f"unix://{socket_path}"
+        # 워커 두 개를 흉내 낸 두 관리자가 같은 브로커를 공유한다
+        backends = [RedisPubSubBackend(url), RedisPubSubBackend(url)]
+        worker_a = ConnectionManager(backend=backends[0])
+        worker_b = ConnectionManager(backend=backends[1])
+        try:
+            await worker_a.connect(first, chat_id)
+            await worker_b.connect(second, chat_id)
+            await worker_b.connect(unrelated, other_chat_id)
+            channel = room_channel(chat_id)
+            await wait_for(
+                lambda: all(channel in b.subscribed_channels for b in backends)
+            )
+
+            await worker_a.broadcast("hello", chat_id)
+            await wait_for(lambda: first.received and second.received)
+
+            # 마지막 연결이 끊긴 방은 구독을 해지한다
+            worker_b.disconnect(second, chat_id)
+            await wait_for(lambda: channel not in backends[1].subscribed_channels)
+            await worker_a.broadcast("bye", chat_id)
+            await wait_for(lambda: len(first.received) == 2)
+        finally:
+            for backend in backends:
+                await backend.close()
+            server.close()
+            await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(os.path.join(tmp, "broker.sock")))
+
+    assert first.received == ["hello", "bye"]
+    assert second.received == ["hello"]
+    assert unrelated.received == []
+
+
+def test_publish_reconnects_after_broker_restart():
+    chat_id = uuid.uuid4()
+
+    async def scenario(socket_path: str):
+        url = f"unix://{socket_path}"
+        backend = RedisPubSubBackend(url)
+        server = await start_broker(unix=socket_path)
+        await backend.publish(chat_id, "first")
+        server.close()
+        server.close_clients()
+        await server.wait_closed()
+
+        # 브로커가 다시 뜨면 끊긴 publish 연결을 다시 만든다
+        server = await start_broker(unix=socket_path)
+        try:
+            await backend.publish(chat_id, "second")
+        finally:
+            await backend.close()
+            server.close()
+            await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(os.path.join(tmp, "broker.sock")))
+
+
+def test_subscriber_skips_messages_on_unexpected_channels():
+    chat_id = uuid.uuid4()
+    delivered = []
+
+    async def scenario(socket_path: str):
+        url = f"unix://{socket_path}"
+        server = await start_broker(unix=socket_path)
+        backend = RedisPubSubBackend(url)
+        backend.start(lambda chat, message: delivered.append((chat, message)))
+        reader, writer = await open_connection(url)
+        try:
+            backend.subscribe(chat_id)
+            await wait_for(lambda: room_channel(chat_id) in backend.subscribed_channels)
+            # 채팅방 형식이 아닌 채널의 메시지
+            bogus = "chat:not-a-uuid"
+            backend._subscriber_writer.write(encode_command("SUBSCRIBE", bogus))
+            await wait_for(lambda: bogus in backend.subscribed_channels)
+            writer.write(encode_command("PUBLISH", bogus, "ignored"))
+            await read_reply(reader)
+
+            await backend.publish(chat_id, "after")
+            await wait_for(lambda: delivered)
+            assert not backend._subscriber_task.done()
+        finally:
+            writer.close()
+            await backend.close()
+            server.close()
+            await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(os.path.join(tmp, "broker.sock")))
+
+    assert delivered == [(chat_id, "after")]
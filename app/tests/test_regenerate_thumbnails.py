@@ -0,0 +1,292 @@
+import io
+import json
+import logging
+import os
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from .. import regenerate_thumbnails as regenerate_module
+from ..config import settings
+from ..database import get_session
+from ..main import app
+from ..models.media import Media, MediaBlob, MediaRendition
+from ..models.profile import Profile
+from ..regenerate_thumbnails import (
+    TEMP_SUFFIX,
+    RegenerationProgress,
+    regenerate_thumbnails,
+    save_checkpoint,
+)
+from ..utils.blob_store import is_content_addressed
+from .test_post import rotated_jpeg
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session):
+    def get_session_override():
+        return session
+
+    app.dependency_overrides[get_session] = get_session_override
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+def png_bytes(color, size=(640, 400)) -> bytes:
+    image = io.BytesIO()
+    Image.new("RGB", size, color).save(image, "PNG")
+    return image.getvalue()
+
+
+def upload(client: TestClient, session: Session, *contents: bytes) -> list[Media]:
+    profile = session.exec(select(Profile)).one()
+    response = client.post(
+        "/media/",
+        data={"profile_id": str(profile.id)},
+        files=[
+            ("files", (f"photo{index}.png", content, "image/png"))
+            for index, content in enumerate(contents)
+        ],
+    )
+    assert response.status_code == 200
+    return sorted(
+        (session.get(Media, UUID(item["id"])) for item in response.json()),
+        key=lambda media: media.id,
+    )
+
+
+def rendition_sizes(session: Session, media: Media) -> list[tuple[int, str]]:
+    renditions = session.exec(
+        select(MediaRendition).where(MediaRendition.media_id == media.id)
+    ).all()
+    return sorted((rendition.max_size, rendition.format) for rendition in renditions)
+
+
+@pytest.fixture(name="new_settings")
+def new_settings_fixture(monkeypatch):
+    """업로드 뒤에 렌디션 크기와 형식을 바꾼다"""
+
+    def apply():
+        monkeypatch.setattr(settings, "media_rendition_sizes", [320])
+        monkeypatch.setattr(settings, "media_rendition_formats", ["webp"])
+
+    return apply
+
+
+def test_regenerates_renditions_with_current_settings(
+    client: TestClient, session: Session, new_settings, tmp_path
+):
+    media = upload(client, session, png_bytes((200, 0, 0)), png_bytes((0, 0, 200)))
+    old_urls = set(
+        session.exec(
+            select(MediaRendition.url).where(MediaRendition.media_id == media[0].id)
+        )
+    )
+    old_thumbnails = [item.thumbnail_url for item in media]
+    new_settings()
+    checkpoint = tmp_path / "checkpoint.json"
+    reported = []
+
+    progress = regenerate_thumbnails(
+        session.get_bind(),
+        batch_size=1,
+        checkpoint_path=str(checkpoint),
+        on_batch=lambda progress: reported.append(progress.scanned),
+    )
+
+    assert (progress.scanned, progress.regenerated, progress.failed) == (2, 2, 0)
+    # 배치마다 진행 상황을 알리고, 끝나면 체크포인트를 지운다
+    assert reported == [1, 2]
+    assert not checkpoint.exists()
+    session.expire_all()
+    for item, old_thumbnail in zip(media, old_thumbnails):
+        assert rendition_sizes(session, item) == [(320, "webp")]
+        # 캐시된 파일을 덮어쓰지 않고 버전이 붙은 새 이름으로 만든다
+        assert item.thumbnail_url != old_thumbnail
+        assert item.thumbnail_url.startswith(
+            f"/uploads/images/thumbnails/{item.content_hash}."
+        )
+        assert is_content_addressed(item.thumbnail_url.removeprefix("/uploads/"))
+        assert os.path.exists(item.thumbnail_url.lstrip("/"))
+        assert not os.path.exists(old_thumbnail.lstrip("/"))
+    for directory in ("thumbnails", "renditions"):
+        names = os.listdir(f"uploads/images/{directory}")
+        assert not any(name.endswith(TEMP_SUFFIX) for name in names)
+
+    rendition = session.exec(
+        select(MediaRendition).where(MediaRendition.media_id == media[0].id)
+    ).one()
+    assert (rendition.width, rendition.height) == (320, 200)
+    assert rendition.url.startswith(
+        f"/uploads/images/renditions/{media[0].content_hash}_320."
+    )
+    assert os.path.exists(rendition.url.lstrip("/"))
+    # 더 이상 쓰지 않는 렌디션 파일은 지운다
+    assert not any(
+        os.path.exists(url.lstrip("/")) for url in old_urls - {rendition.url}
+    )
+    blob = session.get(MediaBlob, media[0].content_hash)
+    assert [item["max_size"] for item in blob.renditions] == [320]
+    assert blob.thumbnail_url == media[0].thumbnail_url
+
+
+def test_regenerating_again_keeps_identical_files(
+    client: TestClient, session: Session, new_settings
+):
+    media = upload(client, session, png_bytes((60, 0, 60)))[0]
+    new_settings()
+    regenerate_thumbnails(session.get_bind())
+    session.expire_all()
+    thumbnail_url = session.get(Media, media.id).thumbnail_url
+    rendition_urls = set(
+        session.exec(
+            select(MediaRendition.url).where(MediaRendition.media_id == media.id)
+        )
+    )
+
+    regenerate_thumbnails(session.get_bind())
+
+    # 같은 설정이면 결과도 같으므로 이름과 파일이 그대로 남는다
+    session.expire_all()
+    assert session.get(Media, media.id).thumbnail_url == thumbnail_url
+    assert os.path.exists(thumbnail_url.lstrip("/"))
+    assert rendition_urls == set(
+        session.exec(
+            select(MediaRendition.url).where(MediaRendition.media_id == media.id)
+        )
+    )
+    assert all(os.path.exists(url.lstrip("/")) for url in rendition_urls)
+
+
+def test_failed_batch_leaves_served_files_untouched(
+    client: TestClient, session: Session, new_settings, monkeypatch
+):
+    media = upload(client, session, png_bytes((0, 90, 90)))[0]
+    old_thumbnail = media.thumbnail_url
+    with open(old_thumbnail.lstrip("/"), "rb") as file:
+        old_content = file.read()
+    new_settings()
+    files_before = {
+        directory: set(os.listdir(f"uploads/images/{directory}"))
+        for directory in ("thumbnails", "renditions")
+    }
+
+    def failing_stage(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(regenerate_module, "stage_regenerated", failing_stage)
+    with pytest.raises(RuntimeError):
+        regenerate_thumbnails(session.get_bind())
+
+    session.expire_all()
+    assert session.get(Media, media.id).thumbnail_url == old_thumbnail
+    with open(old_thumbnail.lstrip("/"), "rb") as file:
+        assert file.read() == old_content
+    # commit되지 않은 결과 파일은 남기지 않는다
+    for directory, names in files_before.items():
+        assert set(os.listdir(f"uploads/images/{directory}")) == names
+
+
+def test_media_sharing_a_blob_are_regenerated_once(
+    client: TestClient, session: Session, new_settings, monkeypatch
+):
+    same = png_bytes((0, 120, 0))
+    shared = upload(client, session, same) + upload(client, session, same)
+    upload(client, session, png_bytes((120, 120, 0)))
+    new_settings()
+
+    progress = regenerate_thumbnails(session.get_bind(), batch_size=1)
+
+    assert (progress.scanned, progress.regenerated, progress.shared) == (3, 2, 1)
+    session.expire_all()
+    assert rendition_sizes(session, shared[0]) == [(320, "webp")]
+    assert rendition_sizes(session, shared[1]) == [(320, "webp")]
+    # 같은 파일을 가리키는 행들은 함께 새 썸네일로 바뀐다
+    thumbnails = {session.get(Media, item.id).thumbnail_url for item in shared}
+    assert len(thumbnails) == 1
+    assert os.path.exists(thumbnails.pop().lstrip("/"))
+
+
+def test_resumes_from_checkpoint(
+    client: TestClient, session: Session, new_settings, tmp_path
+):
+    media = upload(
+        client,
+        session,
+        png_bytes((10, 0, 0)),
+        png_bytes((20, 0, 0)),
+        png_bytes((30, 0, 0)),
+    )
+    old_sizes = rendition_sizes(session, media[0])
+    new_settings()
+    checkpoint = tmp_path / "checkpoint.json"
+    # 첫 번째 배치까지 처리하고 중단된 상태
+    save_checkpoint(
+        str(checkpoint),
+        RegenerationProgress(last_id=str(media[0].id), scanned=1, regenerated=1),
+    )
+    assert json.loads(checkpoint.read_text())["last_id"] == str(media[0].id)
+
+    progress = regenerate_thumbnails(
+        session.get_bind(), batch_size=2, checkpoint_path=str(checkpoint)
+    )
+
+    assert (progress.scanned, progress.regenerated) == (3, 3)
+    session.expire_all()
+    assert rendition_sizes(session, media[0]) == old_sizes
+    assert rendition_sizes(session, media[1]) == [(320, "webp")]
+    assert rendition_sizes(session, media[2]) == [(320, "webp")]
+
+
+def test_missing_original_is_reported_and_left_unchanged(
+    client: TestClient, session: Session, new_settings, caplog
+):
+    media = upload(client, session, png_bytes((0, 0, 90)))[0]
+    old_sizes = rendition_sizes(session, media)
+    os.remove(media.original_url.lstrip("/"))
+    new_settings()
+
+    with caplog.at_level(logging.WARNING, logger=regenerate_module.__name__):
+        progress = regenerate_thumbnails(session.get_bind())
+
+    assert (progress.regenerated, progress.failed) == (0, 1)
+    # 실패는 진행 상황 출력과 구분되도록 로그로 남는다
+    assert [record.levelname for record in caplog.records] == ["WARNING"]
+    assert str(media.id) in caplog.records[0].getMessage()
+    session.expire_all()
+    assert rendition_sizes(session, media) == old_sizes
+    assert session.get(Media, media.id).status == "ready"
+
+
+def test_regenerated_size_applies_exif_orientation(
+    client: TestClient, session: Session
+):
+    media = upload(client, session, rotated_jpeg())[0]
+    # 방향을 적용하지 않던 때 저장된 헤더 크기
+    media.width, media.height = 400, 200
+    session.add(media)
+    session.commit()
+
+    regenerate_thumbnails(session.get_bind())
+
+    session.expire_all()
+    media = session.get(Media, media.id)
+    assert (media.width, media.height) == (200, 400)
+    assert session.get(MediaBlob, media.content_hash).width == 200
@@ -0,0 +1,321 @@
+import asyncio
+import base64
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+from starlette.requests import ClientDisconnect
+
+from ..config import settings
+from ..database import get_session
+from ..main import app
+from ..models.media import MEDIA_UNATTACHED, ResumableUpload
+from ..models.profile import Profile
+from ..routers import resumable_uploads
+from ..routers.resumable_uploads import partial_path
+from ..utils.resumable import (
+    OFFSET_CONTENT_TYPE,
+    append_stream,
+    lock_upload_file,
+    parse_upload_metadata,
+)
+from .test_media_utils import png_header_bomb
+
+
+@pytest.fixture(autouse=True)
+def uploads_in_tmp_path(tmp_path, monkeypatch):
+    """업로드 파일(uploads/ 상대 경로)을 실제 uploads 대신 tmp_path 아래에 쓴다"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session):
+    def get_session_override():
+        return session
+
+    app.dependency_overrides[get_session] = get_session_override
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="profile")
+def profile_fixture(session: Session):
+    return session.exec(select(Profile)).one()
+
+
+def encode_metadata(**values: str) -> str:
+    return ",".join(
+        f"{key} {base64.b64encode(value.encode()).decode()}"
+        for key, value in values.items()
+    )
+
+
+def png_bytes() -> bytes:
+    image = io.BytesIO()
+    Image.new("RGB", (320, 200), (200, 80, 40)).save(image, "PNG")
+    return image.getvalue()
+
+
+def create_upload(client: TestClient, profile: Profile, data: bytes) -> str:
+    response = client.post(
+        "/media/uploads",
+        headers={
+            "Upload-Length": str(len(data)),
+            "Upload-Metadata": encode_metadata(
+                profile_id=str(profile.id), filename="photo.png", filetype="image/png"
+            ),
+        },
+    )
+    assert response.status_code == 201
+    assert response.headers["Upload-Offset"] == "0"
+    return response.headers["Location"]
+
+
+def send_chunk(client: TestClient, location: str, offset: int, chunk: bytes):
+    return client.patch(
+        location,
+        content=chunk,
+        headers={"Upload-Offset": str(offset), "Content-Type": OFFSET_CONTENT_TYPE},
+    )
+
+
+def test_upload_in_chunks_and_finalize(
+    client: TestClient, session: Session, profile: Profile
+):
+    data = png_bytes()
+    location = create_upload(client, profile, data)
+
+    middle = len(data) // 2
+    response = send_chunk(client, location, 0, data[:middle])
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == str(middle)
+
+    # 연결이 끊긴 클라이언트는 HEAD로 이어서 보낼 위치를 확인한다
+    response = client.head(location)
+    assert response.headers["Upload-Offset"] == str(middle)
+    assert response.headers["Upload-Length"] == str(len(data))
+
+    response = client.post(f"{location}/finalize")
+    assert response.status_code == 409
+
+    assert send_chunk(client, location, middle, data[middle:]).status_code == 204
+    response = client.post(f"{location}/finalize")
+    assert response.status_code == 200
+    media = response.json()
+
+    # POST /media/로 올린 것과 같은 미연결 미디어가 된다
+    assert media["object_type"] == MEDIA_UNATTACHED
+    assert media["object_id"] == str(profile.id)
+    assert media["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert (media["file_size"], media["width"], media["height"]) == (
+        len(data),
+        320,
+        200,
+    )
+    with open(media["original_url"].lstrip("/"), "rb") as file:
+        assert file.read() == data
+    assert session.exec(select(ResumableUpload)).all() == []
+    assert not os.path.exists(partial_path(location.rsplit("/", 1)[1]))
+
+
+def test_chunk_at_wrong_offset_is_rejected(client: TestClient, profile: Profile):
+    location = create_upload(client, profile, b"x" * 100)
+    assert send_chunk(client, location, 0, b"x" * 40).status_code == 204
+
+    # 같은 청크를 다시 보내거나 건너뛰면 offset이 맞지 않는다
+    assert send_chunk(client, location, 0, b"x" * 40).status_code == 409
+    assert send_chunk(client, location, 80, b"x" * 20).status_code == 409
+    response = client.patch(
+        location,
+        content=b"x" * 60,
+        headers={"Upload-Offset": "40", "Content-Type": "application/octet-stream"},
+    )
+    assert response.status_code == 415
+    assert client.head(location).headers["Upload-Offset"] == "40"
+
+
+def test_chunk_larger_than_remaining_length_is_rejected(
+    client: TestClient, profile: Profile, monkeypatch
+):
+    location = create_upload(client, profile, b"x" * 100)
+    assert send_chunk(client, location, 0, b"x" * 150).status_code == 413
+
+    # 요청 하나의 크기도 제한된다
+    monkeypatch.setattr(settings, "resumable_upload_max_chunk_size", 30)
+    assert send_chunk(client, location, 0, b"x" * 40).status_code == 413
+    assert send_chunk(client, location, 0, b"x" * 30).status_code == 204
+    assert client.head(location).headers["Upload-Offset"] == "30"
+
+
+def test_create_upload_checks_type_and_size(client: TestClient, profile: Profile):
+    headers = {
+        "Upload-Length": "100",
+        "Upload-Metadata": encode_metadata(
+            profile_id=str(profile.id), filename="notes.txt", filetype="text/plain"
+        ),
+    }
+    assert client.post("/media/uploads", headers=headers).status_code == 415
+
+    headers["Upload-Length"] = str(settings.upload_max_file_size + 1)
+    headers["Upload-Metadata"] = encode_metadata(
+        profile_id=str(profile.id), filename="long.mp4", filetype="video/mp4"
+    )
+    assert client.post("/media/uploads", headers=headers).status_code == 413
+
+    headers["Upload-Metadata"] = "profile_id not-base64!"
+    assert client.post("/media/uploads", headers=headers).status_code == 422
+
+
+def test_chunk_is_rejected_while_another_worker_appends(
+    client: TestClient, profile: Profile
+):
+    location = create_upload(client, profile, b"x" * 100)
+    path = partial_path(location.rsplit("/", 1)[1])
+
+    # 다른 worker 프로세스의 PATCH가 파일 잠금을 쥐고 있다
+    lock = lock_upload_file(path)
+    try:
+        assert send_chunk(client, location, 0, b"y" * 40).status_code == 409
+        assert os.path.getsize(path) == 0
+    finally:
+        lock.close()
+
+    assert send_chunk(client, location, 0, b"y" * 40).status_code == 204
+    assert client.head(location).headers["Upload-Offset"] == "40"
+
+
+def test_finalize_loser_gets_conflict(
+    client: TestClient, session: Session, profile: Profile, monkeypatch
+):
+    data = png_bytes()
+    location = create_upload(client, profile, data)
+    send_chunk(client, location, 0, data)
+    get_upload = resumable_uploads.get_upload
+
+    def finalized_meanwhile(session: Session, upload_id):
+        upload = get_upload(session, upload_id)
+        loaded = ResumableUpload(**upload.model_dump())
+        # 행을 읽은 직후 다른 finalize 요청이 먼저 업로드를 가져갔다
+        session.delete(upload)
+        session.commit()
+        os.remove(partial_path(upload_id))
+        return loaded
+
+    monkeypatch.setattr(resumable_uploads, "get_upload", finalized_meanwhile)
+
+    response = client.post(f"{location}/finalize")
+
+    assert response.status_code == 409
+
+
+def test_failed_finalize_can_be_retried(
+    client: TestClient, session: Session, profile: Profile, monkeypatch
+):
+    data = png_bytes()
+    location = create_upload(client, profile, data)
+    send_chunk(client, location, 0, data)
+    stage_uploaded_media = resumable_uploads.stage_uploaded_media
+
+    def failing_stage(session: Session, stored_media):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(resumable_uploads, "stage_uploaded_media", failing_stage)
+    with pytest.raises(RuntimeError):
+        client.post(f"{location}/finalize")
+
+    # 되돌린 트랜잭션이 업로드 행을, 실패 처리가 파일을 되살린다
+    assert session.exec(select(ResumableUpload)).one().offset == len(data)
+    assert os.path.getsize(partial_path(location.rsplit("/", 1)[1])) == len(data)
+
+    monkeypatch.setattr(resumable_uploads, "stage_uploaded_media", stage_uploaded_media)
+    assert client.post(f"{location}/finalize").status_code == 200
+
+
+def test_finalize_rejects_image_bomb(
+    client: TestClient, session: Session, profile: Profile
+):
+    data = png_header_bomb(50_000, 50_000)
+    location = create_upload(client, profile, data)
+    send_chunk(client, location, 0, data)
+
+    response = client.post(f"{location}/finalize")
+
+    assert response.status_code == 413
+    # 내용 자체가 거절되었으므로 업로드도 지운다
+    assert session.exec(select(ResumableUpload)).all() == []
+    assert not os.path.exists(partial_path(location.rsplit("/", 1)[1]))
+
+
+def test_delete_upload_removes_partial_file(client: TestClient, profile: Profile):
+    location = create_upload(client, profile, b"x" * 100)
+    send_chunk(client, location, 0, b"x" * 50)
+    path = partial_path(location.rsplit("/", 1)[1])
+    assert os.path.getsize(path) == 50
+
+    assert client.delete(location).status_code == 204
+    assert not os.path.exists(path)
+    assert client.head(location).status_code == 404
+
+
+def test_parse_upload_metadata():
+    header = encode_metadata(filename="사진.png", filetype="image/png") + ",is_final"
+    assert parse_upload_metadata(header) == {
+        "filename": "사진.png",
+        "filetype": "image/png",
+        "is_final": "",
+    }
+    assert parse_upload_metadata(None) == {}
+    with pytest.raises(ValueError):
+        parse_upload_metadata("filename a b c")
+
+
+def test_append_stream_keeps_bytes_received_before_disconnect(tmp_path):
+    path = tmp_path / "upload"
+    # offset 뒤에 남은 바이트(기록되지 못한 이전 시도)는 덮어쓴다
+    path.write_bytes(b"head" + b"stale")
+
+    async def dropped_body():
+        yield b"a" * 3
+        yield b"b" * 3
+        raise ClientDisconnect()
+
+    result = asyncio.run(
+        append_stream(str(path), 4, dropped_body(), max_size=100, buffer_size=4)
+    )
+
+    assert (result.written, result.interrupted) == (6, True)
+    assert path.read_bytes() == b"head" + b"aaabbb"
+
+
+def test_append_stream_discards_oversized_chunk(tmp_path):
+    path = tmp_path / "upload"
+    path.write_bytes(b"head")
+
+    async def body():
+        for _ in range(4):
+            yield b"x" * 3
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(append_stream(str(path), 4, body(), max_size=10, buffer_size=2))
+
+    assert error.value.status_code == 413
+    assert path.read_bytes() == b"head"
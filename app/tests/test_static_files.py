@@ -0,0 +1,140 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ..utils.blob_store import is_content_addressed
+from ..utils.static_files import IMMUTABLE_CACHE_CONTROL, CachedStaticFiles
+
+CONTENT = bytes(range(256)) * 64  # 16 KiB
+CONTENT_HASH = "c" * 64
+CLIP = f"/uploads/videos/originals/{CONTENT_HASH}.mp4"
+LEGACY_CLIP = "/uploads/videos/originals/3f6c1a52-9c1e-4d0f-8a51-0c9f2b0d7e11.mp4"
+
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path):
+    uploads = tmp_path / "uploads"
+    os.makedirs(uploads / "videos/originals")
+    os.makedirs(uploads / "images/thumbnails")
+    for path in (CLIP, LEGACY_CLIP):
+        (tmp_path / path.lstrip("/")).write_bytes(CONTENT)
+    (uploads / f"images/thumbnails/{CONTENT_HASH}.jpg").write_bytes(b"thumbnail")
+    static = tmp_path / "static"
+    os.makedirs(static)
+    (static / "app.js").write_text("console.log('hi')")
+
+    app = FastAPI()
+    app.mount(
+        "/uploads",
+        CachedStaticFiles(
+            directory=str(uploads),
+            cache_control="no-cache",
+            immutable=is_content_addressed,
+            chunk_size=4096,
+        ),
+    )
+    app.mount(
+        "/static", CachedStaticFiles(directory=str(static), cache_control="no-cache")
+    )
+    return TestClient(app)
+
+
+def test_uploads_are_immutable_with_strong_etag(client: TestClient):
+    response = client.get(CLIP)
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["accept-ranges"] == "bytes"
+    # 파일 이름(경로)이 내용을 나타내므로 경로와 크기가 강한 ETag가 된다
+    assert response.headers["etag"] == f'"{CLIP[len("/uploads/"):]}:{len(CONTENT)}"'
+    thumbnail = client.get(f"/uploads/images/thumbnails/{CONTENT_HASH}.jpg")
+    assert thumbnail.headers["etag"] != response.headers["etag"]
+
+
+def test_revalidation_returns_not_modified(client: TestClient):
+    etag = client.get(CLIP).headers["etag"]
+
+    response = client.get(CLIP, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_range_request_sends_only_requested_bytes(client: TestClient):
+    response = client.get(CLIP, headers={"Range": "bytes=5000-5099"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[5000:5100]
+    assert response.headers["content-range"] == f"bytes 5000-5099/{len(CONTENT)}"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    # 탐색 위치부터 끝까지
+    tail = client.get(CLIP, headers={"Range": "bytes=16000-"})
+    assert tail.status_code == 206
+    assert tail.content == CONTENT[16000:]
+
+
+def test_if_range_with_stale_etag_sends_whole_file(client: TestClient):
+    etag = client.get(CLIP).headers["etag"]
+
+    current = client.get(
+        CLIP,
+        headers={"Range": "bytes=0-9", "If-Range": etag},
+    )
+    stale = client.get(
+        CLIP,
+        headers={"Range": "bytes=0-9", "If-Range": '"other"'},
+    )
+
+    assert current.status_code == 206
+    assert stale.status_code == 200
+    assert stale.content == CONTENT
+
+
+def test_unsatisfiable_range(client: TestClient):
+    response = client.get(CLIP, headers={"Range": "bytes=99999-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_static_files_are_revalidated(client: TestClient):
+    response = client.get("/static/app.js")
+
+    assert response.headers["cache-control"] == "no-cache"
+    # 배포 때 바뀔 수 있는 파일은 수정 시각과 크기로 만든 ETag를 쓴다
+    etag = response.headers["etag"]
+    assert etag != '"app.js"'
+    assert (
+        client.get("/static/app.js", headers={"If-None-Match": etag}).status_code == 304
+    )
+
+
+def test_uploads_not_named_by_content_are_revalidated(client: TestClient, tmp_path):
+    response = client.get(LEGACY_CLIP)
+
+    # 이름이 내용을 나타내지 않는 파일은 같은 경로의 내용이 바뀔 수 있다
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    assert LEGACY_CLIP.rsplit("/", 1)[1] not in etag
+    assert client.get(LEGACY_CLIP, headers={"If-None-Match": etag}).status_code == 304
+
+    path = tmp_path / LEGACY_CLIP.lstrip("/")
+    path.write_bytes(b"rewritten")
+    os.utime(path, (1, 1))
+    changed = client.get(LEGACY_CLIP, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.content == b"rewritten"
+
+
+def test_is_content_addressed():
+    assert is_content_addressed(f"images/originals/{CONTENT_HASH}.png")
+    assert is_content_addressed(f"images/renditions/{CONTENT_HASH}_160.webp")
+    assert not is_content_addressed("images/originals/3f6c1a52.png")
+    # 해시 이름이라도 blob 디렉터리 밖의 파일은 아니다
+    assert not is_content_addressed(f"tmp/{CONTENT_HASH}.png")
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import io
+import os
+from typing import List
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+
+from ..utils.uploads import UploadLimiter, UploadSizeLimitMiddleware
+
+
+class CountingReader(io.BytesIO):
+    """read 호출마다 요청한 크기를 기록하는 파일 객체"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.requested = []
+
+    def read(self, size=-1):
+        self.requested.append(size)
+        return super().read(size)
+
+
+def test_save_streams_in_chunks_and_hashes(tmp_path):
+    data = os.urandom(10_000)
+    source = CountingReader(data)
+    limiter = UploadLimiter(
+        max_file_size=20_000, max_request_size=20_000, chunk_size=4096
+    )
+
+    stored = limiter.save(source, tmp_path / "file.bin")
+
+    assert stored.size == len(data)
+    assert stored.content_hash == hashlib.sha256(data).hexdigest()
+    assert (tmp_path / "file.bin").read_bytes() == data
+    # 파일 전체를 한 번에 읽지 않는다
+    assert set(source.requested) == {4096}
+
+
+def test_save_removes_partial_file_over_file_limit(tmp_path):
+    limiter = UploadLimiter(
+        max_file_size=5000, max_request_size=100_000, chunk_size=1024
+    )
+
+    with pytest.raises(HTTPException) as error:
+        limiter.save(io.BytesIO(b"x" * 6000), tmp_path / "big.bin")
+
+    assert error.value.status_code == 413
+    assert not (tmp_path / "big.bin").exists()
+    assert limiter.total_size == 0
+
+
+def test_save_enforces_request_limit_across_files(tmp_path):
+    limiter = UploadLimiter(max_file_size=5000, max_request_size=8000, chunk_size=1024)
+    limiter.save(io.BytesIO(b"x" * 5000), tmp_path / "first.bin")
+
+    with pytest.raises(HTTPException) as error:
+        limiter.save(io.BytesIO(b"x" * 4000), tmp_path / "second.bin")
+
+    assert error.value.status_code == 413
+    assert (tmp_path / "first.bin").exists()
+    assert not (tmp_path / "second.bin").exists()
+
+
+BOUNDARY = "limit-test-boundary"
+
+
+def upload_app(calls: list) -> UploadSizeLimitMiddleware:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(files: List[UploadFile] = File(...)):
+        calls.append([file.filename for file in files])
+        return {}
+
+    return UploadSizeLimitMiddleware(app, max_size=10_000)
+
+
+def multipart_chunks(size: int, chunk_size: int = 1000) -> list[bytes]:
+    head = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="files"; filename="big.bin"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    body = [b"x" * chunk_size for _ in range(size // chunk_size)]
+    return [head, *body, tail]
+
+
+def post_chunks(app, chunks: list[bytes], content_length: int | None):
+    """본문을 청크로 보내고 (응답 상태, 앱이 읽어 간 청크 수)를 반환합니다."""
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+    pulled = 0
+    statuses = []
+
+    async def receive():
+        nonlocal pulled
+        if pulled < len(chunks):
+            pulled += 1
+            return {
+                "type": "http.request",
+                "body": chunks[pulled - 1],
+                "more_body": pulled < len(chunks),
+            }
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    asyncio.run(app(scope, receive, send))
+    return statuses[0], pulled
+
+
+def test_upload_over_content_length_limit_is_rejected_before_reading():
+    calls = []
+    chunks = multipart_chunks(50_000)
+
+    status, pulled = post_chunks(
+        upload_app(calls), chunks, sum(len(chunk) for chunk in chunks)
+    )
+
+    assert status == 413
+    # 본문을 한 바이트도 읽지 않는다
+    assert pulled == 0
+    assert calls == []
+
+
+def test_streamed_upload_is_rejected_once_limit_is_exceeded():
+    calls = []
+    chunks = multipart_chunks(50_000)
+
+    # Content-Length 없이 (chunked) 보내면 받은 크기로 제한한다
+    status, pulled = post_chunks(upload_app(calls), chunks, None)
+
+    assert status == 413
+    assert pulled <= 12
+    assert calls == []
+
+
+def test_upload_under_limit_reaches_endpoint():
+    calls = []
+    chunks = multipart_chunks(5_000)
+
+    status, _ = post_chunks(
+        upload_app(calls), chunks, sum(len(chunk) for chunk in chunks)
+    )
+
+    assert status == 200
+    assert calls == [["big.bin"]]
@@ -0,0 +1,124 @@
+import asyncio
+import os
+
+from ..utils.variant_cache import VariantCache
+
+
+def make_render(calls: list, size: int, delay: float = 0):
+    async def render(path: str):
+        calls.append(path)
+        await asyncio.sleep(delay)
+        with open(path, "wb") as file:
+            file.write(b"x" * size)
+
+    return render
+
+
+def test_concurrent_requests_share_one_render(tmp_path):
+    cache = VariantCache(str(tmp_path), max_bytes=10_000)
+    calls = []
+
+    async def scenario():
+        render = make_render(calls, 100, delay=0.05)
+        return await asyncio.gather(
+            *(cache.get_or_create("a:100:webp", "webp", render) for _ in range(5))
+        )
+
+    paths = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert len(set(paths)) == 1
+    assert os.path.getsize(paths[0]) == 100
+
+
+def test_cached_variant_is_not_rendered_again(tmp_path):
+    cache = VariantCache(str(tmp_path), max_bytes=10_000)
+    calls = []
+
+    async def scenario():
+        render = make_render(calls, 100)
+        first = await cache.get_or_create("a:100:webp", "webp", render)
+        second = await cache.get_or_create("a:100:webp", "webp", render)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_least_recently_used_variant_is_evicted(tmp_path):
+    cache = VariantCache(str(tmp_path), max_bytes=250)
+    calls = []
+
+    async def scenario():
+        render = make_render(calls, 100)
+        a = await cache.get_or_create("a", "webp", render)
+        b = await cache.get_or_create("b", "webp", render)
+        # a를 다시 사용했으므로 c를 넣으면 b가 지워진다
+        await cache.get_or_create("a", "webp", render)
+        c = await cache.get_or_create("c", "webp", render)
+        return a, b, c
+
+    a, b, c = asyncio.run(scenario())
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert os.path.exists(c)
+    assert cache.total_bytes == 200
+
+
+def test_existing_files_are_loaded_and_bounded(tmp_path):
+    for name in ("old.webp", "new.webp"):
+        (tmp_path / name).write_bytes(b"x" * 100)
+    os.utime(tmp_path / "old.webp", (1, 1))
+
+    cache = VariantCache(str(tmp_path), max_bytes=150)
+
+    assert cache.total_bytes == 100
+    assert not (tmp_path / "old.webp").exists()
+    assert (tmp_path / "new.webp").exists()
+
+
+def test_failed_render_leaves_no_file(tmp_path):
+    cache = VariantCache(str(tmp_path), max_bytes=10_000)
+
+    async def render(path: str):
+        with open(path, "wb") as file:
+            file.write(b"partial")
+        raise RuntimeError("decode failed")
+
+    async def scenario():
+        try:
+            await cache.get_or_create("a", "webp", render)
+        except RuntimeError:
+            pass
+
+    asyncio.run(scenario())
+
+    assert os.listdir(tmp_path) == []
+    assert cache.total_bytes == 0
+
+
+def test_variant_removed_before_read_is_rendered_again(tmp_path):
+    cache = VariantCache(str(tmp_path), max_bytes=10_000)
+    calls = []
+    get_or_create = cache.get_or_create
+
+    async def evicted_after_lookup(key, extension, render):
+        # 경로를 돌려받은 직후 다른 요청의 정리로 파일이 지워진다
+        path = await get_or_create(key, extension, render)
+        if len(calls) == 1:
+            os.remove(path)
+        return path
+
+    cache.get_or_create = evicted_after_lookup
+
+    async def scenario():
+        return await cache.read("a", "webp", make_render(calls, 100))
+
+    content = asyncio.run(scenario())
+
+    assert content == b"x" * 100
+    assert len(calls) == 2
+    assert cache.total_bytes == 100
@@ -0,0 +1,193 @@
+import io
+import struct
+
+import pytest
+
+from ..utils.media_utils import MediaProcessingError
+from ..utils.video_meta import probe_video, read_video_metadata
+
+# tkhd 변환 행렬 (16.16 고정소수점, 마지막 열은 2.30)
+IDENTITY_MATRIX = (0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+ROTATE_90_MATRIX = (0, 0x10000, 0, -0x10000, 0, 0, 0, 0, 0x40000000)
+
+
+def box(box_type: bytes, *children: bytes, large: bool = False) -> bytes:
+    payload = b"".join(children)
+    if large:
+        return struct.pack(">I4sQ", 1, box_type, len(payload) + 16) + payload
+    return struct.pack(">I4s", len(payload) + 8, box_type) + payload
+
+
+def full_box(box_type: bytes, version: int, body: bytes) -> bytes:
+    return box(box_type, struct.pack(">I", version << 24) + body)
+
+
+def mvhd(timescale: int, duration: int, version: int = 0) -> bytes:
+    if version == 1:
+        times = struct.pack(">QQIQ", 0, 0, timescale, duration)
+    else:
+        times = struct.pack(">IIII", 0, 0, timescale, duration)
+    return full_box(b"mvhd", version, times + bytes(80))
+
+
+def tkhd(width: int, height: int, matrix=IDENTITY_MATRIX) -> bytes:
+    body = struct.pack(">IIIII", 0, 0, 1, 0, 0) + bytes(16)
+    body += struct.pack(">9i", *matrix)
+    body += struct.pack(">II", width << 16, height << 16)
+    return full_box(b"tkhd", 0, body)
+
+
+def trak(
+    handler: bytes,
+    codec: bytes,
+    timescale: int,
+    duration: int,
+    width: int = 0,
+    height: int = 0,
+    matrix=IDENTITY_MATRIX,
+) -> bytes:
+    if handler == b"vide":
+        # VisualSampleEntry
+        entry = bytes(6) + struct.pack(">H", 1) + bytes(16)
+        entry += struct.pack(">HH", width, height) + bytes(50)
+    else:
+        entry = bytes(6) + struct.pack(">H", 1) + bytes(20)
+    stsd = full_box(b"stsd", 0, struct.pack(">I", 1) + box(codec, entry))
+    return box(
+        b"trak",
+        tkhd(width, height, matrix),
+        box(
+            b"mdia",
+            full_box(b"mdhd", 0, struct.pack(">IIII", 0, 0, timescale, duration)),
+            full_box(b"hdlr", 0, bytes(4) + handler + bytes(13)),
+            box(b"minf", box(b"stbl", stsd)),
+        ),
+    )
+
+
+def build_mp4(
+    width: int = 1920,
+    height: int = 1080,
+    *,
+    duration: float = 12.5,
+    codec: bytes = b"avc1",
+    matrix=IDENTITY_MATRIX,
+    mdat_size: int = 1024,
+    moov_first: bool = False,
+    large_mdat: bool = False,
+    mvhd_version: int = 0,
+) -> bytes:
+    """테스트용 최소 MP4 (ftyp, mdat, moov(mvhd, 동영상 trak, 오디오 trak))"""
+    moov = box(
+        b"moov",
+        mvhd(1000, int(duration * 1000), version=mvhd_version),
+        trak(
+            b"vide",
+            codec,
+            90000,
+            int(duration * 90000),
+            width=width,
+            height=height,
+            matrix=matrix,
+        ),
+        trak(b"soun", b"mp4a", 48000, int(duration * 48000)),
+    )
+    ftyp = box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomavc1")
+    mdat = box(b"mdat", bytes(mdat_size), large=large_mdat)
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+class CountingReader(io.BytesIO):
+    """read로 실제 읽은 바이트 수를 센다"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_read_video_metadata():
+    metadata = read_video_metadata(io.BytesIO(build_mp4()))
+
+    assert (metadata.width, metadata.height) == (1920, 1080)
+    assert metadata.duration == 12.5
+    assert metadata.video_codec == "avc1"
+    assert metadata.audio_codec == "mp4a"
+    assert metadata.rotation == 0
+
+
+@pytest.mark.parametrize("moov_first", [False, True])
+def test_read_video_metadata_skips_media_data(moov_first):
+    data = build_mp4(mdat_size=4 * 1024 * 1024, moov_first=moov_first)
+    reader = CountingReader(data)
+
+    read_video_metadata(reader)
+
+    # mdat는 읽지 않고 건너뛴다
+    assert reader.bytes_read < 4096
+
+
+def test_read_video_metadata_handles_large_boxes_and_version_1():
+    data = build_mp4(codec=b"hvc1", large_mdat=True, mvhd_version=1)
+
+    metadata = read_video_metadata(io.BytesIO(data))
+
+    assert metadata.video_codec == "hvc1"
+    assert metadata.duration == 12.5
+
+
+def test_read_video_metadata_applies_rotation():
+    data = build_mp4(1920, 1080, matrix=ROTATE_90_MATRIX)
+
+    metadata = read_video_metadata(io.BytesIO(data))
+
+    # 세로로 촬영한 휴대폰 동영상은 표시 크기가 세로 방향이다
+    assert (metadata.width, metadata.height) == (1080, 1920)
+    assert metadata.rotation == 90
+
+
+def test_read_video_metadata_ignores_other_containers():
+    webm = b"\x1a\x45\xdf\xa3" + bytes(64)
+
+    assert read_video_metadata(io.BytesIO(webm)) is None
+    assert read_video_metadata(io.BytesIO(b"")) is None
+
+
+def test_read_video_metadata_rejects_truncated_file(tmp_path):
+    data = build_mp4()
+    path = tmp_path / "truncated.mp4"
+    path.write_bytes(data[: len(data) - 100])
+
+    with pytest.raises(MediaProcessingError) as error:
+        probe_video(str(path))
+
+    assert error.value.stage == "parse"
+
+
+@pytest.mark.parametrize(
+    "moov",
+    [
+        box(b"moov", box(b"mvhd")),
+        box(b"moov", full_box(b"mvhd", 1, bytes(8))),
+        box(b"moov", mvhd(1000, 5000), box(b"trak", box(b"tkhd"))),
+        # 잘린 tkhd 뒤의 박스를 tkhd 필드로 읽지 않는다
+        box(
+            b"moov",
+            mvhd(1000, 5000),
+            box(b"trak", full_box(b"tkhd", 0, bytes(40)), box(b"free", bytes(64))),
+        ),
+        box(b"moov", mvhd(1000, 5000), box(b"trak", box(b"mdia", box(b"hdlr")))),
+    ],
+    ids=["empty-mvhd", "short-mvhd-v1", "empty-tkhd", "short-tkhd", "empty-hdlr"],
+)
+def test_read_video_metadata_rejects_truncated_boxes(moov):
+    ftyp = box(b"ftyp", b"isom" + struct.pack(">I", 512) + b"isomavc1")
+
+    with pytest.raises(MediaProcessingError) as error:
+        read_video_metadata(io.BytesIO(ftyp + moov))
+
+    assert error.value.stage == "parse"
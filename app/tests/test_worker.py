@@ -0,0 +1,162 @@
+import io
+import logging
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from ..config import settings
+from ..database import get_session
+from ..main import app
+from ..models.job import JOB_DONE, Job
+from ..models.profile import Profile
+from .. import worker
+from ..worker import run_once
+from .test_post import rotated_jpeg
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Profile(name="TestUser1", bio="Test Bio 1"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(name="client")
+def client_fixture(session: Session, monkeypatch):
+    monkeypatch.setattr(settings, "media_background_processing", True)
+
+    def get_session_override():
+        return session
+
+    app.dependency_overrides[get_session] = get_session_override
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+def test_upload_returns_before_media_is_processed(client: TestClient, session: Session):
+    profile = session.exec(select(Profile)).one()
+    image = io.BytesIO()
+    Image.new("RGB", (320, 200), (200, 100, 50)).save(image, "PNG")
+    image.seek(0)
+    image.name = "photo.png"
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Background", "profile_id": str(profile.id)},
+        files=[("files", ("photo.png", image, "image/png"))],
+    )
+    assert response.status_code == 200
+
+    media_id = session.exec(select(Job)).one().payload["media_id"]
+    pending = client.get(f"/media/{media_id}").json()
+    assert pending["status"] == "pending"
+    assert pending["width"] is None
+
+    # 워커가 작업을 처리하면 크기와 썸네일이 채워진다
+    assert run_once(session.get_bind())
+    assert not run_once(session.get_bind())
+
+    ready = client.get(f"/media/{media_id}").json()
+    assert ready["status"] == "ready"
+    assert (ready["width"], ready["height"]) == (320, 200)
+    assert os.path.exists(ready["thumbnail_url"].lstrip("/"))
+    renditions = client.get("/posts/").json()[0]["media"][0]["renditions"]
+    assert len(renditions) == 6
+    assert all(os.path.exists(r["url"].lstrip("/")) for r in renditions)
+    session.expire_all()
+    assert session.exec(select(Job)).one().status == JOB_DONE
+
+
+def test_read_media_not_found(client: TestClient):
+    response = client.get("/media/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+def test_worker_processes_identical_uploads_once(
+    client: TestClient, session: Session, monkeypatch
+):
+    profile = session.exec(select(Profile)).one()
+    image = io.BytesIO()
+    Image.new("RGB", (320, 200), (20, 40, 250)).save(image, "PNG")
+    content = image.getvalue()
+    processed = []
+    process_media = worker.process_media
+
+    def counting_process_media(job):
+        processed.append(job.original_path)
+        return process_media(job)
+
+    monkeypatch.setattr(worker, "process_media", counting_process_media)
+
+    response = client.post(
+        "/posts/",
+        data={"text": "Twice", "profile_id": str(profile.id)},
+        files=[
+            ("files", ("a.png", io.BytesIO(content), "image/png")),
+            ("files", ("b.png", io.BytesIO(content), "image/png")),
+        ],
+    )
+    assert response.status_code == 200
+    assert len(session.exec(select(Job)).all()) == 2
+
+    while run_once(session.get_bind()):
+        pass
+
+    # 두 번째 작업은 처음 작업이 blob에 저장한 결과를 복사한다
+    assert len(processed) == 1
+    media = client.get("/posts/").json()[0]["media"]
+    assert [item["status"] for item in media] == ["ready", "ready"]
+    assert media[0]["renditions"] == media[1]["renditions"]
+    assert len(media[0]["renditions"]) == 6
+
+
+def test_worker_stores_size_after_exif_orientation(
+    client: TestClient, session: Session
+):
+    profile = session.exec(select(Profile)).one()
+    response = client.post(
+        "/posts/",
+        data={"text": "Rotated", "profile_id": str(profile.id)},
+        files=[("files", ("photo.jpg", rotated_jpeg(), "image/jpeg"))],
+    )
+    assert response.status_code == 200
+
+    while run_once(session.get_bind()):
+        pass
+
+    media = client.get("/posts/").json()[0]["media"][0]
+    assert media["status"] == "ready"
+    assert (media["width"], media["height"]) == (200, 400)
+
+
+def test_worker_logs_media_that_cannot_be_processed(
+    client: TestClient, session: Session, caplog
+):
+    profile = session.exec(select(Profile)).one()
+    response = client.post(
+        "/posts/",
+        data={"text": "Broken", "profile_id": str(profile.id)},
+        files=[("files", ("broken.jpg", io.BytesIO(b"not an image"), "image/jpeg"))],
+    )
+    assert response.status_code == 200
+
+    with caplog.at_level(logging.WARNING, logger="app.worker"):
+        while run_once(session.get_bind()):
+            pass
+
+    media = client.get("/posts/").json()[0]["media"][0]
+    assert media["status"] == "failed"
+    assert any(
+        record.name == "app.worker" and media["id"] in record.getMessage()
+        for record in caplog.records
+    )
@@ -0,0 +1,174 @@
+import uuid
+from typing import Iterable, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.media import MEDIA_UNATTACHED, Media, MediaRendition
+from app.utils.blob_store import release_blobs
+
+
+def parse_media_ids(values: Iterable) -> list[uuid.UUID]:
+    """클라이언트가 보낸 미디어 id 목록을 UUID로 바꿉니다 (형식이 틀린 값은 버림)."""
+    media_ids = []
+    for value in values:
+        try:
+            media_ids.append(
+                value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+            )
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return list(dict.fromkeys(media_ids))
+
+
+def attach_media_statement(
+    media_ids: Sequence[uuid.UUID],
+    *,
+    profile_id: uuid.UUID,
+    object_type: str,
+    object_id: uuid.UUID,
+):
+    """
+    프로필이 미리 올린(아직 연결되지 않은) 미디어를 객체에 연결하는 UPDATE 문.
+
+    다른 프로필의 미디어나 이미 연결된 미디어는 바뀌지 않고, 연결된 Media 행을
+    RETURNING으로 돌려받으므로 미디어 수와 관계없이 문장 하나로 실행됩니다.
+    """
+    return (
+        update(Media)
+        .where(Media.id.in_(media_ids))
+        .where(Media.object_type == MEDIA_UNATTACHED)
+        .where(Media.object_id == profile_id)
+        .values(object_type=object_type, object_id=object_id)
+        .returning(Media)
+    )
+
+
+def check_attached(
+    media_ids: Sequence[uuid.UUID], attached: Sequence[Media]
+) -> list[Media]:
+    """
+    요청한 미디어가 모두 연결되었는지 확인하고 요청 순서대로 반환합니다.
+
+    Raises:
+        HTTPException: 없거나, 다른 프로필의 것이거나, 이미 연결된 미디어가 있는 경우 (400)
+    """
+    by_id = {media.id: media for media in attached}
+    for media_id in media_ids:
+        if media_id not in by_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Media {media_id} not found or already attached",
+            )
+    return [by_id[media_id] for media_id in media_ids]
+
+
+def attach_media(
+    session: Session,
+    media_ids: Sequence[uuid.UUID],
+    *,
+    profile_id: uuid.UUID,
+    object_type: str,
+    object_id: uuid.UUID,
+) -> list[Media]:
+    """
+    미리 올린 미디어를 객체에 연결합니다 (commit은 호출한 쪽에서).
+
+    하나라도 연결할 수 없으면 트랜잭션을 되돌리고 400 오류를 발생시킵니다.
+    """
+    media_ids = parse_media_ids(media_ids)
+    if not media_ids:
+        return []
+    statement = attach_media_statement(
+        media_ids, profile_id=profile_id, object_type=object_type, object_id=object_id
+    )
+    attached = session.exec(statement).scalars().all()
+    try:
+        return check_attached(media_ids, attached)
+    except HTTPException:
+        session.rollback()
+        raise
+
+
+async def attach_media_async(
+    session: AsyncSession,
+    media_ids: Sequence[uuid.UUID],
+    *,
+    profile_id: uuid.UUID,
+    object_type: str,
+    object_id: uuid.UUID,
+) -> list[Media]:
+    """attach_media의 AsyncSession 버전"""
+    media_ids = parse_media_ids(media_ids)
+    if not media_ids:
+        return []
+    statement = attach_media_statement(
+        media_ids, profile_id=profile_id, object_type=object_type, object_id=object_id
+    )
+    attached = (await session.exec(statement)).scalars().all()
+    try:
+        return check_attached(media_ids, attached)
+    except HTTPException:
+        await session.rollback()
+        raise
+
+
+def delete_attached_media(
+    session: Session, *, object_type: str, object_id: uuid.UUID
+) -> None:
+    """
+    객체에 연결된 미디어와 렌디션 행을 지우고 blob 참조를 놓습니다 (commit은 호출한 쪽에서).
+
+    파일은 참조 수가 0이 된 blob과 함께 collect_garbage가 지웁니다.
+    """
+    attached = session.exec(
+        select(Media.id, Media.content_hash)
+        .where(Media.object_type == object_type)
+        .where(Media.object_id == object_id)
+    ).all()
+    if not attached:
+        return
+    media_ids = [media_id for media_id, _ in attached]
+    session.exec(delete(MediaRendition).where(MediaRendition.media_id.in_(media_ids)))
+    session.exec(delete(Media).where(Media.id.in_(media_ids)))
+    release_blobs(session, [content_hash for _, content_hash in attached])
+
+
+async def delete_attached_media_async(
+    session: AsyncSession, *, object_type: str, object_id: uuid.UUID
+) -> None:
+    """delete_attached_media의 AsyncSession 버전"""
+    await session.run_sync(
+        delete_attached_media, object_type=object_type, object_id=object_id
+    )
+
+
+def message_attachment_statement(message):
+    """
+    WebSocket 메시지의 media_file_ids를 메시지에 연결하는 UPDATE 문 (없으면 None).
+
+    WebSocket에는 오류를 돌려줄 응답이 없으므로, 연결할 수 없는 id는
+    keep_attached로 메시지에서 빼고 나머지만 연결합니다.
+    """
+    media_ids = parse_media_ids(message.media_file_ids)
+    if not media_ids:
+        message.media_file_ids = []
+        return None
+    return attach_media_statement(
+        media_ids,
+        profile_id=message.profile_id,
+        object_type="message",
+        object_id=message.id,
+    )
+
+
+def keep_attached(message, attached: Sequence[Media]) -> None:
+    """메시지의 media_file_ids를 실제로 연결된 미디어만 요청 순서대로 남깁니다."""
+    attached_ids = {media.id for media in attached}
+    message.media_file_ids = [
+        str(media_id)
+        for media_id in parse_media_ids(message.media_file_ids)
+        if media_id in attached_ids
+    ]
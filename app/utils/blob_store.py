@@ -0,0 +1,469 @@
+"""
+내용 주소(content-addressed) 업로드 저장소의 참조 관리와 가비지 컬렉션.
+
+업로드 원본은 sha256 해시로 이름이 정해진 경로에 한 번만 저장되고, 같은 내용을
+올린 Media 행들은 MediaBlob 하나의 파일과 처리 결과를 공유합니다.
+
+사용법: python -m app.utils.blob_store [--grace-period 3600] [--dry-run]
+"""
+
+import argparse
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+
+from sqlalchemy import Engine, case, delete, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.models.media import (
+    MEDIA_FAILED,
+    MEDIA_UNATTACHED,
+    Media,
+    MediaBase,
+    MediaBlob,
+    MediaRendition,
+    MediaRenditionCreate,
+    ResumableUpload,
+)
+
+# 처리 단계에서 채워지고 같은 내용이면 그대로 재사용할 수 있는 Media 필드
+PROCESSED_FIELDS = (
+    "thumbnail_url",
+    "width",
+    "height",
+    "duration",
+    "video_codec",
+    "placeholder",
+    "status",
+)
+
+# 내용 주소 파일이 저장되는 uploads 하위 디렉터리 (파일 이름이 해시로 시작)
+BLOB_DIRS = (
+    "images/originals",
+    "images/thumbnails",
+    "images/renditions",
+    "videos/originals",
+)
+# 해시를 계산하기 전까지 업로드를 받아 두는 디렉터리
+TMP_DIR = "tmp"
+# 이어받기 업로드가 청크를 이어 쓰는 디렉터리 (파일 이름이 업로드 id)
+RESUMABLE_DIR = "resumable"
+
+BLOB_FILENAME = re.compile(r"^([0-9a-f]{64})(?:[._]|$)")
+
+# 고아 파일을 확인할 때 한 번에 조회하는 해시 수
+GC_BATCH_SIZE = 500
+
+
+def is_content_addressed(path: str) -> bool:
+    """
+    파일 이름이 내용 해시로 정해진 blob 파일인지 확인합니다.
+
+    이런 경로의 내용은 바뀌지 않으므로 (다시 만들면 이름이 바뀜) 오래 캐시할 수
+    있습니다. 이전 방식의 uuid 이름 파일은 해당하지 않습니다.
+    """
+    directory, name = os.path.split(path.strip("/"))
+    return directory in BLOB_DIRS and BLOB_FILENAME.match(name) is not None
+
+
+def copy_processed(target: MediaBase, source: MediaBase | MediaBlob) -> None:
+    """source의 처리 결과(크기, 썸네일, 미리보기, 상태)와 원본 URL을 복사합니다."""
+    target.original_url = source.original_url
+    for name in PROCESSED_FIELDS:
+        setattr(target, name, getattr(source, name))
+
+
+def blob_renditions(blob: MediaBlob) -> list[MediaRenditionCreate]:
+    return [MediaRenditionCreate.model_validate(item) for item in blob.renditions]
+
+
+def blob_values(
+    media: MediaBase, renditions: Sequence[MediaRenditionCreate] = ()
+) -> dict:
+    """Media의 내용으로 새 MediaBlob 행 값을 만듭니다."""
+    values = {name: getattr(media, name) for name in PROCESSED_FIELDS}
+    values.update(
+        content_hash=media.content_hash,
+        media_type=media.media_type,
+        original_url=media.original_url,
+        file_size=media.file_size,
+        renditions=[rendition.model_dump() for rendition in renditions],
+    )
+    return values
+
+
+def add_blob_refs(dialect_name: str, rows: Sequence[dict]):
+    """
+    blob 참조 수를 늘리는 INSERT ... ON CONFLICT DO UPDATE 문을 만듭니다.
+
+    새 해시는 rows의 값으로 행을 만들고, 이미 있는 해시는 ref_count만 늘립니다.
+    이미 있는 blob이 처리에 실패한 것이면 처리 결과도 rows의 값으로 바꿉니다.
+    같은 해시가 여러 번 있으면 하나로 합쳐 그 수만큼 늘리므로, 파일 수와 관계없이
+    문장 하나로 실행됩니다.
+
+    Args:
+        dialect_name: 세션 엔진의 dialect 이름 ("sqlite", "postgresql")
+        rows: blob_values로 만든 행 값들
+
+    Returns:
+        Insert | None: 실행할 문장 (rows가 비어 있으면 None)
+    """
+    if not rows:
+        return None
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ValueError(f"Unsupported database dialect: {dialect_name}")
+
+    counts = Counter(row["content_hash"] for row in rows)
+    now = datetime.now(timezone.utc)
+    values = {}
+    for row in rows:
+        values.setdefault(
+            row["content_hash"],
+            {
+                **row,
+                "ref_count": counts[row["content_hash"]],
+                "created_at": now,
+                "released_at": None,
+            },
+        )
+
+    statement = insert(MediaBlob).values(list(values.values()))
+    failed = MediaBlob.status == MEDIA_FAILED
+    retried = {
+        name: case((failed, statement.excluded[name]), else_=getattr(MediaBlob, name))
+        for name in (*PROCESSED_FIELDS, "original_url", "renditions")
+    }
+    return statement.on_conflict_do_update(
+        index_elements=[MediaBlob.content_hash],
+        set_={
+            **retried,
+            "ref_count": MediaBlob.ref_count + statement.excluded.ref_count,
+            "released_at": None,
+        },
+    )
+
+
+def claim_blobs(content_hashes: Iterable[str | None]):
+    """
+    이미 있는 blob들의 참조 수를 늘리고 그 blob들을 돌려받는 UPDATE ... RETURNING 문.
+
+    업로드가 blob을 재사용하기 전에 실행합니다. 조회와 참조를 한 문장으로 하므로,
+    반환된 blob은 이 트랜잭션이 끝날 때까지 가비지 컬렉터가 지울 수 없습니다
+    (ref_count > 0을 다시 확인하는 DELETE가 행 잠금을 기다림). 처리에 실패한
+    blob은 재사용하지 않으므로 반환되지 않고, 같은 내용을 다시 올리면 새 내용처럼
+    처리되어 add_blob_refs가 그 결과로 blob을 고칩니다.
+
+    Returns:
+        Update | None: 실행할 문장 (해시가 없으면 None)
+    """
+    counts = Counter(content_hash for content_hash in content_hashes if content_hash)
+    if not counts:
+        return None
+    return (
+        update(MediaBlob)
+        .where(MediaBlob.content_hash.in_(counts))
+        .where(MediaBlob.status != MEDIA_FAILED)
+        .values(
+            ref_count=MediaBlob.ref_count
+            + case(dict(counts), value=MediaBlob.content_hash),
+            released_at=None,
+        )
+        .returning(MediaBlob)
+    )
+
+
+def release_blobs(session: Session, content_hashes: Iterable[str | None]) -> None:
+    """
+    Media 행을 지울 때 그 blob들의 참조 수를 줄입니다 (commit은 호출한 쪽에서).
+
+    참조 수가 0이 된 blob은 released_at을 기록하고, 유예 기간이 지나면
+    collect_garbage가 파일과 함께 지웁니다.
+    """
+    now = datetime.now(timezone.utc)
+    for content_hash, count in Counter(
+        content_hash for content_hash in content_hashes if content_hash
+    ).items():
+        released = MediaBlob.ref_count <= count
+        session.exec(
+            update(MediaBlob)
+            .where(MediaBlob.content_hash == content_hash)
+            .values(
+                ref_count=case((released, 0), else_=MediaBlob.ref_count - count),
+                released_at=case((released, now), else_=MediaBlob.released_at),
+            )
+        )
+
+
+@dataclass
+class GarbageReport:
+    media: int = 0  # 지운 미연결 미디어 행 수
+    uploads: int = 0  # 지운 이어받기 업로드 수
+    blobs: int = 0  # 지운 blob 행 수
+    files: int = 0  # 지운 파일 수
+    bytes: int = 0  # 확보한 디스크 용량
+
+
+def _remove(
+    path: str, report: GarbageReport, dry_run: bool, cutoff: float | None = None
+) -> None:
+    try:
+        stat = os.stat(path)
+        if cutoff is not None and stat.st_mtime >= cutoff:
+            # 목록을 만든 뒤 새로 쓰인 파일 (같은 내용이 다시 저장됨)
+            return
+        size = stat.st_size
+        if not dry_run:
+            os.remove(path)
+    except FileNotFoundError:
+        return
+    report.files += 1
+    report.bytes += size
+
+
+def _old_files(directory: str, cutoff: float) -> Iterable[os.DirEntry]:
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return []
+    return [
+        entry for entry in entries if entry.is_file() and entry.stat().st_mtime < cutoff
+    ]
+
+
+def _sweep_orphans(
+    engine: Engine,
+    uploads_dir: str,
+    cutoff: float,
+    report: GarbageReport,
+    dry_run: bool,
+) -> None:
+    """blob 행이 없는 내용 주소 파일과 오래된 임시 파일을 지웁니다."""
+    for entry in _old_files(os.path.join(uploads_dir, TMP_DIR), cutoff):
+        _remove(entry.path, report, dry_run)
+
+    candidates: dict[str, list[str]] = {}
+    for directory in BLOB_DIRS:
+        for entry in _old_files(os.path.join(uploads_dir, directory), cutoff):
+            # 해시로 시작하지 않는 이름(이전 방식의 uuid 파일)은 건드리지 않는다
+            match = BLOB_FILENAME.match(entry.name)
+            if match:
+                candidates.setdefault(match.group(1), []).append(entry.path)
+
+    hashes = list(candidates)
+    with Session(engine) as session:
+        for start in range(0, len(hashes), GC_BATCH_SIZE):
+            batch = hashes[start : start + GC_BATCH_SIZE]
+            known = set(
+                session.exec(
+                    select(MediaBlob.content_hash).where(
+                        MediaBlob.content_hash.in_(batch)
+                    )
+                )
+            )
+            for content_hash in batch:
+                if content_hash not in known:
+                    for path in candidates[content_hash]:
+                        _remove(path, report, dry_run, cutoff)
+
+
+def _expire_unattached_media(
+    engine: Engine, ttl: float, report: GarbageReport, dry_run: bool
+) -> None:
+    """POST /media/로 올린 뒤 ttl 동안 연결되지 않은 미디어를 지우고 blob 참조를 놓습니다."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+    with Session(engine) as session:
+        expired = session.exec(
+            select(Media.id, Media.content_hash)
+            .where(Media.object_type == MEDIA_UNATTACHED)
+            .where(Media.created_at < cutoff)
+        ).all()
+        report.media = len(expired)
+        if not expired or dry_run:
+            return
+        media_ids = [media_id for media_id, _ in expired]
+        session.exec(
+            delete(MediaRendition).where(MediaRendition.media_id.in_(media_ids))
+        )
+        # 그사이 연결된 미디어는 지우지 않는다
+        session.exec(
+            delete(Media)
+            .where(Media.id.in_(media_ids))
+            .where(Media.object_type == MEDIA_UNATTACHED)
+        )
+        release_blobs(session, [content_hash for _, content_hash in expired])
+        session.commit()
+
+
+def _expire_resumable_uploads(
+    engine: Engine,
+    uploads_dir: str,
+    ttl: float,
+    report: GarbageReport,
+    dry_run: bool,
+) -> None:
+    """ttl 동안 청크가 오지 않은 이어받기 업로드와 업로드 행이 없는 파일을 지웁니다."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+    with Session(engine) as session:
+        expired = set(
+            session.exec(
+                select(ResumableUpload.id).where(ResumableUpload.updated_at < cutoff)
+            )
+        )
+        report.uploads = len(expired)
+        if expired and not dry_run:
+            # 행을 먼저 지우므로 그사이 도착한 청크는 404로 거절된다
+            session.exec(
+                delete(ResumableUpload)
+                .where(ResumableUpload.id.in_(expired))
+                .where(ResumableUpload.updated_at < cutoff)
+            )
+            session.commit()
+
+        files = _old_files(os.path.join(uploads_dir, RESUMABLE_DIR), cutoff.timestamp())
+        names = [entry.name for entry in files]
+        live = {
+            str(upload_id)
+            for upload_id in session.exec(
+                select(ResumableUpload.id).where(
+                    ResumableUpload.id.in_(_upload_ids(names))
+                )
+            )
+            if upload_id not in expired
+        }
+    for entry in files:
+        if entry.name not in live:
+            _remove(entry.path, report, dry_run)
+
+
+def _upload_ids(names: Iterable[str]) -> list[uuid.UUID]:
+    upload_ids = []
+    for name in names:
+        try:
+            upload_ids.append(uuid.UUID(name))
+        except ValueError:
+            continue
+    return upload_ids
+
+
+def collect_garbage(
+    engine: Engine,
+    uploads_dir: str = "uploads",
+    grace_period: float = 3600,
+    dry_run: bool = False,
+    unattached_ttl: float | None = None,
+    resumable_ttl: float | None = None,
+) -> GarbageReport:
+    """
+    참조가 없는 blob과 어떤 blob에도 속하지 않는 파일을 지웁니다.
+
+    ref_count가 0인 채로 grace_period가 지난 blob 행을 먼저 지우고, 그다음
+    uploads 아래에서 blob 행이 없는 해시 이름의 파일(지운 blob의 파일, 실패한
+    업로드가 남긴 파일)과 오래된 임시 파일을 지웁니다. 파일은 grace_period보다
+    오래된 것만 지우므로 아직 commit 전인 업로드의 파일은 남습니다.
+    unattached_ttl을 주면 그보다 오래 연결되지 않은 미디어를 먼저 지우고 blob
+    참조를 놓습니다 (그 blob은 다음 실행에서 유예 기간이 지난 뒤 지워짐).
+    resumable_ttl을 주면 그보다 오래 멈춘 이어받기 업로드와 그 파일도 지웁니다.
+
+    Args:
+        engine: 데이터베이스 엔진
+        uploads_dir: 업로드 파일 루트 디렉터리
+        grace_period: 삭제 유예 기간 (초)
+        dry_run: True이면 지우지 않고 지울 대상만 집계
+        unattached_ttl: 미연결 미디어 보관 기간 (초, None이면 지우지 않음)
+        resumable_ttl: 멈춘 이어받기 업로드 보관 기간 (초, None이면 지우지 않음)
+
+    Returns:
+        GarbageReport: 지운 미디어/업로드/blob 행 수, 파일 수, 확보한 용량
+    """
+    report = GarbageReport()
+    if unattached_ttl is not None:
+        _expire_unattached_media(engine, unattached_ttl, report, dry_run)
+    if resumable_ttl is not None:
+        _expire_resumable_uploads(engine, uploads_dir, resumable_ttl, report, dry_run)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_period)
+    unreferenced = (
+        MediaBlob.ref_count <= 0,
+        or_(
+            MediaBlob.released_at < cutoff,
+            MediaBlob.released_at.is_(None) & (MediaBlob.created_at < cutoff),
+        ),
+    )
+    with Session(engine) as session:
+        hashes = list(session.exec(select(MediaBlob.content_hash).where(*unreferenced)))
+        report.blobs = len(hashes)
+        if hashes and not dry_run:
+            # 행을 먼저 지우고 파일은 고아 파일 정리에서 지운다 (중간에 실패해도 다음
+            # 실행에서 이어서 정리된다). 조회한 뒤 claim_blobs로 다시 참조된 blob은
+            # 같은 DELETE 안에서 조건을 다시 확인하므로 지워지지 않는다.
+            deleted = session.exec(
+                delete(MediaBlob)
+                .where(MediaBlob.content_hash.in_(hashes))
+                .where(*unreferenced)
+            )
+            report.blobs = deleted.rowcount
+            session.commit()
+
+    _sweep_orphans(engine, uploads_dir, time.time() - grace_period, report, dry_run)
+    return report
+
+
+def main():
+    from app.config import settings
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--uploads-dir", default="uploads", help="업로드 파일 루트 디렉터리"
+    )
+    parser.add_argument(
+        "--grace-period",
+        type=float,
+        default=settings.media_gc_grace_period,
+        help="삭제 유예 기간 (초)",
+    )
+    parser.add_argument(
+        "--unattached-ttl",
+        type=float,
+        default=settings.media_unattached_ttl,
+        help="게시물/댓글/메시지에 연결되지 않은 업로드 보관 기간 (초)",
+    )
+    parser.add_argument(
+        "--resumable-ttl",
+        type=float,
+        default=settings.resumable_upload_ttl,
+        help="청크가 오지 않는 이어받기 업로드 보관 기간 (초)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="지우지 않고 대상만 출력"
+    )
+    args = parser.parse_args()
+
+    report = collect_garbage(
+        engine,
+        args.uploads_dir,
+        args.grace_period,
+        dry_run=args.dry_run,
+        unattached_ttl=args.unattached_ttl,
+        resumable_ttl=args.resumable_ttl,
+    )
+    action = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{action} {report.media} unattached media, {report.uploads} uploads, "
+        f"{report.blobs} blobs, "
+        f"{report.files} files "
+        f"({report.bytes / 1024 / 1024:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
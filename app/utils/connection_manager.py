@@ -0,0 +1,159 @@
+import asyncio
+from typing import Dict, Set
+from uuid import UUID
+
+from fastapi import WebSocket
+
+from .pubsub import InProcessBackend
+
+# 느린 클라이언트 처리 정책
+DROP_OLDEST = "drop"  # 큐가 가득 차면 가장 오래된 메시지를 버린다
+DISCONNECT = "disconnect"  # 큐가 가득 차면 연결을 끊는다
+
+# 큐 종료 신호
+_CLOSE = object()
+
+# 느린 클라이언트를 끊을 때 사용하는 close code (Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class Connection:
+    """WebSocket 하나와 그 연결 전용 송신 큐, 송신 태스크"""
+
+    def __init__(self, websocket: WebSocket, chat_id: UUID, max_queue_size: int):
+        self.websocket = websocket
+        self.chat_id = chat_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+
+    def start(self, manager: "ConnectionManager") -> None:
+        self.task = asyncio.get_running_loop().create_task(self._send_loop(manager))
+
+    async def _send_loop(self, manager: "ConnectionManager") -> None:
+        while True:
+            message = await self.queue.get()
+            if message is _CLOSE:
+                return
+            try:
+                await self.websocket.send_text(message)
+            except Exception:
+                # 이미 닫힌 연결: 방에서 제거하고 송신을 멈춘다
+                manager.disconnect(self.websocket, self.chat_id)
+                return
+
+    def enqueue(self, message: str) -> bool:
+        """송신 큐에 메시지를 넣습니다. 큐가 가득 차 있으면 False를 반환합니다."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def drop_oldest(self, message: str) -> None:
+        """가장 오래된 메시지를 버리고 새 메시지를 넣습니다."""
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(message)
+
+    def stop(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class ConnectionManager:
+    """
+    채팅방별 WebSocket 연결 관리자.
+
+    연결마다 크기가 제한된 송신 큐와 송신 태스크를 두어, broadcast는 큐에 넣기만
+    하고 바로 반환합니다. 느린 클라이언트가 다른 클라이언트의 수신을 막지 않고,
+    한 연결의 송신 오류가 나머지 연결의 전달을 중단시키지 않습니다.
+    큐가 가득 찬 느린 클라이언트는 slow_consumer_policy에 따라 오래된 메시지를
+    버리거나(drop) 연결을 끊습니다(disconnect).
+
+    broadcast는 pub/sub 백엔드로 publish하고, 백엔드가 전달한 메시지를 deliver가
+    이 프로세스의 연결 큐에 넣습니다. 기본 백엔드는 프로세스 내부 전달이며,
+    RedisPubSubBackend를 쓰면 여러 워커 프로세스의 연결에도 전달됩니다.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        slow_consumer_policy: str = DISCONNECT,
+        backend=None,
+    ):
+        if slow_consumer_policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.max_queue_size = max_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.active_connections: Dict[UUID, Set[Connection]] = {}
+        self._connections: Dict[WebSocket, Connection] = {}
+        self.backend = backend if backend is not None else InProcessBackend()
+        self.backend.start(self.deliver)
+
+    async def connect(self, websocket: WebSocket, chat_id: UUID):
+        await websocket.accept()
+        self.register(websocket, chat_id)
+
+    def register(self, websocket: WebSocket, chat_id: UUID) -> Connection:
+        """이미 accept된 WebSocket을 채팅방에 등록하고 송신 태스크를 시작합니다."""
+        connection = Connection(websocket, chat_id, self.max_queue_size)
+        self._connections[websocket] = connection
+        if chat_id not in self.active_connections:
+            # 이 프로세스에 처음 생긴 채팅방이면 채널을 구독한다
+            self.active_connections[chat_id] = set()
+            self.backend.subscribe(chat_id)
+        self.active_connections[chat_id].add(connection)
+        connection.start(self)
+        return connection
+
+    def disconnect(self, websocket: WebSocket, chat_id: UUID):
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        room = self.active_connections.get(chat_id)
+        if room is not None:
+            room.discard(connection)
+            if not room:
+                del self.active_connections[chat_id]
+                self.backend.unsubscribe(chat_id)
+        connection.stop()
+
+    def _evict(self, connection: Connection) -> None:
+        self.disconnect(connection.websocket, connection.chat_id)
+
+        async def close():
+            try:
+                await connection.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(close())
+
+    async def broadcast(self, message: str, chat_id: UUID):
+        await self.backend.publish(chat_id, message)
+
+    def deliver(self, chat_id: UUID, message: str) -> None:
+        """백엔드에서 받은 메시지를 이 프로세스의 채팅방 연결 큐에 넣습니다."""
+        room = self.active_connections.get(chat_id)
+        if not room:
+            return
+        for connection in list(room):
+            self._offer(connection, message)
+
+    def send_to(self, websocket: WebSocket, message: str) -> None:
+        """이 프로세스의 연결 하나에만 메시지를 보냅니다 (브로드캐스트와 같은 송신 큐)."""
+        connection = self._connections.get(websocket)
+        if connection is not None:
+            self._offer(connection, message)
+
+    def _offer(self, connection: Connection, message: str) -> None:
+        if connection.enqueue(message):
+            return
+        if self.slow_consumer_policy == DROP_OLDEST:
+            connection.drop_oldest(message)
+        else:
+            self._evict(connection)
@@ -0,0 +1,183 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import Engine, select, update
+from sqlmodel import Session
+
+from app.models.job import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Job
+
+logger = logging.getLogger(__name__)
+
+# 작업 처리 함수 (같은 트랜잭션의 세션, payload)
+JobHandlerFunc = Callable[[Session, dict], None]
+
+
+@dataclass
+class JobHandler:
+    kind: str
+    handle: JobHandlerFunc
+    # 재시도를 모두 실패했을 때 호출 (세션, payload)
+    on_failure: JobHandlerFunc | None = None
+
+
+# 작업 종류별 처리 함수
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str, on_failure: JobHandlerFunc | None = None):
+    """함수를 작업 처리 함수로 등록하는 데코레이터"""
+
+    def register(handle: JobHandlerFunc):
+        JOB_HANDLERS[kind] = JobHandler(kind, handle, on_failure)
+        return handle
+
+    return register
+
+
+def enqueue_job(session, kind: str, payload: dict[str, Any], **options) -> Job:
+    """
+    작업을 세션에 추가합니다.
+
+    commit하지 않으므로 작업을 만든 데이터(Media 등)와 같은 트랜잭션에서
+    함께 commit됩니다. Session과 AsyncSession 모두 사용할 수 있습니다.
+    """
+    job = Job(kind=kind, payload=payload, **options)
+    session.add(job)
+    return job
+
+
+def claim_job(engine: Engine, visibility_timeout: float) -> Job | None:
+    """
+    실행할 작업 하나를 가져옵니다.
+
+    UPDATE ... RETURNING 한 문장으로 가져가므로 여러 워커 프로세스가 같은
+    작업을 동시에 가져가지 않습니다. 가져간 작업은 visibility_timeout 동안 다른
+    워커에게 보이지 않고, 그 안에 끝나지 않으면(워커 종료 등) 다시 가져갈 수
+    있게 됩니다.
+    """
+    now = datetime.now(timezone.utc)
+    next_job = (
+        select(Job.id)
+        .where(
+            Job.status.in_((JOB_QUEUED, JOB_RUNNING)),
+            Job.available_at <= now,
+            Job.attempts < Job.max_attempts,
+        )
+        .order_by(Job.available_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    with Session(engine, expire_on_commit=False) as session:
+        job = session.scalars(
+            update(Job)
+            .where(Job.id == next_job)
+            .values(
+                status=JOB_RUNNING,
+                attempts=Job.attempts + 1,
+                available_at=now + timedelta(seconds=visibility_timeout),
+            )
+            .returning(Job)
+        ).first()
+        session.commit()
+        return job
+
+
+def fail_expired_jobs(engine: Engine) -> int:
+    """
+    재시도 횟수를 다 쓴 뒤 visibility timeout이 지난 작업을 실패로 표시합니다.
+
+    마지막 시도 중에 워커가 종료된 작업들입니다. on_failure도 호출합니다.
+
+    Returns:
+        int: 실패로 표시한 작업 수
+    """
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        expired = session.scalars(
+            select(Job).where(
+                Job.status == JOB_RUNNING,
+                Job.available_at <= now,
+                Job.attempts >= Job.max_attempts,
+            )
+        ).all()
+        for job in expired:
+            job.status = JOB_FAILED
+            job.last_error = "Visibility timeout expired"
+            handler = JOB_HANDLERS.get(job.kind)
+            if handler is not None and handler.on_failure is not None:
+                handler.on_failure(session, job.payload)
+        session.commit()
+        return len(expired)
+
+
+def still_claimed(job: Job):
+    """
+    가져간 시도가 아직 이 워커의 것인지 확인하는 조건.
+
+    visibility timeout이 지나 다른 워커가 다시 가져가면 attempts가 늘어나므로,
+    이전 시도의 결과는 이 조건에 맞지 않아 기록되지 않습니다.
+    """
+    return (Job.id == job.id, Job.status == JOB_RUNNING, Job.attempts == job.attempts)
+
+
+def run_job(engine: Engine, job: Job, retry_delay: float) -> bool:
+    """
+    가져온 작업을 실행합니다.
+
+    처리 함수의 변경과 작업 완료 표시는 같은 트랜잭션으로 commit됩니다.
+    실패하면 retry_delay * 시도 횟수 뒤에 다시 실행되도록 돌려놓고, 재시도를
+    모두 쓰면 실패로 표시한 뒤 on_failure를 호출합니다.
+    그 사이 다른 워커가 작업을 다시 가져갔으면 이 시도의 결과(처리 함수의 변경
+    포함)는 버립니다.
+
+    Returns:
+        bool: 작업이 성공해 결과가 기록되었는지 여부
+    """
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        with Session(engine) as session:
+            handler.handle(session, job.payload)
+            completed = session.execute(
+                update(Job).where(*still_claimed(job)).values(status=JOB_DONE)
+            )
+            if completed.rowcount != 1:
+                session.rollback()
+                logger.warning(
+                    "Job %s (%s) was claimed again; discarding attempt %d",
+                    job.id,
+                    job.kind,
+                    job.attempts,
+                )
+                return False
+            session.commit()
+        return True
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        error = f"{type(e).__name__}: {e}"
+
+    with Session(engine) as session:
+        if job.attempts < job.max_attempts:
+            retry_at = datetime.now(timezone.utc) + timedelta(
+                seconds=retry_delay * job.attempts
+            )
+            values = dict(status=JOB_QUEUED, available_at=retry_at, last_error=error)
+        else:
+            values = dict(status=JOB_FAILED, last_error=error)
+        failed = session.execute(
+            update(Job).where(*still_claimed(job)).values(**values)
+        )
+        if failed.rowcount != 1:
+            # 다른 워커가 실행 중인 시도를 되돌리지 않는다
+            return False
+        if (
+            values["status"] == JOB_FAILED
+            and handler is not None
+            and handler.on_failure is not None
+        ):
+            handler.on_failure(session, job.payload)
+        session.commit()
+    return False
@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from .media_utils import (
+    ImageLimits,
+    MediaProcessingError,
+    RenditionFile,
+    RenditionSpec,
+    probe_image,
+    process_image,
+)
+from .video_meta import probe_video
+
+logger = logging.getLogger(__name__)
+
+# 처리 중 워커 프로세스가 죽은(메모리 부족 등) 작업의 MediaResult.error
+WORKER_CRASHED = "Media processing worker crashed"
+
+# 업로드 후 백그라운드에서 메타데이터/썸네일을 처리하는 작업 종류
+PROCESS_MEDIA_JOB = "process_media"
+
+
+@dataclass
+class MediaJob:
+    """디스크에 저장된 원본 하나에 대한 메타데이터/썸네일 작업"""
+
+    media_type: str  # "image", "video"
+    original_path: str
+    thumbnail_path: str | None = None
+    renditions: list[RenditionSpec] = field(default_factory=list)
+    # 이미지를 디코딩하기 전에 헤더로 확인할 한도 (None이면 Pillow 기본 한도만)
+    limits: ImageLimits | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "MediaJob":
+        """작업 큐 payload(asdict 결과)에서 MediaJob을 다시 만듭니다."""
+        return cls(
+            media_type=payload["media_type"],
+            original_path=payload["original_path"],
+            thumbnail_path=payload.get("thumbnail_path"),
+            renditions=[
+                RenditionSpec(**spec) for spec in payload.get("renditions", [])
+            ],
+            limits=(
+                ImageLimits(**payload["limits"]) if payload.get("limits") else None
+            ),
+        )
+
+
+@dataclass
+class MediaResult:
+    width: int | None
+    height: int | None
+    # 처리할 수 없는 파일이면 오류 설명 (다시 시도해도 실패하므로 재시도하지 않음)
+    error: str | None = None
+    renditions: list[RenditionFile] = field(default_factory=list)
+    duration: float | None = None  # 동영상 길이 (초)
+    video_codec: str | None = None
+    placeholder: str | None = None  # 이미지 미리보기 data URI
+
+
+def process_media(job: MediaJob) -> MediaResult:
+    """
+    원본 파일의 크기를 읽고 이미지면 썸네일과 렌디션을 생성합니다.
+
+    이미지는 한 번만 열어 헤더 정보, 썸네일, 렌디션을 함께 얻고, 크기는 동영상의
+    회전처럼 EXIF 방향을 적용해 반환합니다. 동영상은 MP4/MOV 헤더(moov)만 읽어
+    크기, 길이, 코덱을 얻고, 헤더를 해석할 수 없는 다른 컨테이너(WebM 등)는
+    크기를 비워 둡니다. 워커 프로세스에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    if job.media_type == "image":
+        try:
+            if not job.thumbnail_path:
+                width, height = probe_image(job.original_path, job.limits).display_size
+                return MediaResult(width=width, height=height)
+            processed = process_image(
+                job.original_path,
+                job.thumbnail_path,
+                renditions=job.renditions,
+                limits=job.limits,
+            )
+        except MediaProcessingError as e:
+            return MediaResult(width=None, height=None, error=str(e))
+        # 썸네일, 렌디션과 같이 EXIF 방향을 적용한 크기를 저장한다
+        width, height = processed.probe.display_size
+        return MediaResult(
+            width=width,
+            height=height,
+            renditions=processed.renditions,
+            placeholder=processed.placeholder,
+        )
+
+    try:
+        metadata = probe_video(job.original_path)
+    except MediaProcessingError as e:
+        return MediaResult(width=None, height=None, error=str(e))
+    if metadata is None:
+        return MediaResult(width=None, height=None)
+    return MediaResult(
+        width=metadata.width,
+        height=metadata.height,
+        duration=metadata.duration,
+        video_codec=metadata.video_codec,
+    )
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_workers: int | None = None
+_executor_lock = threading.Lock()
+
+
+def _create_executor(workers: int | None) -> ProcessPoolExecutor:
+    # 스레드가 있는 서버 프로세스를 fork하지 않도록 spawn을 사용한다
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def get_media_executor(workers: int | None) -> Executor | None:
+    """
+    미디어 처리용 프로세스 풀을 반환합니다 (처음 호출할 때 생성).
+
+    Args:
+        workers: 워커 프로세스 수 (None이면 CPU 수, 0이면 풀을 쓰지 않음)
+
+    Returns:
+        Executor | None: 프로세스 풀, workers가 0이면 None
+    """
+    global _executor, _executor_workers
+    if workers == 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = _create_executor(workers)
+            _executor_workers = workers
+        return _executor
+
+
+def replace_broken_executor(broken: Executor) -> Executor | None:
+    """
+    워커 프로세스가 죽어(BrokenProcessPool) 더 쓸 수 없게 된 풀을 새 풀로 바꿉니다.
+
+    깨진 풀은 이후의 모든 작업을 거절하므로, 바꾸지 않으면 프로세스를 다시 시작할
+    때까지 모든 업로드가 실패합니다. 다른 스레드가 이미 바꿨으면 그 풀을 반환합니다.
+
+    Returns:
+        Executor | None: 새 풀 (이 모듈이 관리하는 풀이 없으면 None)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            logger.warning("Media process pool is broken; starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = _create_executor(_executor_workers)
+        return _executor
+
+
+def shutdown_media_executor() -> None:
+    """프로세스 풀을 종료합니다 (애플리케이션 종료 시)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def process_media_batch(
+    jobs: list[MediaJob], executor: Executor | None
+) -> list[MediaResult]:
+    """
+    한 업로드의 모든 파일을 병렬로 처리합니다.
+
+    이미지 디코딩과 LANCZOS 리사이즈는 CPU 작업이므로 프로세스 풀에 나누어
+    처리하고, 결과는 jobs와 같은 순서로 반환합니다. 풀이 없거나 작업이 하나뿐이면
+    호출한 스레드에서 바로 처리합니다.
+
+    처리 중 워커 프로세스가 죽으면(이미지 폭탄으로 메모리 부족 등) 풀을 새로 만들고
+    작업을 하나씩 다시 처리해, 다시 풀을 깨뜨린 작업만 WORKER_CRASHED 오류로
+    실패시킵니다.
+    """
+    if executor is None or len(jobs) < 2:
+        return [process_media(job) for job in jobs]
+    try:
+        return list(executor.map(process_media, jobs))
+    except BrokenProcessPool:
+        logger.warning(
+            "Media process pool broke; retrying %d jobs one by one", len(jobs)
+        )
+
+    results = []
+    broken = executor
+    for job in jobs:
+        if broken is not None:
+            executor = replace_broken_executor(broken)
+            broken = None
+        if executor is None:
+            results.append(MediaResult(width=None, height=None, error=WORKER_CRASHED))
+            continue
+        try:
+            results.append(executor.submit(process_media, job).result())
+        except BrokenProcessPool:
+            logger.error("Media process pool broke on %s", job.original_path)
+            results.append(MediaResult(width=None, height=None, error=WORKER_CRASHED))
+            broken = executor
+    return results
@@ -1,28 +1,142 @@
+import base64
+import io
+import math
 import os
-from PIL import Image
-from typing import Tuple
+import warnings
+from dataclasses import dataclass
+from PIL import Image, ImageOps, UnidentifiedImageError
+from typing import Sequence, Tuple
 
+# EXIF Orientation 태그 번호
+EXIF_ORIENTATION = 0x0112
+# 90도 회전이 들어간 EXIF 방향 값 (가로/세로가 바뀜)
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
 
-def get_image_dimensions(image_path: str) -> Tuple[int, int]:
+# 빠른 썸네일 경로: JPEG는 결과 크기의 이 배수까지만 줄여서 디코딩하고,
+# 다른 형식은 reducing_gap으로 정수 배율 축소 후 LANCZOS로 리샘플한다
+THUMBNAIL_OVERSAMPLE = 2
+THUMBNAIL_REDUCING_GAP = 3.0
+
+# 헤더 사전 검사에서 한도를 넘은 파일의 MediaProcessingError.stage
+PREFLIGHT_STAGE = "preflight"
+
+# 피드에 바로 그릴 저화질 미리보기: 긴 쪽 16px WebP를 data URI로 인라인한다
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 30
+
+
+@dataclass
+class ImageProbe:
+    """이미지 헤더에서 읽은 정보"""
+
+    format: str | None  # "JPEG", "PNG", ...
+    width: int
+    height: int
+    orientation: int  # EXIF Orientation (1이면 회전 없음)
+    mode: str  # "RGB", "RGBA", "P", ...
+    frames: int = 1  # 애니메이션 프레임 수
+
+    @property
+    def display_size(self) -> Tuple[int, int]:
+        """EXIF 방향을 적용해 보여지는 크기 (90도 회전이 들어가면 가로/세로가 바뀜)"""
+        if self.orientation in TRANSPOSED_ORIENTATIONS:
+            return self.height, self.width
+        return self.width, self.height
+
+
+@dataclass
+class ImageLimits:
+    """
+    디코딩 전에 헤더만 보고 확인하는 이미지 한도.
+
+    픽셀 수가 큰 이미지는 파일이 작아도(압축 폭탄) 디코딩에 메모리와 CPU를 많이
+    쓰므로, 파일 크기와 함께 헤더에 적힌 크기와 프레임 수로 미리 거절합니다.
+    Pillow 자체 한도(Image.MAX_IMAGE_PIXELS의 2배)를 넘는 이미지는 max_pixels와
+    관계없이 거절됩니다.
+    """
+
+    max_pixels: int  # 가로 * 세로
+    max_file_size: int  # bytes
+    max_frames: int  # 애니메이션 프레임 수
+
+
+@dataclass
+class RenditionSpec:
+    """만들 렌디션 하나 (가로세로 중 긴 쪽을 max_size 이하로 축소, 비율 유지)"""
+
+    max_size: int
+    format: str  # "jpeg", "webp"
+    path: str
+
+
+@dataclass
+class RenditionFile:
+    """저장된 렌디션 파일 정보"""
+
+    max_size: int
+    format: str
+    path: str
+    width: int
+    height: int
+    file_size: int  # bytes
+
+
+@dataclass
+class ProcessedImage:
+    probe: ImageProbe
+    renditions: list[RenditionFile]
+    placeholder: str | None = None  # data:image/webp;base64,...
+
+
+# 렌디션 형식별 Pillow 저장 옵션
+RENDITION_SAVE_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+}
+
+
+class MediaProcessingError(Exception):
+    """
+    미디어 파일을 처리할 수 없을 때 발생하는 오류.
+
+    Attributes:
+        path: 처리하던 파일 경로
+        stage: 실패한 단계 ("preflight", "open", "decode", "save")
+        reason: 원인 설명
     """
-    이미지의 너비와 높이를 추출합니다.
+
+    def __init__(self, path: str, stage: str, reason: str):
+        super().__init__(f"Cannot {stage} {path}: {reason}")
+        self.path = path
+        self.stage = stage
+        self.reason = reason
+
+
+def get_image_dimensions(
+    image_path: str, limits: ImageLimits | None = None
+) -> Tuple[int, int]:
+    """
+    이미지의 너비와 높이를 추출합니다 (헤더만 읽음).
 
     Args:
         image_path: 이미지 파일 경로
+        limits: 헤더 사전 검사 한도
 
     Returns:
         Tuple[int, int]: (width, height)
+
+    Raises:
+        MediaProcessingError: 이미지로 인식할 수 없거나 limits를 넘는 경우
     """
-    try:
-        with Image.open(image_path) as img:
-            return img.size
-    except Exception as e:
-        print(f"Error getting image dimensions: {e}")
-        return (0, 0)
+    with _open_image(image_path, limits) as img:
+        return img.size
 
 
 def create_thumbnail(
-    image_path: str, thumbnail_path: str, size: Tuple[int, int] = (160, 160)
+    image_path: str,
+    thumbnail_path: str,
+    size: Tuple[int, int] = (160, 160),
+    limits: ImageLimits | None = None,
 ) -> str:
     """
     이미지에서 160x160 썸네일을 생성합니다.
@@ -32,60 +146,363 @@ def create_thumbnail(
         image_path: 원본 이미지 파일 경로
         thumbnail_path: 썸네일 저장 경로
         size: 썸네일 크기 (기본값: 160x160)
+        limits: 헤더 사전 검사 한도
 
     Returns:
         str: 생성된 썸네일 파일 경로
+
+    Raises:
+        MediaProcessingError: 사전 검사, 열기, 디코딩, 저장 중 하나가 실패한 경우
     """
+    with _open_image(image_path, limits) as img:
+        try:
+            img.load()
+        except Exception as e:
+            raise MediaProcessingError(image_path, "decode", str(e)) from e
+        thumbnail_img = render_thumbnail(img, size)
+
     try:
         # 썸네일 저장 디렉토리 생성
         os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+        # 썸네일 저장 (품질 85%)
+        thumbnail_img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
+    except OSError as e:
+        raise MediaProcessingError(thumbnail_path, "save", str(e)) from e
+    return thumbnail_path
+
+
+def _probe(img: Image.Image) -> ImageProbe:
+    return ImageProbe(
+        format=img.format,
+        width=img.width,
+        height=img.height,
+        orientation=img.getexif().get(EXIF_ORIENTATION, 1),
+        mode=img.mode,
+        frames=getattr(img, "n_frames", 1),
+    )
+
 
-        with Image.open(image_path) as img:
-            # 이미지를 RGB 모드로 변환 (투명도 처리)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-
-            # 원본 이미지 비율 계산
-            original_width, original_height = img.size
-            original_ratio = original_width / original_height
-
-            # 썸네일은 정사각형이므로 비율은 1
-            target_ratio = 1.0
-
-            # 크롭할 영역 계산
-            if original_ratio > target_ratio:
-                # 가로가 더 긴 이미지 (가로 사진)
-                crop_height = original_height
-                crop_width = int(crop_height * target_ratio)
-                crop_left = (original_width - crop_width) // 2
-                crop_top = 0
-            else:
-                # 세로가 더 긴 이미지 (세로 사진) 또는 정사각형
-                crop_width = original_width
-                crop_height = int(crop_width / target_ratio)
-                crop_left = 0
-                crop_top = (original_height - crop_height) // 2
-
-            # 중앙에서 크롭
-            crop_right = crop_left + crop_width
-            crop_bottom = crop_top + crop_height
-            cropped_img = img.crop((crop_left, crop_top, crop_right, crop_bottom))
-
-            # 썸네일 크기로 리사이즈
-            thumbnail_img = cropped_img.resize(size, Image.Resampling.LANCZOS)
-
-            # 썸네일 저장 (품질 85%)
-            thumbnail_img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
-
-        return thumbnail_path
+def _preflight_error(image_path: str, reason: str) -> MediaProcessingError:
+    return MediaProcessingError(image_path, PREFLIGHT_STAGE, reason)
 
+
+def _check_limits(img: Image.Image, image_path: str, limits: ImageLimits) -> None:
+    """열린(아직 디코딩하지 않은) 이미지의 헤더 값을 한도와 비교합니다."""
+    if img.width * img.height > limits.max_pixels:
+        raise _preflight_error(
+            image_path,
+            f"{img.width}x{img.height} exceeds the {limits.max_pixels} pixel limit",
+        )
+    try:
+        # APNG/WebP는 헤더에 적힌 값, GIF는 프레임 헤더만 건너뛰며 센다
+        frames = getattr(img, "n_frames", 1)
     except Exception as e:
-        print(f"Error creating thumbnail: {e}")
-        # 썸네일 생성 실패 시 원본 이미지를 썸네일로 복사
+        raise MediaProcessingError(image_path, "decode", str(e)) from e
+    if frames > limits.max_frames:
+        raise _preflight_error(
+            image_path, f"{frames} frames exceed the {limits.max_frames} frame limit"
+        )
+
+
+def _open_image(image_path: str, limits: ImageLimits | None = None) -> Image.Image:
+    """
+    이미지 헤더만 읽어 엽니다 (픽셀 디코딩은 load() 시점에 일어남).
+
+    limits를 주면 파일 크기, 픽셀 수, 프레임 수를 디코딩 전에 확인하고 넘으면
+    stage가 "preflight"인 MediaProcessingError를 발생시킵니다.
+    """
+    if limits is not None:
         try:
-            import shutil
+            file_size = os.path.getsize(image_path)
+        except OSError as e:
+            raise MediaProcessingError(image_path, "open", str(e)) from e
+        if file_size > limits.max_file_size:
+            raise _preflight_error(
+                image_path,
+                f"{file_size} bytes exceed the {limits.max_file_size} byte limit",
+            )
+    try:
+        with warnings.catch_warnings():
+            if limits is not None:
+                # 픽셀 수는 아래에서 limits로 확인한다
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            img = Image.open(image_path)
+    except Image.DecompressionBombError as e:
+        raise _preflight_error(image_path, str(e)) from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise MediaProcessingError(image_path, "open", str(e)) from e
+    if limits is not None:
+        try:
+            _check_limits(img, image_path, limits)
+        except BaseException:
+            img.close()
+            raise
+    return img
+
+
+def probe_image(image_path: str, limits: ImageLimits | None = None) -> ImageProbe:
+    """
+    이미지 헤더만 읽어 형식, 크기, EXIF 방향, 색상 모드, 프레임 수를 반환합니다.
+
+    업로드를 받을 때 limits와 함께 호출하면 디코딩 없이 사전 검사로 쓸 수 있습니다.
 
-            shutil.copy2(image_path, thumbnail_path)
-            return thumbnail_path
-        except:
-            return image_path
+    Raises:
+        MediaProcessingError: 이미지로 인식할 수 없거나 (stage "open")
+            limits를 넘는 경우 (stage "preflight")
+    """
+    with _open_image(image_path, limits) as img:
+        try:
+            return _probe(img)
+        except Exception as e:
+            raise MediaProcessingError(image_path, "decode", str(e)) from e
+
+
+def _crop_box(
+    image_size: Tuple[int, int], size: Tuple[int, int]
+) -> Tuple[int, int, int, int]:
+    """size 비율에 맞춰 중앙을 기준으로 자를 영역을 계산합니다."""
+    original_width, original_height = image_size
+    target_ratio = size[0] / size[1]
+    if original_width / original_height > target_ratio:
+        # 가로가 더 긴 이미지
+        crop_height = original_height
+        crop_width = int(crop_height * target_ratio)
+    else:
+        # 세로가 더 긴 이미지 또는 같은 비율
+        crop_width = original_width
+        crop_height = int(crop_width / target_ratio)
+    crop_left = (original_width - crop_width) // 2
+    crop_top = (original_height - crop_height) // 2
+    return (crop_left, crop_top, crop_left + crop_width, crop_top + crop_height)
+
+
+def draft_size(
+    image_size: Tuple[int, int],
+    size: Tuple[int, int],
+    orientation: int = 1,
+    rendition_sizes: Sequence[int] = (),
+) -> Tuple[int, int] | None:
+    """
+    썸네일을 만들 때 원본을 어디까지 줄여서 디코딩해도 되는지 계산합니다.
+
+    잘라낼 영역이 썸네일 크기의 THUMBNAIL_OVERSAMPLE배 이상 남고, 렌디션도
+    긴 쪽이 max_size의 THUMBNAIL_OVERSAMPLE배 이상 남는 가장 작은 크기를
+    반환합니다. 줄일 필요가 없으면 None을 반환합니다.
+    """
+    if orientation in TRANSPOSED_ORIENTATIONS:
+        # 디코딩은 회전 전 좌표로 일어나므로 썸네일 크기를 뒤집어 계산한다
+        size = (size[1], size[0])
+    left, top, right, bottom = _crop_box(image_size, size)
+    factor = max(
+        size[0] * THUMBNAIL_OVERSAMPLE / (right - left),
+        size[1] * THUMBNAIL_OVERSAMPLE / (bottom - top),
+        *(
+            max_size * THUMBNAIL_OVERSAMPLE / max(image_size)
+            for max_size in rendition_sizes
+        ),
+    )
+    if factor >= 1:
+        return None
+    return (math.ceil(image_size[0] * factor), math.ceil(image_size[1] * factor))
+
+
+def render_thumbnail(
+    img: Image.Image, size: Tuple[int, int], reducing_gap: float | None = None
+) -> Image.Image:
+    """디코딩된 이미지를 중앙 기준으로 size 비율에 맞게 크롭하고 리사이즈합니다."""
+    # JPEG로 저장할 수 있도록 RGB로 변환 (투명도 처리)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    return img.resize(
+        size,
+        Image.Resampling.LANCZOS,
+        box=_crop_box(img.size, size),
+        reducing_gap=reducing_gap,
+    )
+
+
+def render_placeholder(img: Image.Image) -> str:
+    """
+    디코딩된 이미지를 긴 쪽 PLACEHOLDER_SIZE 픽셀로 줄여 WebP data URI로 만듭니다.
+
+    비율을 유지하므로 클라이언트가 원래 크기로 늘려 흐리게 그리면 이미지가
+    도착하기 전까지 자리표시자로 쓸 수 있습니다 (보통 수백 바이트).
+    """
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if img.has_transparency_data else "RGB")
+    scale = PLACEHOLDER_SIZE / max(img.size)
+    size = (
+        max(1, round(img.width * min(scale, 1))),
+        max(1, round(img.height * min(scale, 1))),
+    )
+    small = img.resize(
+        size, Image.Resampling.BILINEAR, reducing_gap=THUMBNAIL_REDUCING_GAP
+    )
+    buffer = io.BytesIO()
+    small.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def save_renditions(
+    img: Image.Image,
+    renditions: Sequence[RenditionSpec],
+    reducing_gap: float | None = None,
+) -> list[RenditionFile]:
+    """
+    디코딩된 이미지 하나로 모든 렌디션을 만듭니다.
+
+    큰 크기부터 만들고, 작은 렌디션은 바로 앞의 큰 렌디션을 다시 줄여서
+    만듭니다. 원본보다 크게 늘리지는 않습니다.
+    """
+    saved = []
+    source = img
+    for max_size in sorted({spec.max_size for spec in renditions}, reverse=True):
+        resized = source.copy()
+        resized.thumbnail(
+            (max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=reducing_gap
+        )
+        for spec in renditions:
+            if spec.max_size != max_size:
+                continue
+            options = RENDITION_SAVE_OPTIONS[spec.format]
+            output = resized
+            if options["format"] == "JPEG" and output.mode not in ("RGB", "L"):
+                output = output.convert("RGB")
+            try:
+                os.makedirs(os.path.dirname(spec.path), exist_ok=True)
+                output.save(spec.path, **options)
+            except OSError as e:
+                raise MediaProcessingError(spec.path, "save", str(e)) from e
+            saved.append(
+                RenditionFile(
+                    max_size=spec.max_size,
+                    format=spec.format,
+                    path=spec.path,
+                    width=resized.width,
+                    height=resized.height,
+                    file_size=os.path.getsize(spec.path),
+                )
+            )
+        source = resized
+    return saved
+
+
+def process_image(
+    image_path: str,
+    thumbnail_path: str,
+    size: Tuple[int, int] = (160, 160),
+    fast: bool = True,
+    renditions: Sequence[RenditionSpec] = (),
+    limits: ImageLimits | None = None,
+) -> ProcessedImage:
+    """
+    이미지를 한 번만 열어 헤더 정보를 읽고 같은 디코딩 결과로 썸네일,
+    렌디션들, 저화질 미리보기를 만듭니다.
+
+    썸네일과 렌디션에는 EXIF 방향을 적용합니다. probe의 크기는 저장된
+    원본(헤더)의 크기이고, 보여지는 크기는 probe.display_size입니다. fast이면 JPEG는 draft 모드로 1/2~1/8 크기로
+    디코딩하고, 다른 형식은 reducing_gap으로 먼저 정수 배율 축소한 뒤
+    LANCZOS로 리샘플합니다.
+
+    Args:
+        image_path: 원본 이미지 파일 경로
+        thumbnail_path: 썸네일 저장 경로 (JPEG)
+        size: 썸네일 크기 (기본값: 160x160)
+        fast: 축소 디코딩 경로 사용 여부 (False면 원본 해상도로 디코딩)
+        renditions: 함께 만들 렌디션 목록
+        limits: 디코딩 전에 헤더로 확인할 한도
+
+    Returns:
+        ProcessedImage: 원본 이미지 정보, 저장된 렌디션들, 미리보기 data URI
+
+    Raises:
+        MediaProcessingError: 사전 검사, 열기, 디코딩, 저장 중 하나가 실패한 경우
+    """
+    with _open_image(image_path, limits) as img:
+        try:
+            probe = _probe(img)
+            if fast:
+                reduced_size = draft_size(
+                    img.size,
+                    size,
+                    probe.orientation,
+                    [spec.max_size for spec in renditions],
+                )
+                if reduced_size is not None:
+                    # JPEG가 아니면 아무 일도 하지 않는다
+                    img.draft(None, reduced_size)
+            img.load()
+            # 방향이 정상이면 복사 없이 그대로 사용한다
+            ImageOps.exif_transpose(img, in_place=True)
+        except Exception as e:
+            # 손상된 파일은 플러그인에 따라 OSError 외의 예외(struct.error 등)도 낸다
+            raise MediaProcessingError(image_path, "decode", str(e)) from e
+
+        reducing_gap = THUMBNAIL_REDUCING_GAP if fast else None
+        thumbnail_img = render_thumbnail(img, size, reducing_gap=reducing_gap)
+        rendition_files = save_renditions(img, renditions, reducing_gap=reducing_gap)
+        placeholder = render_placeholder(img)
+
+    try:
+        os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+        thumbnail_img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
+    except OSError as e:
+        raise MediaProcessingError(thumbnail_path, "save", str(e)) from e
+    return ProcessedImage(
+        probe=probe, renditions=rendition_files, placeholder=placeholder
+    )
+
+
+def render_variant(
+    image_path: str,
+    output_path: str,
+    width: int,
+    image_format: str,
+    limits: ImageLimits | None = None,
+) -> Tuple[int, int]:
+    """
+    원본 이미지를 주어진 너비로 줄여 image_format 형식으로 저장합니다.
+
+    비율은 유지하고 원본보다 크게 늘리지 않습니다. JPEG는 draft 모드로
+    필요한 만큼만 줄여서 디코딩합니다.
+
+    Returns:
+        Tuple[int, int]: 저장된 이미지 크기
+
+    Raises:
+        MediaProcessingError: 사전 검사, 열기, 디코딩, 저장 중 하나가 실패한 경우
+    """
+    with _open_image(image_path, limits) as img:
+        try:
+            orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+            display_width = (
+                img.height if orientation in TRANSPOSED_ORIENTATIONS else img.width
+            )
+            width = min(width, display_width)
+            factor = width * THUMBNAIL_OVERSAMPLE / display_width
+            if factor < 1:
+                img.draft(
+                    None,
+                    (math.ceil(img.width * factor), math.ceil(img.height * factor)),
+                )
+            img.load()
+            ImageOps.exif_transpose(img, in_place=True)
+        except Exception as e:
+            raise MediaProcessingError(image_path, "decode", str(e)) from e
+
+        height = max(1, round(img.height * width / img.width))
+        resized = img.resize(
+            (width, height),
+            Image.Resampling.LANCZOS,
+            reducing_gap=THUMBNAIL_REDUCING_GAP,
+        )
+
+    options = RENDITION_SAVE_OPTIONS[image_format]
+    if options["format"] == "JPEG" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    try:
+        resized.save(output_path, **options)
+    except OSError as e:
+        raise MediaProcessingError(output_path, "save", str(e)) from e
+    return resized.size
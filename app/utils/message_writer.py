@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# 큐 종료 신호
+_STOP = object()
+
+
+class MessageWriter(Generic[T]):
+    """
+    들어오는 메시지를 큐에 모아 작은 배치 단위로 commit하는 write-behind writer.
+
+    메시지마다 commit(fsync)하는 대신, 앞선 commit이 진행되는 동안 쌓인 메시지와
+    max_delay 안에 들어온 메시지를 최대 max_batch_size개까지 한 번에 commit합니다.
+    commit이 끝나 내구성이 보장된 직후 on_commit으로 배치를 넘겨 브로드캐스트합니다.
+    큐는 하나이므로 제출 순서대로 commit되고 브로드캐스트됩니다.
+
+    submit은 메시지마다 commit 결과로 완료되는 future를 돌려주므로, 배치 commit이
+    실패하면 보낸 쪽이 알 수 있습니다. 큐 크기는 max_queue_size로 제한되어 commit이
+    느려지면 submit이 기다리게 되고, 그만큼 보내는 쪽의 수신도 늦춰집니다.
+    """
+
+    def __init__(
+        self,
+        commit_batch: Callable[[list[T]], Awaitable[None]],
+        on_commit: Callable[[list[T]], Awaitable[None]],
+        *,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+        max_queue_size: int = 1024,
+    ):
+        self.commit_batch = commit_batch
+        self.on_commit = on_commit
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            # 이벤트 루프가 바뀌면(테스트 클라이언트 등) 큐와 태스크를 새로 만든다
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, message: T) -> asyncio.Future:
+        """
+        메시지를 쓰기 큐에 넣습니다. commit과 브로드캐스트는 백그라운드에서 진행됩니다.
+
+        큐가 가득 차 있으면 자리가 날 때까지 기다립니다.
+
+        Returns:
+            asyncio.Future: commit되면 None으로, commit이 실패하면 그 예외로 완료
+        """
+        self._ensure_started()
+        committed = self._loop.create_future()
+        await self._queue.put((message, committed))
+        return committed
+
+    async def stop(self) -> None:
+        """큐에 남은 메시지를 모두 commit한 뒤 writer를 종료합니다."""
+        if self._task is None or self._task.done():
+            return
+        if self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _collect_batch(self, first) -> tuple[list, bool]:
+        batch = [first]
+        stopping = False
+        deadline = self._loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            try:
+                # 이미 쌓여 있는 메시지는 기다리지 않고 가져온다
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            entries, stopping = await self._collect_batch(first)
+            batch = [message for message, _ in entries]
+
+            try:
+                await self.commit_batch(batch)
+            except Exception as e:
+                logger.exception("Error committing a batch of %d messages", len(batch))
+                for _, committed in entries:
+                    if not committed.done():
+                        committed.set_exception(e)
+                continue
+
+            for _, committed in entries:
+                if not committed.done():
+                    committed.set_result(None)
+
+            try:
+                await self.on_commit(batch)
+            except Exception:
+                # 메시지는 이미 저장되었으므로 다시 불러오면 보인다
+                logger.exception(
+                    "Error broadcasting a batch of %d messages", len(batch)
+                )
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+# 다음 페이지 커서를 돌려주는 응답 헤더
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _dump_value(value: Any) -> list:
+    if isinstance(value, UUID):
+        return ["uuid", value.hex]
+    if isinstance(value, datetime):
+        return ["datetime", value.isoformat()]
+    return ["raw", value]
+
+
+def _load_value(item: list) -> Any:
+    kind, value = item
+    if kind == "uuid":
+        return UUID(value)
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "raw":
+        return value
+    raise ValueError(f"Unknown cursor value kind: {kind}")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    정렬 키 값들을 불투명한(opaque) 커서 문자열로 인코딩합니다.
+
+    Args:
+        values: 마지막 행의 정렬 키 값들
+
+    Returns:
+        str: URL-safe base64 커서
+    """
+    payload = json.dumps([_dump_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> tuple:
+    """
+    커서 문자열을 정렬 키 값들로 디코딩합니다.
+
+    Args:
+        cursor: encode_cursor로 만든 커서
+        size: 정렬 키 컬럼 개수
+
+    Returns:
+        tuple: 정렬 키 값들
+
+    Raises:
+        HTTPException: 커서 형식이 올바르지 않은 경우 (400)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        items = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = tuple(_load_value(item) for item in items)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def apply_cursor(statement, columns: Sequence, after: str, limit: int):
+    """
+    키셋(keyset) 페이지네이션 조건을 statement에 적용합니다.
+
+    columns 순서로 정렬하고, 커서가 주어지면 커서 이후의 행만 조회합니다.
+    빈 커서("")는 첫 페이지를 의미합니다.
+
+    Args:
+        statement: select statement
+        columns: 유일하고 안정적인 정렬 키 컬럼들 (마지막은 보통 id)
+        after: 이전 페이지의 next cursor
+        limit: 페이지 크기
+
+    Returns:
+        정렬, 조건, limit이 적용된 statement
+    """
+    if after:
+        values = decode_cursor(after, len(columns))
+        # (c1, c2, ...) > (v1, v2, ...) 를 행 값 비교 없이 풀어서 쓴다
+        conditions = []
+        for index, column in enumerate(columns):
+            equals = [columns[i] == values[i] for i in range(index)]
+            conditions.append(and_(*equals, column > values[index]))
+        statement = statement.where(or_(*conditions))
+    return statement.order_by(*columns).limit(limit)
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence, columns: Sequence, limit: int
+) -> None:
+    """
+    페이지가 가득 찼으면 마지막 행 기준의 다음 커서를 응답 헤더에 넣습니다.
+
+    Args:
+        response: FastAPI 응답 객체
+        rows: 조회된 행들
+        columns: apply_cursor에 넘긴 정렬 키 컬럼들
+        limit: 페이지 크기
+    """
+    if rows and len(rows) == limit:
+        last_row = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last_row, column.key) for column in columns]
+        )
+
+
+def paginate(
+    session,
+    statement,
+    columns: Sequence,
+    *,
+    response: Response,
+    offset: int,
+    limit: int,
+    after: str | None,
+) -> list:
+    """
+    목록 조회 statement를 offset 방식 또는 커서 방식으로 실행합니다.
+
+    after가 없으면 기존 offset/limit 방식으로 조회합니다.
+    after가 주어지면(빈 문자열은 첫 페이지) columns 기준 키셋 페이지네이션으로
+    조회하고, 다음 커서를 X-Next-Cursor 헤더로 돌려줍니다.
+
+    Returns:
+        list: 조회된 행들
+    """
+    if after is None:
+        return session.exec(statement.offset(offset).limit(limit)).all()
+
+    rows = session.exec(apply_cursor(statement, columns, after, limit)).all()
+    set_next_cursor(response, rows, columns, limit)
+    return rows
+
+
+async def paginate_async(
+    session,
+    statement,
+    columns: Sequence,
+    *,
+    response: Response,
+    offset: int,
+    limit: int,
+    after: str | None,
+) -> list:
+    """AsyncSession용 paginate"""
+    if after is None:
+        return (await session.exec(statement.offset(offset).limit(limit))).all()
+
+    rows = (await session.exec(apply_cursor(statement, columns, after, limit))).all()
+    set_next_cursor(response, rows, columns, limit)
+    return rows
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+from typing import Callable
+from urllib.parse import urlparse
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+# 채팅방 채널 이름 접두사
+CHANNEL_PREFIX = "chat:"
+
+# 수신한 메시지를 로컬 연결에 전달하는 콜백 (chat_id, 직렬화된 메시지)
+DeliverHandler = Callable[[UUID, str], None]
+
+
+def room_channel(chat_id: UUID) -> str:
+    return f"{CHANNEL_PREFIX}{chat_id.hex}"
+
+
+def encode_command(*parts: str | bytes) -> bytes:
+    """RESP 배열(bulk string) 형식으로 명령을 인코딩합니다."""
+    encoded = [f"*{len(parts)}\r\n".encode()]
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        encoded.append(b"$%d\r\n%s\r\n" % (len(part), part))
+    return b"".join(encoded)
+
+
+class RespError(Exception):
+    """서버가 보낸 RESP 오류 응답"""
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """RESP2 응답 하나를 읽습니다."""
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RespError(f"Unknown RESP reply type: {line!r}")
+
+
+async def open_connection(url: str):
+    """redis://host:port 또는 unix:///path 주소로 연결합니다."""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return await asyncio.open_unix_connection(parsed.path)
+    if parsed.scheme == "redis":
+        return await asyncio.open_connection(parsed.hostname, parsed.port or 6379)
+    raise ValueError(f"Unsupported pub/sub URL: {url}")
+
+
+class InProcessBackend:
+    """
+    프로세스 내부 전달 백엔드 (기본값).
+
+    publish한 메시지를 같은 프로세스의 연결에만 바로 전달합니다.
+    """
+
+    def __init__(self):
+        self._handler: DeliverHandler | None = None
+
+    def start(self, handler: DeliverHandler) -> None:
+        self._handler = handler
+
+    def subscribe(self, chat_id: UUID) -> None:
+        pass
+
+    def unsubscribe(self, chat_id: UUID) -> None:
+        pass
+
+    async def publish(self, chat_id: UUID, message: str) -> None:
+        if self._handler is not None:
+            self._handler(chat_id, message)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisPubSubBackend:
+    """
+    Redis 프로토콜(RESP) PUBLISH/SUBSCRIBE 기반 프로세스 간 전달 백엔드.
+
+    uvicorn 워커가 여러 개여도 모든 워커의 연결에 메시지가 전달됩니다.
+    로컬 연결이 있는 채팅방 채널만 구독하고, 메시지는 직렬화된 문자열 그대로
+    한 번만 publish됩니다. Redis 대신 app.utils.resp_broker 같은 호환 서버를
+    TCP(redis://) 또는 Unix 소켓(unix://)으로 사용할 수 있습니다.
+    """
+
+    def __init__(self, url: str, reconnect_delay: float = 0.5):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._handler: DeliverHandler | None = None
+        self._channels: set[str] = set()
+        # 서버가 구독을 확인한 채널들
+        self.subscribed_channels: set[str] = set()
+        self._publisher = None
+        self._publish_lock: asyncio.Lock | None = None
+        self._subscriber_writer: asyncio.StreamWriter | None = None
+        self._subscriber_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self, handler: DeliverHandler) -> None:
+        self._handler = handler
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이벤트 루프가 바뀌면 이전 루프의 연결은 버린다
+            self._loop = loop
+            self._publisher = None
+            self._publish_lock = asyncio.Lock()
+            self._subscriber_writer = None
+            self._subscriber_task = None
+
+    def _ensure_subscriber(self) -> None:
+        self._ensure_loop()
+        if self._subscriber_task is None or self._subscriber_task.done():
+            self._subscriber_task = self._loop.create_task(self._subscriber_loop())
+
+    def subscribe(self, chat_id: UUID) -> None:
+        channel = room_channel(chat_id)
+        self._channels.add(channel)
+        self._ensure_subscriber()
+        if self._subscriber_writer is not None:
+            self._subscriber_writer.write(encode_command("SUBSCRIBE", channel))
+
+    def unsubscribe(self, chat_id: UUID) -> None:
+        channel = room_channel(chat_id)
+        self._channels.discard(channel)
+        if self._subscriber_writer is not None:
+            self._subscriber_writer.write(encode_command("UNSUBSCRIBE", channel))
+
+    def _deliver(self, channel: str, payload: bytes) -> None:
+        """받은 메시지 하나를 전달합니다 (잘못된 메시지는 건너뛰고 구독은 유지)."""
+        try:
+            chat_id = UUID(channel.removeprefix(CHANNEL_PREFIX))
+            message = payload.decode()
+        except ValueError:
+            logger.warning("Ignoring pub/sub message on unexpected channel %r", channel)
+            return
+        if self._handler is None:
+            return
+        try:
+            self._handler(chat_id, message)
+        except Exception:
+            logger.exception("Error delivering pub/sub message for chat %s", chat_id)
+
+    async def _subscriber_loop(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await open_connection(self.url)
+                if self._channels:
+                    writer.write(encode_command("SUBSCRIBE", *sorted(self._channels)))
+                self._subscriber_writer = writer
+                while True:
+                    reply = await read_reply(reader)
+                    if not isinstance(reply, list) or len(reply) < 3:
+                        continue
+                    kind, channel = reply[0], reply[1].decode(errors="replace")
+                    if kind == b"message":
+                        self._deliver(channel, reply[2])
+                    elif kind == b"subscribe":
+                        self.subscribed_channels.add(channel)
+                    elif kind == b"unsubscribe":
+                        self.subscribed_channels.discard(channel)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.IncompleteReadError, RespError):
+                logger.exception("Pub/sub subscriber disconnected")
+            finally:
+                self._subscriber_writer = None
+                self.subscribed_channels.clear()
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, chat_id: UUID, message: str) -> None:
+        self._ensure_loop()
+        command = encode_command("PUBLISH", room_channel(chat_id), message)
+        async with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = await open_connection(self.url)
+                    reader, writer = self._publisher
+                    writer.write(command)
+                    await writer.drain()
+                    await read_reply(reader)
+                    return
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    # 끊긴 연결은 한 번만 다시 연결해서 재시도한다
+                    self._publisher = None
+                    if attempt == 1:
+                        raise ConnectionError(f"Pub/sub publish failed: {e}")
+
+    async def close(self) -> None:
+        if self._subscriber_task is not None:
+            self._subscriber_task.cancel()
+            try:
+                await self._subscriber_task
+            except asyncio.CancelledError:
+                pass
+            self._subscriber_task = None
+        if self._publisher is not None:
+            self._publisher[1].close()
+            self._publisher = None
+
+
+def create_pubsub_backend(url: str | None):
+    """설정된 URL에 맞는 pub/sub 백엔드를 생성합니다 (없으면 프로세스 내부 전달)."""
+    if not url:
+        return InProcessBackend()
+    return RedisPubSubBackend(url)
@@ -0,0 +1,111 @@
+"""
+Redis PUBLISH/SUBSCRIBE와 호환되는 최소 로컬 브로커
+
+Redis를 띄우기 어려운 개발/단일 서버 환경에서 여러 uvicorn 워커의 채팅
+브로드캐스트를 중계합니다. SUBSCRIBE, UNSUBSCRIBE, PUBLISH, PING만 지원합니다.
+
+    python -m app.utils.resp_broker --unix /tmp/bapi-chat.sock
+    CHAT_PUBSUB_URL=unix:///tmp/bapi-chat.sock uvicorn app.main:app --workers 4
+"""
+
+import argparse
+import asyncio
+
+from app.utils.pubsub import RespError, encode_command, read_reply
+
+
+class RespBroker:
+    def __init__(self):
+        self.channels: dict[bytes, set[asyncio.StreamWriter]] = {}
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        subscriptions: set[bytes] = set()
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR invalid command\r\n")
+                    continue
+                name, args = command[0].upper(), command[1:]
+
+                if name == b"SUBSCRIBE":
+                    for channel in args:
+                        subscriptions.add(channel)
+                        self.channels.setdefault(channel, set()).add(writer)
+                        writer.write(
+                            self._push(b"subscribe", channel, len(subscriptions))
+                        )
+                elif name == b"UNSUBSCRIBE":
+                    for channel in args or list(subscriptions):
+                        subscriptions.discard(channel)
+                        self._remove(channel, writer)
+                        writer.write(
+                            self._push(b"unsubscribe", channel, len(subscriptions))
+                        )
+                elif name == b"PUBLISH" and len(args) == 2:
+                    channel, payload = args
+                    # 메시지는 한 번만 인코딩해서 모든 구독자에게 보낸다
+                    message = encode_command(b"message", channel, payload)
+                    subscribers = self.channels.get(channel, ())
+                    for subscriber in subscribers:
+                        subscriber.write(message)
+                    writer.write(b":%d\r\n" % len(subscribers))
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, RespError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self._remove(channel, writer)
+            writer.close()
+
+    def _remove(self, channel: bytes, writer: asyncio.StreamWriter) -> None:
+        subscribers = self.channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.channels[channel]
+
+    @staticmethod
+    def _push(kind: bytes, channel: bytes, count: int) -> bytes:
+        return b"*3\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n:%d\r\n" % (
+            len(kind),
+            kind,
+            len(channel),
+            channel,
+            count,
+        )
+
+
+async def start_broker(
+    host: str | None = None, port: int | None = None, unix: str | None = None
+) -> asyncio.Server:
+    """브로커 서버를 시작합니다 (unix 경로가 있으면 Unix 소켓 사용)."""
+    broker = RespBroker()
+    if unix:
+        return await asyncio.start_unix_server(broker.handle_client, path=unix)
+    return await asyncio.start_server(broker.handle_client, host, port)
+
+
+async def serve(host: str, port: int, unix: str | None) -> None:
+    server = await start_broker(host, port, unix)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local RESP pub/sub broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--unix", help="Unix 소켓 경로 (지정하면 TCP 대신 사용)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
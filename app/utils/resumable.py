@@ -0,0 +1,152 @@
+"""
+tus 방식 이어받기 업로드의 프로토콜 처리와 청크 저장.
+
+업로드 하나를 여러 PATCH 요청으로 나눠 받고, 각 요청의 본문은 메모리에 모으지
+않고 받는 대로 파일 끝(Upload-Offset 위치)에 이어 씁니다. 연결이 끊기면 그때까지
+받은 바이트는 남기므로, 클라이언트는 HEAD로 offset을 확인하고 나머지만 다시
+보내면 됩니다.
+"""
+
+import base64
+import binascii
+import fcntl
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+# 지원하는 tus 프로토콜 버전 (Tus-Resumable 헤더)
+TUS_VERSION = "1.0.0"
+# PATCH 요청 본문의 Content-Type
+OFFSET_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def parse_upload_metadata(header: str | None) -> dict[str, str]:
+    """
+    Upload-Metadata 헤더("key base64값, key base64값, ...")를 해석합니다.
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 값이 base64/UTF-8이 아닌 경우
+    """
+    metadata = {}
+    if not header:
+        return metadata
+    for pair in header.split(","):
+        parts = pair.strip().split(" ")
+        if not parts[0] or len(parts) > 2:
+            raise ValueError(f"Invalid Upload-Metadata pair: {pair!r}")
+        value = ""
+        if len(parts) == 2:
+            try:
+                value = base64.b64decode(parts[1], validate=True).decode()
+            except (binascii.Error, UnicodeDecodeError):
+                raise ValueError(f"Invalid Upload-Metadata value for {parts[0]!r}")
+        metadata[parts[0]] = value
+    return metadata
+
+
+def lock_upload_file(path: str):
+    """
+    업로드 파일에 배타적 잠금(flock)을 걸고, 잠금을 쥔 파일 객체를 반환합니다.
+
+    잠금은 파일에 걸리므로 다른 worker 프로세스의 요청과도 배제되어, 같은 업로드에
+    동시에 온 PATCH가 바이트를 섞어 쓰지 않습니다. 잠금을 기다리지 않으며, 반환된
+    파일을 닫으면 풀립니다.
+
+    Raises:
+        BlockingIOError: 다른 요청이 이미 잠근 경우
+        FileNotFoundError: 업로드 파일이 없는 경우
+    """
+    file = open(path, "rb")
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+@dataclass
+class AppendResult:
+    """PATCH 요청 하나로 이어 쓴 결과"""
+
+    written: int  # 디스크에 쓴 바이트 수
+    interrupted: bool  # 본문을 다 받기 전에 클라이언트 연결이 끊겼는지
+
+
+def _open_at(path: str, offset: int):
+    """파일을 offset 위치에서 이어 쓰도록 엽니다 (offset 뒤의 내용은 버림)."""
+    # 파일은 업로드를 만들 때 생긴다 (없으면 만료되어 지워진 업로드)
+    file = open(path, "r+b")
+    try:
+        # 이전 요청이 쓰고 offset을 기록하지 못한 바이트는 클라이언트가 다시 보낸다
+        file.truncate(offset)
+        file.seek(offset)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+async def append_stream(
+    path: str,
+    offset: int,
+    stream: AsyncIterator[bytes],
+    *,
+    max_size: int,
+    buffer_size: int = 1024 * 1024,
+) -> AppendResult:
+    """
+    요청 본문 스트림을 파일의 offset 위치부터 이어 씁니다.
+
+    받은 조각은 buffer_size만큼 모일 때마다 스레드 풀에서 파일에 쓰므로 이벤트
+    루프를 막지 않고, 메모리에는 buffer_size 이상 머무르지 않습니다.
+    클라이언트 연결이 끊기면 그때까지 받은 바이트를 쓰고 interrupted=True를
+    반환합니다 (호출한 쪽이 그만큼 offset을 올림).
+
+    Args:
+        path: 업로드 중인 파일 경로
+        offset: 이미 저장된 바이트 수 (여기서부터 씀)
+        stream: 요청 본문 (Request.stream())
+        max_size: 이 요청으로 받을 수 있는 최대 바이트 수
+        buffer_size: 한 번에 파일에 쓰는 크기
+
+    Returns:
+        AppendResult: 쓴 바이트 수와 연결이 끊겼는지 여부
+
+    Raises:
+        HTTPException: 본문이 max_size보다 크면 413 (이 요청에서 쓴 내용은 버림)
+        FileNotFoundError: 업로드 파일이 없는 경우
+    """
+    file = await run_in_threadpool(_open_at, path, offset)
+    written = 0
+    buffer = bytearray()
+    interrupted = False
+    try:
+        try:
+            async for chunk in stream:
+                if written + len(buffer) + len(chunk) > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Chunk exceeds the {max_size} byte limit",
+                    )
+                buffer += chunk
+                if len(buffer) >= buffer_size:
+                    await run_in_threadpool(file.write, bytes(buffer))
+                    written += len(buffer)
+                    buffer.clear()
+        except ClientDisconnect:
+            interrupted = True
+        if buffer:
+            await run_in_threadpool(file.write, bytes(buffer))
+            written += len(buffer)
+        await run_in_threadpool(file.flush)
+    except BaseException:
+        # 거부한 요청의 바이트는 남기지 않는다
+        await run_in_threadpool(file.truncate, offset)
+        raise
+    finally:
+        await run_in_threadpool(file.close)
+    return AppendResult(written=written, interrupted=interrupted)
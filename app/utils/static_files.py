@@ -0,0 +1,93 @@
+import os
+from typing import Callable
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# 내용이 바뀌지 않는 파일 (내용 해시로 이름이 정해진 업로드, 이미지 변형)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class MediaFileResponse(FileResponse):
+    """
+    큰 청크로 파일을 보내는 FileResponse.
+
+    Range 요청(206, 동영상 탐색)과 If-Range는 FileResponse가 처리합니다.
+    서버가 ASGI pathsend 확장을 지원하면 전체 파일 응답은 서버가 sendfile로
+    직접 보내고, 그렇지 않으면 chunk_size 단위로 읽어 보냅니다.
+    """
+
+    def __init__(self, *args, chunk_size: int = 1024 * 1024, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunk_size = chunk_size
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Cache-Control과 ETag를 붙여 파일을 보내는 StaticFiles.
+
+    immutable(mount 기준 상대 경로를 받는 함수)이 참을 반환하는 파일은 이름이
+    내용을 나타내므로(내용 해시로 이름이 정해진 업로드) immutable_cache_control로
+    오래 캐시하고, 상대 경로와 크기를 강한 ETag로 써서 서버나 배포가 바뀌어도 같은
+    값을 보냅니다. 그 밖의 파일은 같은 경로의 내용이 바뀔 수 있으므로
+    cache_control을 쓰고, 수정 시각과 크기로 만든 기본 ETag로 재검증합니다.
+    If-None-Match/If-Modified-Since가 맞으면 304를 반환합니다.
+
+    Args:
+        cache_control: 내용이 바뀔 수 있는 파일의 Cache-Control 값
+        immutable: 파일 이름이 내용을 나타내는지 판단하는 함수 (없으면 모두 아님)
+        immutable_cache_control: 이름이 내용을 나타내는 파일의 Cache-Control 값
+        chunk_size: 파일을 읽어 보내는 단위 (bytes)
+    """
+
+    def __init__(
+        self,
+        *,
+        cache_control: str,
+        immutable: Callable[[str], bool] | None = None,
+        immutable_cache_control: str = IMMUTABLE_CACHE_CONTROL,
+        chunk_size: int = 1024 * 1024,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.cache_control = cache_control
+        self.immutable = immutable
+        self.immutable_cache_control = immutable_cache_control
+        self.chunk_size = chunk_size
+
+    def relative_path(self, full_path: str) -> str:
+        return os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+
+    def is_immutable(self, full_path: str) -> bool:
+        if self.immutable is None or self.directory is None:
+            return False
+        return self.immutable(self.relative_path(full_path))
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        if self.is_immutable(full_path):
+            relative = self.relative_path(full_path)
+            headers = {
+                "cache-control": self.immutable_cache_control,
+                "etag": f'"{relative}:{stat_result.st_size}"',
+            }
+        else:
+            # FileResponse가 수정 시각과 크기로 ETag를 만든다
+            headers = {"cache-control": self.cache_control}
+        response = MediaFileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            stat_result=stat_result,
+            chunk_size=self.chunk_size,
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
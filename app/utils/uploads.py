@@ -0,0 +1,156 @@
+import hashlib
+import os
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class StoredFile:
+    """디스크에 저장된 업로드 파일 정보"""
+
+    size: int  # bytes
+    content_hash: str  # sha256 hex digest
+
+
+class UploadLimiter:
+    """
+    업로드 파일을 고정 크기 청크로 디스크에 스트리밍하는 저장기.
+
+    파일 전체를 메모리에 올리지 않고 chunk_size 단위로 읽어 쓰면서 크기와
+    sha256 해시를 함께 계산합니다. 청크마다 파일 하나의 크기(max_file_size)와
+    요청 전체의 누적 크기(max_request_size)를 확인하고, 제한을 넘으면 쓰던 파일을
+    지운 뒤 413 오류를 발생시킵니다. 한 요청의 파일들은 같은 인스턴스로 저장합니다.
+
+    source는 Starlette가 이미 받아 둔 임시 파일이므로, 본문을 받는 도중의 제한은
+    UploadSizeLimitMiddleware가 맡습니다.
+    """
+
+    def __init__(
+        self,
+        max_file_size: int,
+        max_request_size: int,
+        chunk_size: int = 1024 * 1024,
+    ):
+        self.max_file_size = max_file_size
+        self.max_request_size = max_request_size
+        self.chunk_size = chunk_size
+        self.total_size = 0
+
+    def _check_limits(self, size: int) -> None:
+        if size > self.max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {self.max_file_size} byte limit",
+            )
+        if self.total_size + size > self.max_request_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds the {self.max_request_size} byte request limit",
+            )
+
+    def save(self, source: BinaryIO, path: str) -> StoredFile:
+        """
+        source를 path에 청크 단위로 저장합니다.
+
+        Args:
+            source: 읽을 파일 객체 (UploadFile.file 등)
+            path: 저장할 경로
+
+        Returns:
+            StoredFile: 저장된 크기와 sha256 해시
+        """
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(path, "wb") as buffer:
+                while chunk := source.read(self.chunk_size):
+                    size += len(chunk)
+                    self._check_limits(size)
+                    digest.update(chunk)
+                    buffer.write(chunk)
+        except BaseException:
+            # 제한 초과나 쓰기 실패 시 일부만 쓴 파일을 남기지 않는다
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            raise
+
+        self.total_size += size
+        return StoredFile(size=size, content_hash=digest.hexdigest())
+
+
+class UploadSizeLimitMiddleware:
+    """
+    multipart/form-data 요청 본문의 크기를 받는 동안 제한하는 ASGI 미들웨어.
+
+    Starlette는 파일 필드를 엔드포인트에 넘기기 전에 본문 전체를 받아 임시 파일에
+    spool하므로, UploadLimiter의 검사는 본문을 다 받은 뒤에야 실행됩니다. 이
+    미들웨어는 Content-Length가 max_size를 넘으면 본문을 읽지 않고 바로 413을
+    반환하고, Content-Length가 없거나 실제 본문이 더 길면 받은 크기가 max_size를
+    넘는 순간 413으로 중단합니다.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds the {self.max_size} byte request limit",
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = _header(scope, b"content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_size:
+                response = JSONResponse(
+                    {"detail": self._too_large().detail}, status_code=413
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # 폼을 파싱하던 라우트가 그대로 413 응답으로 바꾼다
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_multipart(scope: Scope) -> bool:
+    content_type = _header(scope, b"content-type") or ""
+    return content_type.lower().startswith("multipart/form-data")
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> StoredFile:
+    """이미 디스크에 있는 파일의 크기와 sha256 해시를 청크 단위로 읽어 계산합니다."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            size += len(chunk)
+            digest.update(chunk)
+    return StoredFile(size=size, content_hash=digest.hexdigest())
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+# 읽기 전에 변형 파일이 지워졌을 때 다시 만들어 읽는 최대 횟수
+READ_ATTEMPTS = 3
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+class VariantCache:
+    """
+    크기가 제한된 디스크 LRU 캐시 (요청 시 생성하는 이미지 변형용).
+
+    키마다 파일 하나를 저장하고, 전체 크기가 max_bytes를 넘으면 가장 오래
+    사용하지 않은 파일부터 지웁니다. 같은 키를 동시에 요청하면 생성은 한 번만
+    실행되고 나머지 요청은 그 결과를 기다립니다. 파일은 임시 이름으로 쓴 뒤
+    rename하므로 다른 워커 프로세스가 쓰다 만 파일을 읽지 않습니다.
+
+    돌려준 경로의 파일은 다른 요청이나 워커 프로세스의 정리로 언제든 지워질 수
+    있으므로, 응답에는 지워진 파일을 캐시 미스로 다루는 read를 사용합니다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # 파일 경로 -> 크기 (앞쪽이 가장 오래 사용하지 않은 항목)
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: dict[str, asyncio.Task] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """디스크에 남아 있는 캐시 파일을 마지막 사용 시각 순서로 읽어 들입니다."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_atime, entry.path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self.total_bytes += size
+        self._evict()
+
+    def path_for(self, key: str, extension: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.{extension}")
+
+    def _touch(self, path: str) -> bool:
+        with self._lock:
+            if path not in self._entries:
+                return False
+            self._entries.move_to_end(path)
+            return True
+
+    def _add(self, path: str) -> None:
+        size = os.path.getsize(path)
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+        self._evict()
+
+    def _forget(self, path: str) -> None:
+        """이미 지워진 파일을 항목에서 뺍니다."""
+        with self._lock:
+            self.total_bytes -= self._entries.pop(path, 0)
+
+    def _evict(self) -> None:
+        with self._lock:
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                path, size = self._entries.popitem(last=False)
+                self.total_bytes -= size
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    async def get_or_create(
+        self,
+        key: str,
+        extension: str,
+        render: Callable[[str], Awaitable[None]],
+    ) -> str:
+        """
+        캐시된 파일 경로를 반환하고, 없으면 render로 만들어 저장합니다.
+
+        Args:
+            key: 변형을 구분하는 키
+            extension: 파일 확장자
+            render: 주어진 경로에 파일을 쓰는 코루틴 함수
+
+        Returns:
+            str: 캐시 파일 경로
+        """
+        path = self.path_for(key, extension)
+        if self._touch(path) and os.path.exists(path):
+            return path
+        if os.path.exists(path):
+            # 다른 워커 프로세스가 만든 파일
+            self._add(path)
+            return path
+
+        task = self._pending.get(path)
+        if task is None:
+            # 요청이 취소되어도 생성은 끝까지 진행되도록 별도 태스크로 실행한다
+            task = asyncio.get_running_loop().create_task(
+                self._create(path, extension, render)
+            )
+            self._pending[path] = task
+            task.add_done_callback(lambda _: self._pending.pop(path, None))
+        # 같은 변형을 만드는 중이면 그 결과를 함께 기다린다
+        return await asyncio.shield(task)
+
+    async def read(
+        self,
+        key: str,
+        extension: str,
+        render: Callable[[str], Awaitable[None]],
+    ) -> bytes:
+        """
+        캐시된 변형의 내용을 반환하고, 없으면 render로 만들어 저장합니다.
+
+        get_or_create가 경로를 돌려준 뒤 파일을 읽기 전에 다른 요청의 정리로
+        지워졌으면 캐시 미스로 보고 다시 만듭니다.
+
+        Raises:
+            FileNotFoundError: READ_ATTEMPTS번 모두 읽기 전에 지워진 경우
+        """
+        for attempt in range(READ_ATTEMPTS):
+            path = await self.get_or_create(key, extension, render)
+            try:
+                return await asyncio.to_thread(_read_file, path)
+            except FileNotFoundError:
+                self._forget(path)
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+
+    async def _create(
+        self, path: str, extension: str, render: Callable[[str], Awaitable[None]]
+    ) -> str:
+        temporary_path = os.path.join(self.directory, f".{uuid4().hex}.{extension}")
+        try:
+            await render(temporary_path)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self._add(path)
+        return path
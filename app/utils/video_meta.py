@@ -0,0 +1,240 @@
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+from .media_utils import MediaProcessingError
+
+# moov 박스를 메모리로 읽을 때의 최대 크기 (이보다 크면 손상된 파일로 본다)
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+# 자식 박스를 가진 컨테이너 박스 중 메타데이터 경로에 있는 것들
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+# ISO BMFF 파일의 첫 박스로 올 수 있는 타입
+TOP_LEVEL_BOXES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot"}
+
+
+@dataclass
+class VideoMetadata:
+    """MP4/MOV 헤더(moov)에서 읽은 동영상 정보"""
+
+    width: int | None  # 회전을 적용한 표시 크기
+    height: int | None
+    duration: float | None  # seconds
+    video_codec: str | None  # "avc1", "hvc1", "av01", ...
+    audio_codec: str | None  # "mp4a", ...
+    rotation: int = 0  # 0, 90, 180, 270
+
+
+@dataclass
+class _Track:
+    handler: bytes | None = None
+    codec: str | None = None
+    width: float | None = None
+    height: float | None = None
+    rotation: int = 0
+    duration: float | None = None
+
+
+def _read_header(file: BinaryIO) -> tuple[bytes, int, int | None] | None:
+    """파일의 현재 위치에서 박스 헤더를 읽습니다. (타입, 헤더 크기, 본문 크기)"""
+    header = file.read(8)
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack(">I4s", header)
+    header_size = 8
+    if size == 1:
+        largesize = file.read(8)
+        if len(largesize) < 8:
+            return None
+        size = struct.unpack(">Q", largesize)[0]
+        header_size = 16
+    elif size == 0:
+        # 파일 끝까지 이어지는 박스
+        return box_type, header_size, None
+    if size < header_size:
+        raise ValueError(f"Invalid size {size} for box {box_type!r}")
+    return box_type, header_size, size - header_size
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """메모리에 읽은 박스들의 (타입, 본문 시작, 본문 끝)을 차례로 반환합니다."""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise ValueError(f"Invalid size {size} for box {box_type!r}")
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def _require(box_type: bytes, start: int, end: int, size: int) -> None:
+    """박스 본문이 읽으려는 필드를 담을 만큼 긴지 확인합니다."""
+    if end - start < size:
+        raise ValueError(f"Box {box_type!r} is truncated ({end - start} bytes)")
+
+
+def _time_fields(data: bytes, start: int, end: int) -> tuple[int, int]:
+    """mvhd/mdhd 본문에서 (timescale, duration)을 읽습니다."""
+    _require(b"mvhd/mdhd", start, end, 1)
+    if data[start] == 1:
+        _require(b"mvhd/mdhd", start, end, 32)
+        return struct.unpack_from(">IQ", data, start + 20)
+    _require(b"mvhd/mdhd", start, end, 20)
+    return struct.unpack_from(">II", data, start + 12)
+
+
+def _parse_tkhd(data: bytes, start: int, end: int, track: _Track) -> None:
+    _require(b"tkhd", start, end, 1)
+    version = data[start]
+    _require(b"tkhd", start, end, 96 if version == 1 else 84)
+    offset = start + (36 if version == 1 else 24)
+    # reserved(8) layer(2) alternate_group(2) volume(2) reserved(2)
+    offset += 16
+    a, b, _, c, d = struct.unpack_from(">iiiii", data, offset)
+    if (a, b, c, d) == (0, 0x10000, -0x10000, 0):
+        track.rotation = 90
+    elif (a, b, c, d) == (-0x10000, 0, 0, -0x10000):
+        track.rotation = 180
+    elif (a, b, c, d) == (0, -0x10000, 0x10000, 0):
+        track.rotation = 270
+    width, height = struct.unpack_from(">II", data, offset + 36)
+    track.width = width / 0x10000
+    track.height = height / 0x10000
+
+
+def _parse_stsd(data: bytes, start: int, end: int, track: _Track) -> None:
+    entry_start = start + 8
+    for entry_type, entry_payload, entry_end in _iter_boxes(data, entry_start, end):
+        track.codec = entry_type.decode("latin-1").strip()
+        if track.handler == b"vide" and not track.width:
+            _require(entry_type, entry_payload, entry_end, 28)
+            # VisualSampleEntry: reserved(6) data_reference_index(2) pre_defined(16)
+            width, height = struct.unpack_from(">HH", data, entry_payload + 24)
+            track.width, track.height = float(width), float(height)
+        return
+
+
+def _parse_track(data: bytes, start: int, end: int) -> _Track:
+    track = _Track()
+    # hdlr가 stsd보다 먼저 필요하므로 깊이 우선으로 모아서 순서대로 처리한다
+    boxes = {}
+
+    def collect(box_start: int, box_end: int) -> None:
+        for box_type, payload_start, payload_end in _iter_boxes(
+            data, box_start, box_end
+        ):
+            if box_type in CONTAINER_BOXES:
+                collect(payload_start, payload_end)
+            else:
+                boxes.setdefault(box_type, (payload_start, payload_end))
+
+    collect(start, end)
+    if b"hdlr" in boxes:
+        hdlr_start, hdlr_end = boxes[b"hdlr"]
+        _require(b"hdlr", hdlr_start, hdlr_end, 12)
+        track.handler = data[hdlr_start + 8 : hdlr_start + 12]
+    if b"tkhd" in boxes:
+        _parse_tkhd(data, *boxes[b"tkhd"], track)
+    if b"mdhd" in boxes:
+        timescale, duration = _time_fields(data, *boxes[b"mdhd"])
+        if timescale:
+            track.duration = duration / timescale
+    if b"stsd" in boxes:
+        _parse_stsd(data, *boxes[b"stsd"], track)
+    return track
+
+
+def _parse_moov(data: bytes) -> VideoMetadata:
+    duration = None
+    tracks = []
+    for box_type, payload_start, payload_end in _iter_boxes(data, 0, len(data)):
+        if box_type == b"mvhd":
+            timescale, movie_duration = _time_fields(data, payload_start, payload_end)
+            if timescale and movie_duration:
+                duration = movie_duration / timescale
+        elif box_type == b"trak":
+            tracks.append(_parse_track(data, payload_start, payload_end))
+
+    video = next((track for track in tracks if track.handler == b"vide"), None)
+    audio = next((track for track in tracks if track.handler == b"soun"), None)
+    if duration is None:
+        # 조각난(fragmented) MP4는 mvhd의 길이가 0이다
+        track_durations = [track.duration for track in tracks if track.duration]
+        duration = max(track_durations) if track_durations else None
+
+    width = height = None
+    rotation = 0
+    if video is not None and video.width and video.height:
+        width, height = round(video.width), round(video.height)
+        rotation = video.rotation
+        if rotation in (90, 270):
+            width, height = height, width
+
+    return VideoMetadata(
+        width=width,
+        height=height,
+        duration=duration,
+        video_codec=video.codec if video else None,
+        audio_codec=audio.codec if audio else None,
+        rotation=rotation,
+    )
+
+
+def read_video_metadata(file: BinaryIO) -> VideoMetadata | None:
+    """
+    MP4/MOV 파일에서 moov 박스만 읽어 크기, 길이, 코덱을 추출합니다.
+
+    최상위 박스 헤더만 차례로 읽고 mdat 같은 나머지 박스는 seek으로 건너뛰므로,
+    파일 크기와 관계없이 moov 박스 크기만큼만 읽습니다. moov가 파일 끝에
+    있어도 마찬가지입니다.
+
+    Returns:
+        VideoMetadata | None: ISO BMFF(MP4/MOV) 형식이 아니면 None
+
+    Raises:
+        MediaProcessingError: MP4/MOV 파일이지만 moov를 읽을 수 없는 경우
+    """
+    name = getattr(file, "name", "<video>")
+    first = True
+    try:
+        while True:
+            header = _read_header(file)
+            if header is None:
+                break
+            box_type, _, payload_size = header
+            if first and box_type not in TOP_LEVEL_BOXES:
+                return None
+            first = False
+
+            if box_type == b"moov":
+                if payload_size is None or payload_size > MAX_MOOV_SIZE:
+                    raise ValueError("moov box is too large")
+                data = file.read(payload_size)
+                if len(data) < payload_size:
+                    raise ValueError("moov box is truncated")
+                return _parse_moov(data)
+            if payload_size is None:
+                break
+            file.seek(payload_size, 1)
+    except (ValueError, IndexError, struct.error) as e:
+        raise MediaProcessingError(str(name), "parse", str(e)) from e
+
+    if first:
+        return None
+    raise MediaProcessingError(str(name), "parse", "No moov box found")
+
+
+def probe_video(video_path: str) -> VideoMetadata | None:
+    """동영상 파일 경로에서 read_video_metadata를 실행합니다."""
+    try:
+        with open(video_path, "rb") as file:
+            return read_video_metadata(file)
+    except OSError as e:
+        raise MediaProcessingError(video_path, "open", str(e)) from e
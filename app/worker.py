@@ -0,0 +1,152 @@
+import argparse
+import logging
+import multiprocessing
+import time
+from uuid import UUID
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.media import (
+    MEDIA_FAILED,
+    MEDIA_PENDING,
+    MEDIA_READY,
+    Media,
+    MediaBlob,
+    MediaRendition,
+    MediaRenditionCreate,
+)
+from app.utils.blob_store import blob_renditions, copy_processed
+from app.utils.job_queue import claim_job, fail_expired_jobs, job_handler, run_job
+from app.utils.media_pipeline import PROCESS_MEDIA_JOB, MediaJob, process_media
+
+logger = logging.getLogger(__name__)
+
+# 워커 로그 형식 (프로세스 이름으로 어느 워커의 로그인지 구분)
+LOG_FORMAT = "%(asctime)s %(processName)s %(levelname)s %(name)s: %(message)s"
+
+
+def mark_media_failed(session: Session, payload: dict) -> None:
+    media = session.get(Media, UUID(payload["media_id"]))
+    if media is not None:
+        media.status = MEDIA_FAILED
+        session.add(media)
+
+
+@job_handler(PROCESS_MEDIA_JOB, on_failure=mark_media_failed)
+def process_media_job(session: Session, payload: dict) -> None:
+    """
+    업로드된 원본의 크기를 읽고 썸네일과 렌디션을 만든 뒤 미디어를 ready로 표시합니다.
+
+    같은 내용의 blob을 다른 작업이 이미 처리했으면 다시 처리하지 않고 blob의
+    결과를 복사합니다. 처음 처리한 결과는 blob에도 저장합니다.
+    """
+    media = session.get(Media, UUID(payload["media_id"]))
+    if media is None:
+        # 처리 전에 삭제된 미디어
+        return
+
+    blob = session.get(MediaBlob, media.content_hash) if media.content_hash else None
+    if blob is not None and blob.status != MEDIA_PENDING:
+        copy_processed(media, blob)
+        renditions = blob_renditions(blob)
+    else:
+        result = process_media(MediaJob.from_payload(payload))
+        media.width = result.width
+        media.height = result.height
+        media.duration = result.duration
+        media.video_codec = result.video_codec
+        media.placeholder = result.placeholder
+        if result.error:
+            # 손상되었거나 지원하지 않는 파일은 다시 시도해도 실패하므로 바로 실패 처리
+            logger.warning("Error processing media %s: %s", media.id, result.error)
+            media.status = MEDIA_FAILED
+            media.thumbnail_url = None
+        else:
+            media.status = MEDIA_READY
+        renditions = [
+            MediaRenditionCreate(
+                url=f"/{rendition.path}",
+                format=rendition.format,
+                max_size=rendition.max_size,
+                width=rendition.width,
+                height=rendition.height,
+                file_size=rendition.file_size,
+            )
+            for rendition in result.renditions
+        ]
+        if blob is not None:
+            copy_processed(blob, media)
+            blob.renditions = [rendition.model_dump() for rendition in renditions]
+            session.add(blob)
+    session.add(media)
+    session.add_all(
+        MediaRendition.model_validate(rendition, update={"media_id": media.id})
+        for rendition in renditions
+    )
+
+
+def run_once(engine: Engine) -> bool:
+    """
+    작업 하나를 가져와 실행합니다.
+
+    Returns:
+        bool: 실행한 작업이 있었는지 여부
+    """
+    job = claim_job(engine, settings.job_visibility_timeout)
+    if job is None:
+        fail_expired_jobs(engine)
+        return False
+    run_job(engine, job, settings.job_retry_delay)
+    return True
+
+
+def run_worker(engine: Engine) -> None:
+    """작업이 없으면 job_poll_interval만큼 기다리며 큐를 계속 처리합니다."""
+    while True:
+        if not run_once(engine):
+            time.sleep(settings.job_poll_interval)
+
+
+def worker_process() -> None:
+    # spawn된 프로세스는 부모의 로깅 설정을 물려받지 않는다
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    # 프로세스마다 자기 엔진(연결 풀)을 사용한다
+    from app.database import engine
+
+    try:
+        run_worker(engine)
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="백그라운드 작업 워커")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.worker_processes,
+        help="워커 프로세스 수",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=worker_process, name=f"worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    logger.info("Started %d worker process(es)", len(processes))
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+채팅방 하나에 연결된 시뮬레이션 소켓 10k개로 브로드캐스트 지연 비교
+
+기존 방식(소켓마다 차례로 send_text를 await)과 ConnectionManager(연결별 송신 큐와
+송신 태스크)를 비교합니다. 일부 소켓은 느린 클라이언트로 동작합니다.
+
+    python -m benchmarks.bench_broadcast [--sockets 10000] [--slow 10]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.utils.connection_manager import ConnectionManager
+
+
+class SimulatedWebSocket:
+    def __init__(self, delay: float, done: asyncio.Event, counter: list):
+        self.delay = delay
+        self.done = done
+        self.counter = counter
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.counter[0] -= 1
+        if self.counter[0] == 0:
+            self.done.set()
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def make_sockets(count: int, slow: int, slow_delay: float):
+    done = asyncio.Event()
+    # 빠른 소켓이 모두 받으면 완료로 본다
+    counter = [count - slow]
+    sockets = [
+        SimulatedWebSocket(slow_delay if index < slow else 0, done, counter)
+        for index in range(count)
+    ]
+    return sockets, done
+
+
+async def sequential_broadcast(sockets, message: str):
+    # 기존 ConnectionManager.broadcast와 같은 방식
+    for websocket in sockets:
+        await websocket.send_text(message)
+
+
+async def bench_sequential(count: int, slow: int, slow_delay: float) -> float:
+    sockets, done = make_sockets(count, slow, slow_delay)
+    started = time.perf_counter()
+    task = asyncio.create_task(sequential_broadcast(sockets, "hello"))
+    await done.wait()
+    elapsed = time.perf_counter() - started
+    task.cancel()
+    return elapsed
+
+
+async def bench_queued(count: int, slow: int, slow_delay: float) -> float:
+    sockets, done = make_sockets(count, slow, slow_delay)
+    chat_id = uuid.uuid4()
+    manager = ConnectionManager(max_queue_size=256)
+    for websocket in sockets:
+        await manager.connect(websocket, chat_id)
+
+    started = time.perf_counter()
+    await manager.broadcast("hello", chat_id)
+    enqueue_elapsed = time.perf_counter() - started
+    await done.wait()
+    elapsed = time.perf_counter() - started
+
+    for websocket in sockets:
+        manager.disconnect(websocket, chat_id)
+    print(f"  broadcast() returned after {enqueue_elapsed * 1000:8.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--slow-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{args.sockets} sockets, {args.slow} slow ({args.slow_delay * 1000:.0f} ms)")
+    sequential = asyncio.run(bench_sequential(args.sockets, args.slow, args.slow_delay))
+    print(f"sequential send_text : {sequential * 1000:8.2f} ms until fast sockets done")
+    queued = asyncio.run(bench_queued(args.sockets, args.slow, args.slow_delay))
+    print(f"per-connection queues: {queued * 1000:8.2f} ms until fast sockets done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+사진 여러 장을 올린 게시물의 미디어 처리 시간 비교
+
+한 장씩 차례로 처리하는 방식과 프로세스 풀(media_pipeline)로 병렬 처리하는
+방식을 비교합니다. 사진은 휴대폰 카메라 크기의 JPEG으로 생성합니다.
+
+    python -m benchmarks.bench_media_pipeline [--photos 10] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from app.utils.media_pipeline import (
+    MediaJob,
+    get_media_executor,
+    process_media_batch,
+    shutdown_media_executor,
+)
+
+
+def make_jobs(directory: str, count: int, size: tuple[int, int]) -> list[MediaJob]:
+    noise = Image.effect_noise(size, 64).convert("RGB")
+    jobs = []
+    for index in range(count):
+        original_path = os.path.join(directory, f"photo{index}.jpg")
+        noise.save(original_path, "JPEG", quality=90)
+        jobs.append(
+            MediaJob(
+                media_type="image",
+                original_path=original_path,
+                thumbnail_path=os.path.join(directory, f"thumbnail{index}.jpg"),
+            )
+        )
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = make_jobs(tmp, args.photos, (args.width, args.height))
+        print(f"{args.photos} photos of {args.width}x{args.height}")
+
+        started = time.perf_counter()
+        process_media_batch(jobs, None)
+        print(f"sequential       : {time.perf_counter() - started:6.2f} s")
+
+        executor = get_media_executor(args.workers)
+        # 워커 프로세스 시작 비용은 서버 수명 동안 한 번이므로 측정에서 뺀다
+        process_media_batch(jobs[:2], executor)
+        started = time.perf_counter()
+        process_media_batch(jobs, executor)
+        elapsed = time.perf_counter() - started
+        print(f"{args.workers} worker processes: {elapsed:6.2f} s")
+        shutdown_media_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+이미지 하나의 메타데이터 추출 + 썸네일 생성 시간 비교
+
+기존 방식(get_image_dimensions와 create_thumbnail이 각각 파일을 엶)과
+process_image(한 번 열어 헤더 정보와 썸네일을 함께 얻음)를 비교합니다.
+
+    python -m benchmarks.bench_media_probe [--repeat 20]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from app.utils.media_utils import create_thumbnail, get_image_dimensions, process_image
+
+SIZES = [(640, 480), (1920, 1080), (4032, 3024)]
+
+
+def two_call_path(original_path: str, thumbnail_path: str) -> None:
+    get_image_dimensions(original_path)
+    create_thumbnail(original_path, thumbnail_path)
+
+
+def measure(function, original_path: str, thumbnail_path: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(original_path, thumbnail_path)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        thumbnail_path = os.path.join(tmp, "thumbnail.jpg")
+        for size in SIZES:
+            original_path = os.path.join(tmp, f"{size[0]}x{size[1]}.jpg")
+            Image.effect_noise(size, 64).convert("RGB").save(original_path, "JPEG")
+
+            old = measure(two_call_path, original_path, thumbnail_path, args.repeat)
+            new = measure(process_image, original_path, thumbnail_path, args.repeat)
+            print(
+                f"{size[0]:>5}x{size[1]:<5} two calls: {old * 1000:8.2f} ms, "
+                f"process_image: {new * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
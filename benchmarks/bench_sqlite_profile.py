@@ -0,0 +1,67 @@
+"""
+SQLite 튜닝 프로필 유무에 따른 쓰기 처리량 비교
+
+메시지 한 건마다 commit하는 WebSocket 채팅 경로와 같은 패턴으로 쓰기를 반복합니다.
+
+    python -m benchmarks.bench_sqlite_profile [--rows 2000]
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel
+
+from app.config import Settings
+from app.database import create_db_engine
+from app.models.chat import Chat, Message
+from app.models.comment import Comment  # noqa: F401 (관계 설정용)
+from app.models.post import Post  # noqa: F401 (관계 설정용)
+from app.models.profile import Profile
+
+
+def run(database_path: Path, tuning: bool, rows: int) -> float:
+    engine = create_db_engine(
+        Settings(database_url=f"sqlite:///{database_path}", sqlite_tuning=tuning)
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        profile = Profile(name=f"bench-{uuid.uuid4()}")
+        chat = Chat(name="bench")
+        session.add(profile)
+        session.add(chat)
+        session.commit()
+        profile_id, chat_id = profile.id, chat.id
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for index in range(rows):
+            session.add(
+                Message(text=f"message {index}", chat_id=chat_id, profile_id=profile_id)
+            )
+            session.commit()
+    elapsed = time.perf_counter() - started
+
+    engine.dispose()
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain = run(Path(directory) / "plain.db", tuning=False, rows=args.rows)
+        tuned = run(Path(directory) / "tuned.db", tuning=True, rows=args.rows)
+
+    print(f"rows per profile: {args.rows}")
+    print(f"default profile : {plain:10.1f} commits/s")
+    print(f"tuned profile   : {tuned:10.1f} commits/s ({tuned / plain:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+썸네일 생성 시간: 원본 해상도 디코딩 vs 빠른 경로 (JPEG draft / reducing_gap)
+
+여러 크기와 형식의 사진으로 process_image(fast=False)와 process_image(fast=True)를
+비교하고, 두 썸네일의 평균 픽셀 차이(0~255)도 함께 출력합니다.
+
+    python -m benchmarks.bench_thumbnails [--repeat 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+from app.utils.media_utils import process_image
+
+SIZES = [(1280, 960), (1920, 1080), (4032, 3024), (6000, 4000)]
+FORMATS = ["JPEG", "PNG", "WEBP"]
+
+
+def make_photo(size) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize(size)
+    radial = Image.radial_gradient("L").resize(size)
+    photo = Image.merge("RGB", (gradient, radial, gradient.rotate(90)))
+    draw = ImageDraw.Draw(photo)
+    for index in range(12):
+        x, y = size[0] * index // 12, size[1] * (index % 4) // 4
+        draw.ellipse((x, y, x + size[0] // 10, y + size[1] // 6), fill=(255, 40, 40))
+    # 센서 노이즈 흉내
+    noise = Image.effect_noise(size, 20).convert("RGB")
+    return Image.blend(photo, noise, 0.1)
+
+
+def measure(path: str, thumbnail_path: str, fast: bool, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        process_image(path, thumbnail_path, fast=fast)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'image':<16}{'full':>10}{'fast':>10}{'speedup':>9}{'diff':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path = os.path.join(tmp, "full.jpg")
+        fast_path = os.path.join(tmp, "fast.jpg")
+        for size in SIZES:
+            photo = make_photo(size)
+            for image_format in FORMATS:
+                path = os.path.join(tmp, f"photo.{image_format.lower()}")
+                photo.save(path, image_format)
+
+                full = measure(path, full_path, False, args.repeat)
+                fast = measure(path, fast_path, True, args.repeat)
+                with Image.open(full_path) as a, Image.open(fast_path) as b:
+                    diff = max(ImageStat.Stat(ImageChops.difference(a, b)).mean)
+                label = f"{size[0]}x{size[1]} {image_format}"
+                print(
+                    f"{label:<16}{full * 1000:8.1f}ms{fast * 1000:8.1f}ms"
+                    f"{full / fast:8.1f}x{diff:7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
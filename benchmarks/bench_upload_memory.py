@@ -0,0 +1,159 @@
+"""
+큰 업로드를 요청 경로 그대로 받을 때의 최대 메모리와 거절 시점 비교
+
+multipart 요청 본문을 ASGI receive로 청크씩 흘려 보내 Starlette의 폼 파싱(임시
+파일 spool)부터 엔드포인트의 저장까지 실제 요청 경로를 실행합니다.
+
+- 저장: 기존 방식(file.file.read()로 전체를 읽은 뒤 쓰기)과 UploadLimiter(청크
+  단위 스트리밍 + sha256 계산)의 최대 메모리(tracemalloc)와 시간
+- 거절: 제한을 넘는 업로드를 UploadSizeLimitMiddleware 없이/있이 보냈을 때
+  413 응답까지 앱이 읽은 바이트 수와 시간 (Content-Length가 있을 때와 chunked)
+
+    python -m benchmarks.bench_upload_memory [--size-mb 256] [--limit-mb 64]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from fastapi import FastAPI, File, UploadFile
+
+from app.utils.uploads import UploadLimiter, UploadSizeLimitMiddleware
+
+BOUNDARY = "bench-boundary"
+BLOCK = os.urandom(1024 * 1024)
+
+
+def build_app(directory: str, limit: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/read-all")
+    def read_all(files: List[UploadFile] = File(...)):
+        # 기존 store_upload와 같은 방식
+        for index, file in enumerate(files):
+            with open(os.path.join(directory, f"read-{index}"), "wb") as buffer:
+                buffer.write(file.file.read())
+        return {}
+
+    @app.post("/streamed")
+    def streamed(files: List[UploadFile] = File(...)):
+        limiter = UploadLimiter(max_file_size=limit, max_request_size=limit)
+        for index, file in enumerate(files):
+            limiter.save(file.file, os.path.join(directory, f"streamed-{index}"))
+        return {}
+
+    return app
+
+
+def body_parts(size: int):
+    """size 바이트 파일 하나의 multipart 본문 (미리 만들어 두지 않고 청크씩 생성)"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="files"; filename="upload.bin"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    for _ in range(size // len(BLOCK)):
+        yield BLOCK
+    if size % len(BLOCK):
+        yield BLOCK[: size % len(BLOCK)]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def body_length(size: int) -> int:
+    return sum(len(part) for part in body_parts(0)) + size
+
+
+async def post(app, path: str, size: int, chunked: bool) -> tuple[int, int]:
+    """업로드 요청 하나를 보내고 (응답 상태, 앱이 읽은 본문 바이트 수)를 반환합니다."""
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if not chunked:
+        headers.append((b"content-length", str(body_length(size)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "server": ("bench", 80),
+        "client": ("bench", 50000),
+    }
+    parts = body_parts(size)
+    pending = next(parts)
+    received = 0
+    status = None
+
+    async def receive():
+        nonlocal pending, received
+        if pending is None:
+            return {"type": "http.disconnect"}
+        body = pending
+        pending = next(parts, None)
+        received += len(body)
+        return {"type": "http.request", "body": body, "more_body": pending is not None}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status, received
+
+
+def measure_save(label: str, app, path: str, size: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    status, _ = asyncio.run(post(app, path, size, chunked=False))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<24}: {status}, peak {peak / 1024 / 1024:8.2f} MB, "
+        f"{elapsed * 1000:8.1f} ms"
+    )
+
+
+def measure_reject(label: str, app, size: int, chunked: bool) -> None:
+    started = time.perf_counter()
+    status, received = asyncio.run(post(app, "/streamed", size, chunked))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<24}: {status}, read {received / 1024 / 1024:8.1f} MB, "
+        f"{elapsed * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--limit-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    limit = args.limit_mb * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Saving a {args.size_mb} MB upload")
+        app = build_app(directory, size)
+        measure_save("read() then write", app, "/read-all", size)
+        measure_save("streamed with sha256", app, "/streamed", size)
+
+        print(f"Rejecting a {args.size_mb} MB upload over a {args.limit_mb} MB limit")
+        app = build_app(directory, limit)
+        limited = UploadSizeLimitMiddleware(app, max_size=limit)
+        measure_reject("no middleware", app, size, chunked=False)
+        measure_reject("middleware, length", limited, size, chunked=False)
+        measure_reject("middleware, chunked", limited, size, chunked=True)
+
+
+if __name__ == "__main__":
+    main()